@@ -0,0 +1,103 @@
+# Generated by tools.startup --snapshot from resources/mm27.properties; don't edit
+CHECKSUM = 3793360845
+PROPERTIES = {
+    'networking.timeout.player': '50000',
+    'networking.timeout.heartbeat': '5000',
+    'replayfile.name': 'game.json',
+    'enginelogfile.name': 'engine.json',
+    'playerlogfile.extension': '.json',
+    'board.width': '30',
+    'board.height': '50',
+    'board.grass.rows': '3',
+    'board.greengrocer.length': '4',
+    'fertilityband.inner.height': '1',
+    'fertilityband.mid.height': '1',
+    'fertilityband.outer.height': '3',
+    'fertilityband.speed': '3',
+    'fertilityband.delay': '0',
+    'fertilityband.start': '0',
+    'player.carrycapacity': '30',
+    'player.maxmovement': '10',
+    'player.plantradius': '1',
+    'player.harvestradius': '1',
+    'player.protectionradius': '2',
+    'player.startingmoney': '300',
+    'item.rain_totem.growth_multiplier': '3',
+    'item.rain_totem.effect_radius': '2',
+    'item.fertility_idol.fertility_multiplier': '2',
+    'item.fertility_idol.effect_radius': '2',
+    'item.pesticide.crop_value_decrease': '0.2',
+    'item.pesticide.effect_radius': '1',
+    'item.scarecrow.effect_radius': '2',
+    'items.coffee_thermos.movement_multiplier': '3',
+    'upgrades.green_grocer_loyalty_card_discount': '0.05',
+    'upgrades.green_grocer_loyalty_card_minimum': '25',
+    'upgrades.rabbits_foot_double_drop_chance': '0.05',
+    'upgrades.longer_legs_max_movement': '20',
+    'upgrades.seed_a_pult_plant_radius': '5',
+    'upgrades.scythe_harvest_radius': '5',
+    'upgrades.backpack_carrying_capacity': '50',
+    'upgrades.spyglass_protection_radius': '3',
+    'tiletype.greengrocer.fertility': '0',
+    'tiletype.arid.fertility': '0',
+    'tiletype.soil.fertility': '0',
+    'tiletype.grass.fertility': '0',
+    'tiletype.fband_inner.fertility': '1.5',
+    'tiletype.fband_mid.fertility': '1.2',
+    'tiletype.fband_outer.fertility': '1',
+    'croptype.none.fertilitysens': '0',
+    'croptype.none.growthvalue': '0',
+    'croptype.none.growthtime': '0',
+    'croptype.none.seedprice': '0',
+    'croptype.none.description': '',
+    'croptype.potato.fertilitysens': '0',
+    'croptype.potato.growthvalue': '1.375',
+    'croptype.potato.growthtime': '4',
+    'croptype.potato.seedprice': '5',
+    'croptype.potato.description': 'Basic plant, takes time to grow, can’t use fertility, but can make you an honest living',
+    'croptype.corn.fertilitysens': '0.5',
+    'croptype.corn.growthvalue': '2.5',
+    'croptype.corn.growthtime': '2',
+    'croptype.corn.seedprice': '5',
+    'croptype.corn.description': 'Can use fertility and grows quickly. Can’t turn a profit without using the fertility band though',
+    'croptype.grape.fertilitysens': '0.5',
+    'croptype.grape.growthvalue': '1.65',
+    'croptype.grape.growthtime': '10',
+    'croptype.grape.seedprice': '15',
+    'croptype.grape.description': 'More expensive to plant, but sells for more. Can make minor use of fertility',
+    'croptype.jogan_fruit.fertilitysens': '0.75',
+    'croptype.jogan_fruit.growthvalue': '4',
+    'croptype.jogan_fruit.growthtime': '5',
+    'croptype.jogan_fruit.seedprice': '20',
+    'croptype.jogan_fruit.description': 'Also expensive, but makes great use of the fertility band',
+    'croptype.peanut.fertilitysens': '0',
+    'croptype.peanut.growthvalue': '0.167',
+    'croptype.peanut.growthtime': '30',
+    'croptype.peanut.seedprice': '5',
+    'croptype.peanut.description': 'Troll crop used to take up space on the other farmer’s side',
+    'croptype.quadrotriticale.fertilitysens': '0.25',
+    'croptype.quadrotriticale.growthvalue': '2.6',
+    'croptype.quadrotriticale.growthtime': '15',
+    'croptype.quadrotriticale.seedprice': '30',
+    'croptype.quadrotriticale.description': 'Turns a solid profit with the fertility band, and is fairly low risk,  takes a long time to grow though',
+    'croptype.ducham_fruit.fertilitysens': '1',
+    'croptype.ducham_fruit.growthvalue': '20',
+    'croptype.ducham_fruit.growthtime': '5',
+    'croptype.ducham_fruit.seedprice': '100',
+    'croptype.ducham_fruit.description': 'Can turn an amazing profit using the fertility band, but very cost prohibitive to acquire.',
+    'croptype.golden_corn.fertilitysens': '1',
+    'croptype.golden_corn.growthvalue': '500',
+    'croptype.golden_corn.growthtime': '3',
+    'croptype.golden_corn.seedprice': '1000',
+    'croptype.golden_corn.description': 'A once in a lifetime opportunity, this incredibly expensive seed, when planted in the most fertile regions can turn an equally incredible profit.',
+    'itemtype.raintotem.description': '"Rain totem"',
+    'itemtype.raintotem.radius': '2',
+    'itemtype.raintotem.bonus': '2',
+    'itemtype.raintotem.chance': '0.5',
+    'itemtype.fertilityidol.description': '"Fertility idol"',
+    'itemtype.fertilityidol.boostmult': '2',
+    'itemtype.pesticide.description': '"Pesticide"',
+    'itemtype.pesticide.valuedec': '0.2',
+    'itemtype.scarecrow.description': '"Scarecrow"',
+    'itemtype.scarecrow.radius': '2',
+}
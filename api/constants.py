@@ -1,50 +1,120 @@
-from pathlib import Path
-import configparser
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
 import os
+import zlib
+
+PROPERTIES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "mm27.properties")
+
+
+def load_properties(path: str = PROPERTIES_PATH) -> Mapping[str, str]:
+    """
+    Reads a .properties file into a read-only key -> raw string mapping
+    :param path: properties file to read
+    :return: mapping of property names to their unparsed values
+    """
+    import configparser
+    with open(path) as f:
+        file_content = '[dummy_section]\n' + f.read()
+    config_parser = configparser.RawConfigParser()
+    config_parser.read_string(file_content)
+    return MappingProxyType(dict(config_parser['dummy_section']))
+
+
+def properties_checksum(path: str = PROPERTIES_PATH) -> int:
+    with open(path, 'rb') as f:
+        return zlib.crc32(f.read())
+
+
+def load_snapshot(path: str = PROPERTIES_PATH) -> Optional[Mapping[str, str]]:
+    """
+    Returns the properties from api/_properties.py, a Python-literal copy of
+    the file written by tools.startup --snapshot, or None if there is none or
+    the file has changed since. Importing it skips configparser, which is a
+    noticeable part of a bot's startup.
+    """
+    try:
+        from api import _properties
+    except ImportError:
+        return None
+    if _properties.CHECKSUM != properties_checksum(path):
+        return None
+    return MappingProxyType(_properties.PROPERTIES)
+
+
+class CropStats(NamedTuple):
+    seed_price: float
+    growth_time: int
+    fertility_sensitivity: float
+    growth_value: float
+
+
+# Property name stems, e.g. croptype.<crop>.seedprice and tiletype.<tile>.fertility
+CROP_NAMES = ('none', 'grape', 'corn', 'potato', 'jogan_fruit', 'peanut', 'quadrotriticale',
+              'ducham_fruit', 'golden_corn')
+TILE_NAMES = ('greengrocer', 'grass', 'arid', 'soil', 'fband_outer', 'fband_mid', 'fband_inner')
+
+# Loaded once per process; every Constants instance shares this snapshot
+PROPERTIES = load_snapshot() or load_properties()
 
 
 class Constants:
-    def __init__(self) -> None:
-        with open(Path(os.path.dirname(os.path.dirname(__file__))) / "resources" / "mm27.properties") as f:
-            file_content = '[dummy_section]\n' + f.read()
-        config_parser = configparser.RawConfigParser()
-        config_parser.read_string(file_content)
-        config = config_parser['dummy_section']
-        
-        self.BOARD_WIDTH                            = int(config['board.width'])
-        self.BOARD_HEIGHT                           = int(config['board.height'])
-        self.GRASS_ROWS                             = int(config['board.grass.rows'])
-        self.GREENGROCER_LENGTH                     = int(config['board.greengrocer.length'])
-        self.FBAND_INNER_HEIGHT                     = int(config['fertilityband.inner.height'])
-        self.FBAND_MID_HEIGHT                       = int(config['fertilityband.mid.height'])
-        self.FBAND_OUTER_HEIGHT                     = int(config['fertilityband.outer.height'])
-        self.FBAND_MOVE_DELAY                       = int(config['fertilityband.speed'])
-        self.FBAND_INIT_DELAY                       = int(config['fertilityband.delay'])
-        self.FBAND_INIT_POSITION                    = int(config['fertilityband.start'])
-
-        self.CARRYING_CAPACITY                      = int(config['player.carrycapacity'])
-        self.MAX_MOVEMENT                           = int(config['player.maxmovement'])
-        self.PLANT_RADIUS                           = int(config['player.plantradius'])
-        self.HARVEST_RADIUS                         = int(config['player.harvestradius'])
-        self.PROTECTION_RADIUS                      = int(config['player.protectionradius'])
-        self.STARTING_MONEY                         = int(config['player.startingmoney'])
-        
-        self.PLAYER_TIMEOUT                         = int(config['networking.timeout.player'])
-        
-        self.RAIN_TOTEM_GROWTH_MULTIPLIER           = int(config['item.rain_totem.growth_multiplier'])
-        self.RAIN_TOTEM_EFFECT_RADIUS               = int(config['item.rain_totem.effect_radius'])
-        self.FERTILITY_IDOL_FERTILITY_MULTIPLIER    = int(config['item.fertility_idol.fertility_multiplier'])
-        self.FERTILITY_IDOL_EFFECT_RADIUS           = int(config['item.fertility_idol.effect_radius'])
-        self.PESTICIDE_CROP_VALUE_DECREASE          = float(config['item.pesticide.crop_value_decrease'])
-        self.PESTICIDE_EFFECT_RADIUS                = int(config['item.pesticide.effect_radius'])
-        self.SCARECROW_EFFECT_RADIUS                = int(config['item.scarecrow.effect_radius'])
-        self.COFFEE_THERMOS_MOVEMENT_MULTIPLIER     = int(config['items.coffee_thermos.movement_multiplier'])
-
-        self.GREEN_GROCER_LOYALTY_CARD_DISCOUNT     = float(config['upgrades.green_grocer_loyalty_card_discount'])
-        self.GREEN_GROCER_LOYALTY_CARD_MINIMUM      = float(config['upgrades.green_grocer_loyalty_card_minimum'])
-        self.RABBITS_FOOT_DOUBLE_DROP_CHANCE        = float(config['upgrades.rabbits_foot_double_drop_chance'])
-        self.LONGER_LEGS_MAX_MOVEMENT               = int(config['upgrades.longer_legs_max_movement'])
-        self.SEED_A_PULT_PLANT_RADIUS               = int(config['upgrades.seed_a_pult_plant_radius'])
-        self.SCYTHE_HARVEST_RADIUS                  = int(config['upgrades.scythe_harvest_radius'])
-        self.BACKPACK_CARRYING_CAPACITY             = int(config['upgrades.backpack_carrying_capacity'])
-        self.SPYGLASS_PROTECTION_RADIUS             = int(config['upgrades.spyglass_protection_radius'])
+    """
+    Game constants from resources/mm27.properties. The file is read once at
+    import time and the values are stored on the class, so creating a
+    Constants() is free and every instance sees the same snapshot.
+    """
+    __slots__ = ()
+
+    BOARD_WIDTH                            = int(PROPERTIES['board.width'])
+    BOARD_HEIGHT                           = int(PROPERTIES['board.height'])
+    GRASS_ROWS                             = int(PROPERTIES['board.grass.rows'])
+    GREENGROCER_LENGTH                     = int(PROPERTIES['board.greengrocer.length'])
+    FBAND_INNER_HEIGHT                     = int(PROPERTIES['fertilityband.inner.height'])
+    FBAND_MID_HEIGHT                       = int(PROPERTIES['fertilityband.mid.height'])
+    FBAND_OUTER_HEIGHT                     = int(PROPERTIES['fertilityband.outer.height'])
+    FBAND_MOVE_DELAY                       = int(PROPERTIES['fertilityband.speed'])
+    FBAND_INIT_DELAY                       = int(PROPERTIES['fertilityband.delay'])
+    FBAND_INIT_POSITION                    = int(PROPERTIES['fertilityband.start'])
+
+    CARRYING_CAPACITY                      = int(PROPERTIES['player.carrycapacity'])
+    MAX_MOVEMENT                           = int(PROPERTIES['player.maxmovement'])
+    PLANT_RADIUS                           = int(PROPERTIES['player.plantradius'])
+    HARVEST_RADIUS                         = int(PROPERTIES['player.harvestradius'])
+    PROTECTION_RADIUS                      = int(PROPERTIES['player.protectionradius'])
+    STARTING_MONEY                         = int(PROPERTIES['player.startingmoney'])
+
+    PLAYER_TIMEOUT                         = int(PROPERTIES['networking.timeout.player'])
+    # The engine ends the game when this turn starts; it is not in mm27.properties
+    LAST_TURN                              = 180
+
+    RAIN_TOTEM_GROWTH_MULTIPLIER           = int(PROPERTIES['item.rain_totem.growth_multiplier'])
+    RAIN_TOTEM_EFFECT_RADIUS               = int(PROPERTIES['item.rain_totem.effect_radius'])
+    FERTILITY_IDOL_FERTILITY_MULTIPLIER    = int(PROPERTIES['item.fertility_idol.fertility_multiplier'])
+    FERTILITY_IDOL_EFFECT_RADIUS           = int(PROPERTIES['item.fertility_idol.effect_radius'])
+    PESTICIDE_CROP_VALUE_DECREASE          = float(PROPERTIES['item.pesticide.crop_value_decrease'])
+    PESTICIDE_EFFECT_RADIUS                = int(PROPERTIES['item.pesticide.effect_radius'])
+    SCARECROW_EFFECT_RADIUS                = int(PROPERTIES['item.scarecrow.effect_radius'])
+    COFFEE_THERMOS_MOVEMENT_MULTIPLIER     = int(PROPERTIES['items.coffee_thermos.movement_multiplier'])
+
+    GREEN_GROCER_LOYALTY_CARD_DISCOUNT     = float(PROPERTIES['upgrades.green_grocer_loyalty_card_discount'])
+    GREEN_GROCER_LOYALTY_CARD_MINIMUM      = float(PROPERTIES['upgrades.green_grocer_loyalty_card_minimum'])
+    RABBITS_FOOT_DOUBLE_DROP_CHANCE        = float(PROPERTIES['upgrades.rabbits_foot_double_drop_chance'])
+    LONGER_LEGS_MAX_MOVEMENT               = int(PROPERTIES['upgrades.longer_legs_max_movement'])
+    SEED_A_PULT_PLANT_RADIUS               = int(PROPERTIES['upgrades.seed_a_pult_plant_radius'])
+    SCYTHE_HARVEST_RADIUS                  = int(PROPERTIES['upgrades.scythe_harvest_radius'])
+    BACKPACK_CARRYING_CAPACITY             = int(PROPERTIES['upgrades.backpack_carrying_capacity'])
+    SPYGLASS_PROTECTION_RADIUS             = int(PROPERTIES['upgrades.spyglass_protection_radius'])
+
+    # Per-crop economics, keyed by property name stem (e.g. 'golden_corn')
+    CROP_STATS: Mapping[str, CropStats] = MappingProxyType({
+        name: CropStats(float(PROPERTIES[f'croptype.{name}.seedprice']),
+                        int(PROPERTIES[f'croptype.{name}.growthtime']),
+                        float(PROPERTIES[f'croptype.{name}.fertilitysens']),
+                        float(PROPERTIES[f'croptype.{name}.growthvalue']))
+        for name in CROP_NAMES
+    })
+    # Per-tile fertility, keyed by property name stem (e.g. 'fband_inner')
+    TILE_FERTILITY: Mapping[str, float] = MappingProxyType({
+        name: float(PROPERTIES[f'tiletype.{name}.fertility']) for name in TILE_NAMES
+    })
+
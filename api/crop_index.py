@@ -0,0 +1,240 @@
+"""
+Index of the crops on the board, kept up to date from one game state to the next.
+
+Every planted cell is filed under the turn its crop is ready (which, unlike
+turns-until-ripe, doesn't change as turns pass) and whether we planted it.
+So the crops ripening on a given turn, or all ripe crops, are a bucket lookup
+rather than a board scan. For every harvest radius asked about, a value field
+is also kept: field[c] is the total value of the ripe crops within that radius of
+cell c, i.e. what a player standing on c could harvest.
+
+update() re-indexes only the cells that changed. With incremental decoding
+(see networking.decoder) those are the GameState's changed_cells. Otherwise
+the TileMap columns are compared with the last ones seen, a row at a time. Crops that ripen
+because the turn advanced move into the value fields without being looked at
+again.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Set
+
+from api.constants import Constants
+from api.reachability import reachability
+from model.crop_type import CropType
+from model.game_state import GameState
+from model.position import Position
+
+constants = Constants()
+
+_NO_CROP = -1
+
+
+class CropIndex:
+    """
+    Call update() with every game state (both phases of every turn) so the
+    incremental updates don't miss a change
+    """
+
+    def __init__(self, width: int = constants.BOARD_WIDTH, height: int = constants.BOARD_HEIGHT) -> None:
+        self.width = width
+        self.height = height
+        size = width * height
+        self.turn = 0
+        # Per cell: the turn the crop there is ready (-1 = no crop) and its value
+        self.ready = array('i', [_NO_CROP] * size)
+        self.values = array('d', [0.0] * size)
+        self.crop_types: List[CropType] = [CropType.NONE] * size
+        # 1 for cells we planted (see mark_planted)
+        self.mine = bytearray(size)
+        self._pending = set()
+        # (ready turn, mine) -> cell indices
+        self.buckets: Dict[tuple, Set[int]] = {}
+        # Harvest radius -> total ripe crop value harvestable from each cell
+        self._fields: Dict[int, array] = {}
+        # Growth columns as of the last update, to find changed cells without changed_cells
+        self._timers = array('i', bytes(4 * size))
+        self._turns_left = array('i', bytes(4 * size))
+        self._seeded = False
+
+    # Maintenance
+
+    def reset(self) -> None:
+        """
+        Forgets every crop, e.g. before a new game
+        """
+        self.__init__(self.width, self.height)
+
+    def mark_planted(self, positions: Iterable[Position]) -> None:
+        """
+        Records cells we just planted on, so their crops are filed as ours
+        when they show up
+        """
+        for position in positions:
+            self._pending.add(position.y * self.width + position.x)
+
+    def update(self, game_state: GameState) -> None:
+        tile_map = game_state.tile_map
+        turn = game_state.turn
+        if turn < self.turn:
+            self.reset()
+        if game_state.changed_cells is not None and self._seeded:
+            width = self.width
+            changed = {position.y * width + position.x for position in game_state.changed_cells}
+        else:
+            changed = self._diff_columns(tile_map)
+        self._seeded = True
+        self._timers[:] = tile_map.growth_timers
+        self._turns_left[:] = tile_map.turns_left_to_grow
+
+        for index in changed:
+            self._remove(index)
+        previous, self.turn = self.turn, turn
+        for ripened in range(previous + 1, turn + 1):
+            for mine in (0, 1):
+                for index in self.buckets.get((ripened, mine), ()):
+                    self._add_to_fields(index, self.values[index])
+        for index in changed:
+            self._add(index, tile_map)
+
+    def _diff_columns(self, tile_map) -> Set[int]:
+        """
+        Returns the cells whose crop, value or growth differ from the columns
+        seen last time. Only columns that differ are compared row by row, and
+        only rows that differ cell by cell.
+        """
+        changed = set()
+        width = self.width
+        for new, old in ((tile_map.crop_types, self.crop_types), (tile_map.crop_values, self.values),
+                         (tile_map.growth_timers, self._timers), (tile_map.turns_left_to_grow, self._turns_left)):
+            # Arrays compare element by element in Python, their bytes don't
+            new_key, old_key, size = (new, old, 1) if isinstance(new, list) \
+                else (new.tobytes(), old.tobytes(), new.itemsize)
+            if new_key == old_key:
+                continue
+            for start in range(0, width * self.height, width):
+                stop = start + width
+                if new_key[start * size:stop * size] != old_key[start * size:stop * size]:
+                    changed.update(index for index in range(start, stop) if new[index] != old[index])
+        return changed
+
+    def _ready_turn(self, tile_map, index: int, turn: int) -> int:
+        if tile_map.growth_timers[index] <= 0:
+            ready = self.ready[index]
+            # Keep the turn it first ripened on so its bucket doesn't move
+            return ready if ready != _NO_CROP and ready <= turn else turn
+        return turn + tile_map.turns_left_to_grow[index]
+
+    def _remove(self, index: int) -> None:
+        ready = self.ready[index]
+        if ready == _NO_CROP:
+            return
+        key = (ready, self.mine[index])
+        bucket = self.buckets[key]
+        bucket.discard(index)
+        if not bucket:
+            del self.buckets[key]
+        if ready <= self.turn:
+            self._add_to_fields(index, -self.values[index])
+        self.ready[index] = _NO_CROP
+        self.values[index] = 0.0
+        self.crop_types[index] = CropType.NONE
+
+    def _add(self, index: int, tile_map) -> None:
+        crop_type = tile_map.crop_types[index]
+        if crop_type is CropType.NONE:
+            self.mine[index] = 0
+            return
+        if index in self._pending:
+            self._pending.discard(index)
+            self.mine[index] = 1
+        ready = self._ready_turn(tile_map, index, self.turn)
+        value = tile_map.crop_values[index]
+        self.ready[index] = ready
+        self.values[index] = value
+        self.crop_types[index] = crop_type
+        self.buckets.setdefault((ready, self.mine[index]), set()).add(index)
+        if ready <= self.turn:
+            self._add_to_fields(index, value)
+
+    def _add_to_fields(self, index: int, value: float) -> None:
+        for radius, field in self._fields.items():
+            self._add_to_field(field, radius, index, value)
+
+    def _add_to_field(self, field: array, radius: int, index: int, value: float) -> None:
+        width = self.width
+        x, y = index % width, index // width
+        for dy, half_width in reachability.spans(radius):
+            row = y + dy
+            if 0 <= row < self.height:
+                for cell in range(row * width + max(x - half_width, 0), row * width + min(x + half_width + 1, width)):
+                    field[cell] += value
+
+    def _field(self, radius: int) -> array:
+        field = self._fields.get(radius)
+        if field is None:
+            field = self._fields[radius] = array('d', [0.0] * (self.width * self.height))
+            for index in self.ripe():
+                self._add_to_field(field, radius, index, self.values[index])
+        return field
+
+    # Queries
+
+    def ripe(self, mine: Optional[bool] = None) -> List[int]:
+        """
+        Returns the indices of every ripe crop
+        :param mine: only ours (True), only theirs (False) or all (None)
+        """
+        return self.ripening(0, self.turn, mine)
+
+    def ripening(self, start: int, stop: int, mine: Optional[bool] = None) -> List[int]:
+        """
+        Returns the indices of the crops ready on turns [start, stop]
+        """
+        owners = (0, 1) if mine is None else (int(mine),)
+        res = []
+        for (turn, owner), indices in self.buckets.items():
+            if start <= turn <= stop and owner in owners:
+                res.extend(indices)
+        return res
+
+    def ripe_values(self, mine: Optional[bool] = None) -> Dict[int, float]:
+        """
+        Returns cell index -> value of every ripe crop
+        """
+        values = self.values
+        return {index: values[index] for index in self.ripe(mine)}
+
+    def ripe_within(self, position: Position, radius: int, mine: Optional[bool] = None) -> List[Position]:
+        """
+        Returns the Positions of the ripe crops within radius of position
+        """
+        width = self.width
+        return [Position(index % width, index // width) for index in self.ripe(mine)
+                if abs(index % width - position.x) + abs(index // width - position.y) <= radius]
+
+    def harvestable_value(self, position: Position, radius: int) -> float:
+        """
+        Returns the total value of the ripe crops a player with the given
+        harvest radius could harvest standing on position
+        """
+        return self._field(radius)[position.y * self.width + position.x]
+
+    def nearest_ripe_cluster(self, position: Position, radius: int, movement: int) -> Optional[Position]:
+        """
+        Returns the cell to stand on to harvest ripe crops that takes the fewest
+        moves to reach, preferring the most harvestable value among those
+        :param radius: harvest radius
+        :param movement: how far the player moves per turn
+        :return: Position, or None if nothing is ripe
+        """
+        field = self._field(radius)
+        width = self.width
+        best = None
+        best_key = None
+        for index, value in enumerate(field):
+            if value <= 0:
+                continue
+            x, y = index % width, index // width
+            key = (-(-(abs(x - position.x) + abs(y - position.y)) // movement), -value)
+            if best_key is None or key < best_key:
+                best, best_key = index, key
+        return None if best is None else Position(best % width, best // width)
@@ -0,0 +1,124 @@
+from array import array
+from typing import List
+
+from api.constants import Constants
+from model.tile_type import TileType
+
+
+class FertilityTimeline:
+    """
+    Precomputed turn x row table of the fertility band. The band only depends
+    on the turn and the row, so every (turn, row) TileType and fertility value
+    is computed once up front. Past the last turn in the table every row has
+    settled into its final type, so later turns are clamped onto it.
+
+    Rows inside the grass strip at the top of the map are never touched by the
+    band and are reported as GRASS (green grocer tiles share its fertility).
+    """
+
+    def __init__(self, constants: Constants = Constants()) -> None:
+        self.height = constants.BOARD_HEIGHT
+        self.grass_rows = constants.GRASS_ROWS
+        self.move_delay = constants.FBAND_MOVE_DELAY
+        self.init_delay = constants.FBAND_INIT_DELAY
+        self.init_position = constants.FBAND_INIT_POSITION
+        self.outer_height = constants.FBAND_OUTER_HEIGHT
+        self.mid_height = constants.FBAND_MID_HEIGHT
+        self.inner_height = constants.FBAND_INNER_HEIGHT
+
+        # Offset boundaries (exclusive) of each band layer from the bottom up
+        bands = [
+            (self.outer_height, TileType.F_BAND_OUTER),
+            (self.mid_height, TileType.F_BAND_MID),
+            (self.inner_height, TileType.F_BAND_INNER),
+            (self.mid_height, TileType.F_BAND_MID),
+            (self.outer_height, TileType.F_BAND_OUTER),
+        ]
+        self._layers = []
+        top = 0
+        for layer_height, layer_type in bands:
+            top += layer_height
+            self._layers.append((top, layer_type))
+        self.band_height = top
+
+        # Once the band has moved past the bottom row nothing changes any more
+        settled_shifts = self.band_height + self.height - self.init_position
+        self.last_turn = settled_shifts * self.move_delay + 1 + self.init_delay
+
+        turns = range(self.last_turn + 1)
+        self._types_by_turn: List[List[TileType]] = [
+            [self._compute_type(turn, row) for row in range(self.height)] for turn in turns
+        ]
+        self._fertility_by_row = [
+            array('d', [self._types_by_turn[turn][row].get_fertility() for turn in turns])
+            for row in range(self.height)
+        ]
+
+    def shifts(self, turn: int) -> int:
+        """
+        Returns how many rows the band has moved down by the given turn
+        """
+        return max(0, (turn - 1 - self.init_delay) // self.move_delay)
+
+    def band_bottom_row(self, turn: int) -> int:
+        """
+        Returns the lowest (largest y) row of the band on the given turn
+        """
+        return self.shifts(turn) - 1 + self.init_position
+
+    def ticks_to_shift(self, turn: int) -> int:
+        """
+        Returns the number of turns until the band next moves
+        """
+        return self.move_delay - (turn - 1 - self.init_delay) % self.move_delay
+
+    def _compute_type(self, turn: int, row: int) -> TileType:
+        if row < self.grass_rows:
+            return TileType.GRASS
+        # How far into the band a row is (negative indicates below the band)
+        offset = self.band_bottom_row(turn) - row
+        if offset < 0:
+            return TileType.SOIL
+        for top, layer_type in self._layers:
+            if offset < top:
+                return layer_type
+        return TileType.ARID
+
+    def _clamp(self, turn: int) -> int:
+        return min(max(turn, 0), self.last_turn)
+
+    def tile_type(self, turn: int, row: int) -> TileType:
+        """
+        Returns the TileType of a row on the given turn
+        """
+        return self._types_by_turn[self._clamp(turn)][row]
+
+    def fertility(self, turn: int, row: int) -> float:
+        """
+        Returns the fertility of a row on the given turn
+        """
+        return self._fertility_by_row[row][self._clamp(turn)]
+
+    def row_types(self, turn: int) -> List[TileType]:
+        """
+        Returns the TileType of every row on the given turn, indexed by row
+        """
+        return self._types_by_turn[self._clamp(turn)]
+
+    def fertility_over_turns(self, row: int, start: int, stop: int) -> List[float]:
+        """
+        Returns the fertility of a row for every turn in [start, stop)
+        :param row: row (y coordinate) to look up
+        :param start: first turn, inclusive
+        :param stop: last turn, exclusive
+        :return: list of stop - start fertility values
+        """
+        column = self._fertility_by_row[row]
+        start = max(start, 0)
+        if stop <= self.last_turn + 1:
+            return column[start:stop].tolist()
+        settled = column[self.last_turn]
+        return column[start:].tolist() + [settled] * (stop - max(start, self.last_turn + 1))
+
+
+timeline = FertilityTimeline()
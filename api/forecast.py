@@ -0,0 +1,152 @@
+from array import array
+from typing import Dict, List
+
+from api.constants import Constants
+from api.fertility import FertilityTimeline, timeline as default_timeline
+from model.crop_type import CropType
+from model.tile_map import TileMap
+
+constants = Constants()
+
+
+class CropForecaster:
+    """
+    Predicts what a crop planted on a given turn and row will be worth when it
+    is ready to harvest.
+
+    Growth model: a crop planted on turn t grows once at the end of every turn
+    until its growth timer runs out. Each growth step adds
+    growth_value * (1 + (fertility - 1) * fertility_sensitivity), using the
+    fertility of the crop's row on that turn. A fertility idol multiplies the
+    fertility. A rain totem makes each turn count as several growth steps, so
+    the crop is ready sooner.
+
+    The fertility of every row is stored as running totals over turns, so one
+    forecast costs O(1) no matter how long the crop takes to grow.
+    """
+
+    def __init__(self, timeline: FertilityTimeline = default_timeline) -> None:
+        self.timeline = timeline
+        self.height = timeline.height
+        self.last_turn = timeline.last_turn
+        self.idol_multiplier = constants.FERTILITY_IDOL_FERTILITY_MULTIPLIER
+        self.totem_multiplier = constants.RAIN_TOTEM_GROWTH_MULTIPLIER
+        # _prefix[row][t] = total fertility of row over turns [0, t)
+        self._prefix = []
+        for row in range(self.height):
+            totals = array('d', [0.0])
+            running = 0.0
+            for fertility in timeline.fertility_over_turns(row, 0, self.last_turn + 1):
+                running += fertility
+                totals.append(running)
+            self._prefix.append(totals)
+        self._settled = [timeline.fertility(self.last_turn, row) for row in range(self.height)]
+
+    def fertility_sum(self, row: int, start: int, stop: int) -> float:
+        """
+        Returns the total fertility of a row over turns [start, stop)
+        """
+        if stop <= start:
+            return 0.0
+        totals = self._prefix[row]
+        end = self.last_turn + 1
+
+        def total_before(turn: int) -> float:
+            if turn <= end:
+                return totals[turn]
+            return totals[end] + (turn - end) * self._settled[row]
+
+        return total_before(stop) - total_before(max(start, 0))
+
+    def growth_turns(self, crop: CropType, rain_totem: bool = False) -> int:
+        """
+        Returns the number of turns a crop needs before it can be harvested
+        """
+        ticks = self.totem_multiplier if rain_totem else 1
+        return -(-crop.growth_time // ticks)
+
+    def ready_turn(self, crop: CropType, turn: int, rain_totem: bool = False) -> int:
+        """
+        Returns the turn on which a crop planted on the given turn is ready
+        """
+        return turn + self.growth_turns(crop, rain_totem)
+
+    def harvest_value(self, crop: CropType, row: int, turn: int,
+                      rain_totem: bool = False, fertility_idol: bool = False) -> float:
+        """
+        Returns the value at harvest of a crop planted on a row on a given turn
+        :param crop: CropType to plant
+        :param row: row (y coordinate) the crop is planted in
+        :param turn: turn the crop is planted on
+        :param rain_totem: whether the tile is under a rain totem
+        :param fertility_idol: whether the tile is under a fertility idol
+        :return: expected crop value once fully grown
+        """
+        return self.grown_value(crop, row, turn, crop.growth_time, rain_totem, fertility_idol)
+
+    def grown_value(self, crop: CropType, row: int, turn: int, steps: int,
+                    rain_totem: bool = False, fertility_idol: bool = False) -> float:
+        """
+        Returns the value a crop gains over its next growth steps, starting at the
+        end of the given turn. For a crop already on the board, pass its growth
+        timer as steps to get what it will add before it is ready.
+        """
+        if steps <= 0:
+            return 0.0
+        ticks = self.totem_multiplier if rain_totem else 1
+        turns = -(-steps // ticks)
+        last_ticks = steps - ticks * (turns - 1)
+        fertility = ticks * self.fertility_sum(row, turn, turn + turns - 1) \
+            + last_ticks * self.fertility_sum(row, turn + turns - 1, turn + turns)
+        if fertility_idol:
+            fertility *= self.idol_multiplier
+        sensitivity = crop.fertility_sensitivity
+        return crop.growth_value * (steps * (1 - sensitivity) + sensitivity * fertility)
+
+    def harvest_profit(self, crop: CropType, row: int, turn: int,
+                       rain_totem: bool = False, fertility_idol: bool = False) -> float:
+        """
+        Returns harvest_value() minus the crop's seed price
+        """
+        return self.harvest_value(crop, row, turn, rain_totem, fertility_idol) - crop.seed_price
+
+    def row_values(self, crop: CropType, turn: int,
+                   rain_totem: bool = False, fertility_idol: bool = False) -> List[float]:
+        """
+        Returns harvest_value() for planting a crop on the given turn, indexed by row
+        """
+        return [self.harvest_value(crop, row, turn, rain_totem, fertility_idol) for row in range(self.height)]
+
+    def value_table(self, crop: CropType, start: int, stop: int) -> List[List[float]]:
+        """
+        Returns harvest values of a crop for every planting turn in [start, stop)
+        and every row, indexed as table[turn - start][row]
+        """
+        return [self.row_values(crop, turn) for turn in range(start, stop)]
+
+    def board_values(self, crop: CropType, turn: int, tile_map: TileMap) -> array:
+        """
+        Returns the harvest value of planting a crop on every cell on the given
+        turn, taking each cell's rain totem and fertility idol effects into
+        account. Indexed like the TileMap columns (y * map_width + x).
+        """
+        width = tile_map.map_width
+        # One row vector per (rain totem, fertility idol) combination
+        by_effect = [[self.row_values(crop, turn, totem, idol) for idol in (False, True)]
+                     for totem in (False, True)]
+        return array('d', [
+            by_effect[totem][idol][i // width]
+            for i, (totem, idol) in enumerate(zip(tile_map.rain_totem_effects, tile_map.fertility_idol_effects))
+        ])
+
+    def best_crops(self, turn: int, row: int, money: float = float('inf')) -> Dict[CropType, float]:
+        """
+        Returns the expected profit per seed of every affordable crop planted on a
+        row on the given turn, most profitable first
+        """
+        profits = {crop: self.harvest_profit(crop, row, turn)
+                   for crop in CropType if crop is not CropType.NONE and crop.seed_price <= money}
+        return dict(sorted(profits.items(), key=lambda item: item[1], reverse=True))
+
+
+forecaster = CropForecaster()
@@ -1,9 +1,12 @@
 from typing import List
 from model.tile_type import TileType
+from model.upgrade_type import UpgradeType
 from model.game_state import GameState
 from model.player import Player
 from model.position import Position
 from api.constants import Constants
+from api.fertility import timeline
+from api.reachability import reachability
 
 import sys
 
@@ -37,7 +40,7 @@ def get_player_from_name(game_state: GameState, name: str) -> Player:
     :param name: name to check
     :return: Player object for that name
     """
-    return game_state.player1 if game_state.player1.name == name else game_state.player2
+    return game_state.player_named(name)
 
 
 def within_move_range(game_state: GameState, name: str) -> List[Position]:
@@ -45,19 +48,31 @@ def within_move_range(game_state: GameState, name: str) -> List[Position]:
     Returns all tiles for which player of input name can go to
     :param game_state: GameState containing information for the game
     :param name: Name of player to get
-    :return: List of positions that the player can move to
+    :return: List of positions that the player can move to (shared, don't modify)
     """
-    my_player = get_player_from_name(game_state, name)
-    speed = my_player.max_movement
-    res = []
+    return game_state.move_range(get_player_from_name(game_state, name))
 
-    for i in range(my_player.position.y - speed, my_player.position.y + speed):
-        leftover_travel = max(0, speed - abs(my_player.position.y - i));
-        for j in range(my_player.position.x - leftover_travel, my_player.position.x + leftover_travel):
-            pos = Position(j, i)
-            if valid_position(pos):
-                res.append(pos)
-    return res
+
+def move_range_mask(game_state: GameState, name: str) -> bytearray:
+    """
+    Returns a board mask (index y * BOARD_WIDTH + x) of the tiles the player can go to
+    :param game_state: GameState containing information for the game
+    :param name: Name of player to get
+    :return: bytearray with a 1 for every reachable tile (shared, don't modify)
+    """
+    return game_state.move_range_mask(get_player_from_name(game_state, name))
+
+
+def move_towards(game_state: GameState, name: str, target: Position) -> Position:
+    """
+    Returns the tile within the player's move range closest to target
+    :param game_state: GameState containing information for the game
+    :param name: Name of player to get
+    :param target: Position the player wants to reach
+    :return: Position to move to this turn
+    """
+    my_player = get_player_from_name(game_state, name)
+    return reachability.step_towards(my_player.position, target, my_player.max_movement)
 
 
 def within_harvest_range(game_state: GameState, name: str) -> List[Position]:
@@ -65,18 +80,22 @@ def within_harvest_range(game_state: GameState, name: str) -> List[Position]:
     Returns all tiles for which player of input name can go to
     :param game_state: GameState containing information for the game
     :param name: Name of player to get
-    :return: List of positions that the player can harvest
+    :return: List of positions that the player can harvest (shared, don't modify)
     """
-    my_player = get_player_from_name(game_state, name)
-    radius = my_player.harvest_radius
-    res = []
+    return game_state.harvest_range(get_player_from_name(game_state, name))
+
 
-    for i in range(my_player.position.y - radius, my_player.position.y + radius + 1):
-        for j in range(my_player.position.x - radius, my_player.position.x + radius + 1):
-            pos = Position(j, i)
-            if distance(my_player.position, pos) <= my_player.harvest_radius and valid_position(pos):
-                res.append(pos)
-    return res
+def loyalty_discount(cost: float, upgrade: UpgradeType) -> float:
+    """
+    Returns the money the loyalty card takes off one seed purchase; it only
+    applies to a buy costing at least GREEN_GROCER_LOYALTY_CARD_MINIMUM
+    :param cost: seed price of everything in the buy
+    :param upgrade: the buyer's UpgradeType
+    :return: money saved, 0 without the loyalty card
+    """
+    if upgrade is not UpgradeType.LOYALTY_CARD or cost < constants.GREEN_GROCER_LOYALTY_CARD_MINIMUM:
+        return 0.0
+    return cost * constants.GREEN_GROCER_LOYALTY_CARD_DISCOUNT
 
 
 def tile_type_on_turn(turn: int, game_state: GameState, coord: Position) -> TileType:
@@ -88,36 +107,7 @@ def tile_type_on_turn(turn: int, game_state: GameState, coord: Position) -> Tile
     :param coord: Coordinate to check at
     :return: TileType corresponding to the tile type of the tile given by coord
     """
-    shifts = (turn - 1 - constants.F_BAND_INIT_DELAY) / constants.F_BAND_MOVE_DELAY;
-    shifts = max(0, shifts);
-
-    row = coord.y
-    newType = TileType.ARID
-
-    # Offset records how far into the fertility zone a row is (negative indicates below)
-    # Init position indicates the first row that will * become * part of a band after the first shift
-    # e.g. 0 = > fertility band starts off the map while 1 = > fertility band starts with 1 row on the map int
-    offset = shifts - row - 1 + constants.FBAND_INIT_POSITION;
-    if (offset < 0):
-        # Below fertility band
-        newType = TileType.SOIL
-    elif offset < constants.FBAND_OUTER_HEIGHT:
-        # Within first outer band
-        newType = TileType.F_BAND_OUTER
-    elif offset < constants.FBAND_OUTER_HEIGHT + constants.FBAND_MID_HEIGHT:
-        # Within first mid band
-        newType = TileType.F_BAND_MID
-    elif offset < constants.FBAND_OUTER_HEIGHT + constants.FBAND_MID_HEIGHT + constants.FBAND_INNER_HEIGHT:
-        # Within inner band
-        newType = TileType.F_BAND_INNER
-    elif offset < constants.FBAND_OUTER_HEIGHT + 2 * constants.FBAND_MID_HEIGHT + constants.FBAND_INNER_HEIGHT:
-        # Within second mid band
-        newType = TileType.F_BAND_MID
-    elif offset < 2 * constants.FBAND_OUTER_HEIGHT + 2 * constants.FBAND_MID_HEIGHT + constants.FBAND_INNER_HEIGHT:
-        # Within second outer band
-        newType = TileType.F_BAND_OUTER
-    else:
-        # Above fertility bands
-        newType = TileType.ARID
-
-    return newType
+    if coord.y < constants.GRASS_ROWS:
+        # The band never reaches the grass strip, so those tiles keep their type
+        return game_state.tile_map.get_tile(coord.x, coord.y).type
+    return timeline.tile_type(turn, coord.y)
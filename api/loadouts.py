@@ -0,0 +1,73 @@
+"""
+Precomputed item and upgrade choices.
+
+resources/loadouts.tsv is written offline by tools.loadout, which plays every
+ItemType x UpgradeType combination of a bot against reference opponents in
+the simulator. It holds one tab-separated row per bot and combination,
+best first:
+
+    bot  item  upgrade  games  win_rate  money
+
+Reading it is a few hundred lines of text, so a bot can pick its loadout at
+startup without playing or searching anything inside the heartbeat window.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import os
+
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+
+LOADOUTS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "loadouts.tsv")
+
+COLUMNS = ('bot', 'item', 'upgrade', 'games', 'win_rate', 'money')
+
+
+class Loadout(NamedTuple):
+    bot: str
+    item: ItemType
+    upgrade: UpgradeType
+    games: int
+    win_rate: float
+    money: float
+
+    def row(self) -> str:
+        return "\t".join((self.bot, self.item.name, self.upgrade.name, str(self.games),
+                          f"{self.win_rate:.4f}", f"{self.money:.1f}"))
+
+
+def load_table(path: str = LOADOUTS_PATH) -> Dict[str, List[Loadout]]:
+    """
+    Returns bot name -> its evaluated loadouts, best first; empty when the
+    table hasn't been generated
+    """
+    table: Dict[str, List[Loadout]] = {}
+    if not os.path.exists(path):
+        return table
+    with open(path) as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            bot, item, upgrade, games, win_rate, money = line.rstrip('\n').split('\t')
+            table.setdefault(bot, []).append(Loadout(bot, ItemType[item], UpgradeType[upgrade],
+                                                     int(games), float(win_rate), float(money)))
+    return table
+
+
+def save_table(table: Dict[str, List[Loadout]], path: str = LOADOUTS_PATH) -> None:
+    with open(path, 'w') as f:
+        f.write("# Written by tools.loadout; one row per bot and item x upgrade, best first\n")
+        f.write("# " + "\t".join(COLUMNS) + "\n")
+        for bot in sorted(table):
+            for loadout in table[bot]:
+                f.write(loadout.row() + "\n")
+
+
+def choose(bot: str, path: str = LOADOUTS_PATH) -> Optional[Tuple[ItemType, UpgradeType]]:
+    """
+    Returns the best (ItemType, UpgradeType) for a bot, or None if the table
+    has nothing for it
+    """
+    loadouts = load_table(path).get(bot)
+    if not loadouts:
+        return None
+    return loadouts[0].item, loadouts[0].upgrade
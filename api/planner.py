@@ -0,0 +1,556 @@
+"""
+Anytime planner over move and action decisions.
+
+The planner searches a tree of half-turns: a move node's children are the
+moves worth considering, and an action node's children are the actions
+worth considering. Each child holds the predicted PlanState after its
+decision. Children are generated lazily and kept, so the tree only ever grows.
+
+The search is an iterative-deepening beam search. For depth 1, 2, 3, ... it
+walks down from the root. At each level it keeps the beam_width best nodes
+by evaluate() and expands them. After every completed depth, the first
+decision on the path to the best leaf becomes the answer. Once the root is
+expanded (which takes a few milliseconds), there is always an answer. The
+search stops when the deadline is reached, or at max_depth. Deeper passes
+re-walk nodes that are already expanded, so most of their cost goes into the
+new bottom level.
+
+The deadline is Constants.PLAYER_TIMEOUT minus a safety margin, counted
+from the moment the game state was read (see Game.remaining_budget_ms). It
+can be capped with think_ms. The subtree under the decision that was sent is
+kept as the next root when the next observed state matches its prediction,
+so work done while planning ahead is not thrown away.
+
+The model tracks this player and the opponent's position. The opponent
+harvests our ripe crops in its reach that our protection radius or scarecrow
+doesn't cover, and its protection radius stops us harvesting next to it. While
+it has mostly been shadowing us, i.e. stepping towards where we stood at the
+start of each turn as a thief like bot2 does, it is assumed to keep doing so;
+otherwise it is assumed to stay where it is. Only crops this planner planted
+count towards the plan, and ripe crops left where the opponent gets to before
+we do count for less.
+Harvesting, planting, buying and selling follow the same rules as
+tools.simulator, with crop values from api.forecast. Items are not used.
+"""
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from api import game_util
+from api.constants import Constants
+from api.forecast import forecaster
+from api.reachability import reachability
+from api.threat import ThreatMap
+from api.trips import GrocerMap
+from model.crop_type import CropType
+from model.decisions.action_decision import ActionDecision
+from model.decisions.buy_decision import BuyDecision
+from model.decisions.do_nothing_decision import DoNothingDecision
+from model.decisions.harvest_decision import HarvestDecision
+from model.decisions.move_decision import MoveDecision
+from model.decisions.plant_decision import PlantDecision
+from model.game_state import GameState
+from model.position import Position
+
+constants = Constants()
+
+MOVE = 0
+ACTION = 1
+
+_CROPS = tuple(crop for crop in CropType if crop is not CropType.NONE)
+
+# Milliseconds kept back from the engine timeout for encoding and writing
+DEFAULT_MARGIN_MS = 250.0
+
+# Share of a planted crop's forecast value counted before it is harvested
+_GROWING_DISCOUNT = 0.9
+# Share of the value of carried crops counted before they are sold
+_CARRIED_DISCOUNT = 0.95
+# Share of a crop's value assumed lost when the opponent can reach it first
+_THEFT_RISK = 0.9
+# Share of the value of seeds or crops lost per turn still needed to grow them
+# or reach where they pay off. Without it, every plan that hasn't planted or sold
+# yet scores the same and the beam can't tell progress from standing still.
+_TRAVEL_COST = 0.01
+
+
+class PlannedCrop(NamedTuple):
+    index: int
+    crop_type: CropType
+    ready_turn: int
+    value: float
+
+
+class PlanState(NamedTuple):
+    turn: int
+    phase: int
+    position: Position
+    opponent: Position
+    money: float
+    # Seed counts, indexed like _CROPS
+    seeds: Tuple[int, ...]
+    carried: int
+    carried_value: float
+    # Crops this player planted that are still on the board
+    crops: Tuple[PlannedCrop, ...]
+
+    def key(self) -> tuple:
+        """
+        Identifies a state by what the player controls; predicted crop values
+        don't have to match the engine's to the last digit
+        """
+        return (self.turn, self.phase, self.position, self.opponent, round(self.money, 2), self.seeds,
+                self.carried, tuple(sorted(crop.index for crop in self.crops)))
+
+
+class PlanNode:
+    __slots__ = ('state', 'decision', 'parent', 'children', 'value')
+
+    def __init__(self, state: PlanState, decision, parent: Optional['PlanNode'], value: float) -> None:
+        self.state = state
+        self.decision = decision
+        self.parent = parent
+        self.children: Optional[List['PlanNode']] = None
+        self.value = value
+
+
+class _Context:
+    """
+    What the planner knows about the board this half-turn, besides the PlanState
+    """
+
+    def __init__(self, game_state: GameState, threat: ThreatMap) -> None:
+        me = game_state.get_my_player()
+        opponent = game_state.get_opponent_player()
+        tile_map = game_state.tile_map
+        self.width = tile_map.map_width
+        self.height = tile_map.map_height
+        self.max_movement = me.max_movement
+        self.harvest_radius = me.harvest_radius
+        self.protection_radius = me.protection_radius
+        self.plant_radius = me.plant_radius
+        self.capacity = me.carring_capacity
+        self.upgrade = me.upgrade
+        self.delivery_drone = me.has_delivery_drone
+        self.opponent_movement = opponent.max_movement
+        self.opponent_harvest_radius = opponent.harvest_radius
+        self.opponent_protection_radius = opponent.protection_radius
+        self.threat = threat
+        self.shadowed = False
+        self.occupied = tile_map.crop_mask()
+        self.rain_totems = tile_map.rain_totem_effects
+        self.fertility_idols = tile_map.fertility_idol_effects
+        self.grocer_map = GrocerMap.of(tile_map)
+        self.grocer_mask = self.grocer_map.mask
+
+
+class Planner:
+    """
+    Keep one Planner for the whole game and call decide_move() and
+    decide_action() with the Game every half-turn
+    """
+
+    def __init__(self, margin_ms: float = DEFAULT_MARGIN_MS, think_ms: Optional[float] = None,
+                 beam_width: int = 12, max_depth: int = 10) -> None:
+        """
+        :param margin_ms: milliseconds kept back from Constants.PLAYER_TIMEOUT
+        :param think_ms: optional cap on the time spent searching per half-turn
+        :param beam_width: nodes kept at every level of the beam search
+        :param max_depth: half-turns to look ahead before stopping early
+        """
+        self.margin_ms = margin_ms
+        self.think_ms = think_ms
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.root: Optional[PlanNode] = None
+        self.context: Optional[_Context] = None
+        self.threat = ThreatMap()
+        # Cell index -> crop type of everything this planner planted
+        self.mine: Dict[int, CropType] = {}
+        self._row_values: Dict[Tuple[CropType, int], List[float]] = {}
+        # Turns the opponent did and didn't step towards us, and both
+        # positions at the start of the last turn
+        self.shadowing = [0, 0]
+        self._last_positions: Optional[Tuple[Position, Position]] = None
+        self.stats = {'reused': 0, 'rebuilt': 0, 'expanded': 0, 'depth': 0}
+
+    # Entry points
+
+    def decide_move(self, game) -> MoveDecision:
+        return self._decide(game, MOVE)
+
+    def decide_action(self, game) -> ActionDecision:
+        decision = self._decide(game, ACTION)
+        if isinstance(decision, PlantDecision):
+            for crop_type, position in zip(decision.crop_types, decision.coords):
+                self.mine[position.y * self.context.width + position.x] = crop_type
+        return decision
+
+    def deadline(self, game) -> float:
+        """
+        Returns the perf_counter() time the search must stop by
+        """
+        budget_ms = game.remaining_budget_ms() - self.margin_ms
+        if self.think_ms is not None:
+            budget_ms = min(budget_ms, self.think_ms)
+        return perf_counter() + max(budget_ms, 0.0) / 1000
+
+    def _decide(self, game, phase: int):
+        deadline = self.deadline(game)
+        game_state = game.get_game_state()
+        self.threat.update(game_state, moved=phase == ACTION)
+        self.context = _Context(game_state, self.threat)
+        if phase == MOVE:
+            self._watch(game_state)
+        self.context.shadowed = self.shadowing[0] > self.shadowing[1]
+        root = self._reroot(self._observe(game_state, phase))
+        best = self._search(root, deadline)
+        if best is None:
+            return MoveDecision(root.state.position) if phase == MOVE else DoNothingDecision()
+        best.parent = None
+        self.root = best
+        return best.decision
+
+    def _watch(self, game_state: GameState) -> None:
+        """
+        Records whether the opponent's last move went where shadowing us would
+        have taken it. Turns it didn't need to move either way tell nothing.
+        """
+        me = game_state.get_my_player().position
+        opponent = game_state.get_opponent_player().position
+        if self._last_positions is not None:
+            last_me, last_opponent = self._last_positions
+            shadow = reachability.step_towards(last_opponent, last_me, self.context.opponent_movement)
+            if shadow != last_opponent or opponent != last_opponent:
+                self.shadowing[opponent != shadow] += 1
+        self._last_positions = (me, opponent)
+
+    # Tree
+
+    def _observe(self, game_state: GameState, phase: int) -> PlanState:
+        me = game_state.get_my_player()
+        tile_map = game_state.tile_map
+        turn = game_state.turn
+        width = tile_map.map_width
+        crops = []
+        for index, crop_type in list(self.mine.items()):
+            if tile_map.crop_types[index] is not crop_type:
+                del self.mine[index]
+                continue
+            value = tile_map.crop_values[index] + forecaster.grown_value(
+                crop_type, index // width, turn, tile_map.growth_timers[index],
+                bool(tile_map.rain_totem_effects[index]), bool(tile_map.fertility_idol_effects[index]))
+            crops.append(PlannedCrop(index, crop_type, turn + tile_map.turns_left_to_grow[index], value))
+        carried = me.harvested_inventory
+        return PlanState(turn, phase, me.position, game_state.get_opponent_player().position, me.money,
+                         tuple(me.seed_inventory.get(crop, 0) for crop in _CROPS),
+                         len(carried), sum(crop['value'] for crop in carried), tuple(crops))
+
+    def _reroot(self, observed: PlanState) -> PlanNode:
+        """
+        Returns the root for this half-turn. When the state matches what the
+        previous search predicted, the old subtree is kept. The root's children
+        are always regenerated, because the board may have changed around the
+        player, and each new child inherits the subtree of the old child it matches.
+        """
+        old = self.root
+        root = PlanNode(observed, None, None, self.evaluate(observed))
+        if old is None or old.state.key() != observed.key():
+            self.stats['rebuilt'] += 1
+            return root
+        self.stats['reused'] += 1
+        if old.children is not None:
+            subtrees = {(child.state.key(), child.decision.engine_str()): child for child in old.children}
+            self._expand(root)
+            for child in root.children:
+                previous = subtrees.get((child.state.key(), child.decision.engine_str()))
+                if previous is not None and previous.children is not None:
+                    child.children = previous.children
+                    for grandchild in child.children:
+                        grandchild.parent = child
+        return root
+
+    def _expand(self, node: PlanNode) -> List[PlanNode]:
+        if node.children is None:
+            successors = self._moves(node.state) if node.state.phase == MOVE else self._actions(node.state)
+            node.children = [PlanNode(state, decision, node, self.evaluate(state))
+                             for decision, state in successors]
+            self.stats['expanded'] += 1
+        return node.children
+
+    def _search(self, root: PlanNode, deadline: float) -> Optional[PlanNode]:
+        children = self._expand(root)
+        if not children:
+            return None
+        best = max(children, key=lambda node: node.value)
+        self.stats['depth'] = 1
+        for depth in range(2, self.max_depth + 1):
+            if root.state.turn + depth // 2 >= constants.LAST_TURN:
+                break
+            frontier = children
+            for _ in range(depth - 1):
+                level = []
+                for node in frontier:
+                    if perf_counter() >= deadline:
+                        return best
+                    level.extend(self._expand(node))
+                if not level:
+                    break
+                level.sort(key=lambda node: node.value, reverse=True)
+                frontier = level[:self.beam_width]
+            leaf = frontier[0]
+            while leaf.parent is not root:
+                leaf = leaf.parent
+            best = leaf
+            self.stats['depth'] = depth
+        return best
+
+    # Model
+
+    def evaluate(self, state: PlanState) -> float:
+        """
+        Returns the estimated final money of a state: money, plus carried crops
+        and planted crops that can still be sold in time (discounted), plus
+        seeds that can still grow and be sold at their price, minus a small cost
+        for the turns still needed to grow and reach the planted crops, sell the
+        carried crops or reach the row to plant the seeds in
+        """
+        context = self.context
+        position = state.position
+        turns_left = constants.LAST_TURN - state.turn
+        value = state.money
+        if state.carried:
+            travel = context.grocer_map.turns(position, context.max_movement)
+            if travel < turns_left:
+                value += state.carried_value * (_CARRIED_DISCOUNT - _TRAVEL_COST * travel)
+        width = context.width
+        for crop in state.crops:
+            x, y = crop.index % width, crop.index // width
+            if crop.ready_turn + context.grocer_map.turns(Position(x, y), context.max_movement) \
+                    >= constants.LAST_TURN or self._blocked(state, crop):
+                continue
+            distance = abs(x - position.x) + abs(y - position.y)
+            wait = max(crop.ready_turn - state.turn, -(-distance // context.max_movement))
+            share = _GROWING_DISCOUNT - _TRAVEL_COST * wait
+            if self._exposed(state, crop, distance):
+                share *= 1 - _THEFT_RISK
+            value += crop.value * share
+        for crop, count in zip(_CROPS, state.seeds):
+            if count:
+                row = self._best_row(crop, state.turn)
+                travel = -(-abs(row - position.y) // context.max_movement)
+                # There and back again, taking the grocer to be about as far as we are
+                if state.turn + 2 * travel + crop.growth_time < constants.LAST_TURN:
+                    value += count * crop.seed_price * (1 - _TRAVEL_COST * travel)
+        return value
+
+    def _blocked(self, state: PlanState, crop: PlannedCrop) -> bool:
+        """
+        Returns whether a crop is ripe and the opponent stands close enough to
+        stop us harvesting it. It's as good as lost: the opponent takes it as
+        soon as we step away.
+        """
+        if crop.ready_turn > state.turn:
+            return False
+        context = self.context
+        x, y = crop.index % context.width, crop.index // context.width
+        return abs(x - state.opponent.x) + abs(y - state.opponent.y) <= context.opponent_protection_radius \
+            or context.threat.theirs(crop.index)
+
+    def _exposed(self, state: PlanState, crop: PlannedCrop, distance: int) -> bool:
+        """
+        Returns whether a crop is ripe before we can get back within protection
+        radius of it, and the opponent can reach it by then
+        """
+        context = self.context
+        if distance <= context.protection_radius or context.threat.ours(crop.index):
+            return False
+        back = state.turn + -(-(distance - context.protection_radius) // context.max_movement)
+        if crop.ready_turn >= back:
+            return False
+        x, y = crop.index % context.width, crop.index // context.width
+        reach = abs(x - state.opponent.x) + abs(y - state.opponent.y) - context.opponent_harvest_radius
+        return state.turn + -(-max(0, reach) // context.opponent_movement) <= back
+
+    def _row_value(self, crop: CropType, turn: int) -> List[float]:
+        key = (crop, turn)
+        values = self._row_values.get(key)
+        if values is None:
+            values = self._row_values[key] = forecaster.row_values(crop, turn)
+        return values
+
+    def _best_row(self, crop: CropType, turn: int) -> int:
+        values = self._row_value(crop, turn)
+        return max(range(constants.GRASS_ROWS, len(values)), key=values.__getitem__)
+
+    def _moves(self, state: PlanState) -> List[Tuple[MoveDecision, PlanState]]:
+        context = self.context
+        position = state.position
+        targets = [position]
+        grocer = context.grocer_map.nearest_grocer(position)
+        if grocer is not None:
+            targets.append(grocer)
+        for crop in state.crops:
+            if crop.ready_turn <= state.turn + 1:
+                targets.append(Position(crop.index % context.width, crop.index // context.width))
+        for crop, count in zip(_CROPS, state.seeds):
+            if count:
+                targets.append(Position(position.x, self._best_row(crop, state.turn + 1)))
+
+        # A shadowing opponent steps towards where we are now while we move
+        opponent = state.opponent
+        if context.shadowed:
+            opponent = reachability.step_towards(opponent, position, context.opponent_movement)
+        moves = []
+        seen = set()
+        for target in targets:
+            destination = reachability.step_towards(position, target, context.max_movement)
+            if destination in seen:
+                continue
+            seen.add(destination)
+            money, carried, carried_value = state.money, state.carried, state.carried_value
+            if carried and context.grocer_mask[destination.y * context.width + destination.x]:
+                money, carried, carried_value = money + carried_value, 0, 0.0
+            moves.append((MoveDecision(destination),
+                          state._replace(phase=ACTION, position=destination, opponent=opponent, money=money,
+                                         carried=carried, carried_value=carried_value)))
+        return moves
+
+    def _actions(self, state: PlanState) -> List[Tuple[ActionDecision, PlanState]]:
+        after = state._replace(turn=state.turn + 1, phase=MOVE)
+        actions = [(DoNothingDecision(), after)]
+        harvest = self._harvest(after, state)
+        if harvest is not None:
+            actions.append(harvest)
+        plant = self._plant(after, state)
+        if plant is not None:
+            actions.append(plant)
+        actions.extend(self._buy(after, state))
+        return [(decision, self._steal(successor)) for decision, successor in actions]
+
+    def _steal(self, state: PlanState) -> PlanState:
+        """
+        Removes the ripe crops the opponent harvests at the end of a turn
+        """
+        context = self.context
+        width = context.width
+        position, opponent = state.position, state.opponent
+        kept = tuple(crop for crop in state.crops
+                     if crop.ready_turn >= state.turn
+                     or abs(crop.index % width - opponent.x) + abs(crop.index // width - opponent.y)
+                     > context.opponent_harvest_radius
+                     or abs(crop.index % width - position.x) + abs(crop.index // width - position.y)
+                     <= context.protection_radius
+                     or context.threat.ours(crop.index))
+        return state if len(kept) == len(state.crops) else state._replace(crops=kept)
+
+    def _harvest(self, after: PlanState, state: PlanState) -> Optional[Tuple[ActionDecision, PlanState]]:
+        context = self.context
+        position, opponent = state.position, state.opponent
+        room = context.capacity - state.carried
+        ready = []
+        for crop in state.crops:
+            x, y = crop.index % context.width, crop.index // context.width
+            if crop.ready_turn <= state.turn \
+                    and abs(x - position.x) + abs(y - position.y) <= context.harvest_radius \
+                    and abs(x - opponent.x) + abs(y - opponent.y) > context.opponent_protection_radius \
+                    and not context.threat.theirs(crop.index):
+                ready.append(crop)
+        if not ready or room <= 0:
+            return None
+        ready.sort(key=lambda crop: crop.value, reverse=True)
+        taken = ready[:room]
+        taken_indices = {crop.index for crop in taken}
+        value = sum(crop.value for crop in taken)
+        crops = tuple(crop for crop in state.crops if crop.index not in taken_indices)
+        if context.delivery_drone:
+            after = after._replace(money=state.money + value, crops=crops)
+        else:
+            after = after._replace(carried=state.carried + len(taken), carried_value=state.carried_value + value,
+                                   crops=crops)
+        decision = HarvestDecision([Position(crop.index % context.width, crop.index // context.width)
+                                    for crop in taken])
+        return decision, after
+
+    def _plant(self, after: PlanState, state: PlanState) -> Optional[Tuple[ActionDecision, PlanState]]:
+        if not any(state.seeds):
+            return None
+        context = self.context
+        width = context.width
+        taken = {crop.index for crop in state.crops}
+        cells = [cell for cell in reachability.positions(state.position, context.plant_radius)
+                 if cell.y >= constants.GRASS_ROWS and not context.occupied[cell.y * width + cell.x]
+                 and cell.y * width + cell.x not in taken]
+        if not cells:
+            return None
+
+        # Plant the most valuable seeds first, each on the best cell left for it,
+        # preferring cells the opponent can't harvest from its next move
+        threat = context.threat
+        back = context.grocer_map.turns(state.position, context.max_movement)
+        options = []
+        for crop, count in zip(_CROPS, state.seeds):
+            if count == 0 or state.turn + crop.growth_time + back >= constants.LAST_TURN:
+                continue
+            for cell in cells:
+                index = cell.y * width + cell.x
+                value = forecaster.harvest_value(crop, cell.y, state.turn, bool(context.rain_totems[index]),
+                                                 bool(context.fertility_idols[index]))
+                expected = value
+                if threat.outpaced(index, 2):
+                    expected *= 1 - _THEFT_RISK
+                options.append((expected, value, crop, cell, index))
+        options.sort(key=lambda option: option[0], reverse=True)
+        seeds = list(state.seeds)
+        used = set()
+        planted = []
+        for _, value, crop, cell, index in options:
+            slot = _CROPS.index(crop)
+            if index in used or seeds[slot] == 0:
+                continue
+            seeds[slot] -= 1
+            used.add(index)
+            ticks = constants.RAIN_TOTEM_GROWTH_MULTIPLIER if context.rain_totems[index] else 1
+            planted.append(PlannedCrop(index, crop, state.turn + -(-crop.growth_time // ticks), value))
+        if not planted:
+            return None
+        decision = PlantDecision([crop.crop_type for crop in planted],
+                                 [Position(crop.index % width, crop.index // width) for crop in planted])
+        return decision, after._replace(seeds=tuple(seeds), crops=state.crops + tuple(planted))
+
+    def _buy(self, after: PlanState, state: PlanState) -> List[Tuple[ActionDecision, PlanState]]:
+        context = self.context
+        position = state.position
+        if not context.grocer_mask[position.y * context.width + position.x]:
+            return []
+        # Cells within the plant radius: enough seeds for one or three plantings
+        radius = context.plant_radius
+        plot = 2 * radius * radius + 2 * radius + 1
+        buys = []
+        for crop in _CROPS:
+            if crop.seed_price <= 0 or crop.seed_price > state.money:
+                continue
+            row = self._best_row(crop, state.turn)
+            plant_turn = state.turn + reachability.turns_to_reach(position, Position(position.x, row),
+                                                                  context.max_movement)
+            value = self._row_value(crop, plant_turn)[row]
+            travel = plant_turn - state.turn
+            if plant_turn + crop.growth_time + travel >= constants.LAST_TURN \
+                    or value * _GROWING_DISCOUNT <= crop.seed_price:
+                continue
+            profit = value * _GROWING_DISCOUNT - crop.seed_price
+            buys.append((profit / (travel + crop.growth_time), crop))
+        buys.sort(key=lambda buy: buy[0], reverse=True)
+
+        actions = []
+        for _, crop in buys[:2]:
+            for quantity in sorted({min(plot, int(state.money // crop.seed_price)),
+                                    min(3 * plot, int(state.money // crop.seed_price))}):
+                cost = crop.seed_price * quantity
+                cost -= game_util.loyalty_discount(cost, context.upgrade)
+                if quantity <= 0 or cost > state.money:
+                    continue
+                seeds = list(state.seeds)
+                seeds[_CROPS.index(crop)] += quantity
+                actions.append((BuyDecision([crop], [quantity]),
+                                after._replace(money=state.money - cost, seeds=tuple(seeds))))
+        return actions
@@ -0,0 +1,141 @@
+"""
+Seed purchase planning.
+
+Given the money to spend, the turn and the player's upgrade, SeedPortfolio
+picks how many seeds of each crop to buy for the best expected return. The
+value of a seed comes from api.forecast. It is the value of the crop planted
+in its best row once the player has walked there from the grocer, or nothing
+if it wouldn't be ready before the last turn. Quick crops free their money
+sooner, so the profit is counted once for every buy-grow-sell cycle that
+fits in the turns left.
+
+Choosing the mix is a small knapsack: every seed costs its price and one
+slot of carrying capacity. It is solved exactly by dynamic programming over
+(seeds bought, money spent), with money counted in MONEY_BUCKET steps. Since
+the spend is known exactly, the loyalty card discount, which only applies to
+buys of at least GREEN_GROCER_LOYALTY_CARD_MINIMUM, is added where it applies.
+It is saved on this buy only, so it is added once to the total rather than
+counted for every cycle like the seed profits.
+
+Everything the answer depends on follows from (money bucket, turn, upgrade),
+so answers are memoized by that key, and visiting the grocer again in the
+same situation costs a dict lookup.
+"""
+from typing import Dict, List, Tuple
+
+from api import game_util
+from api.constants import Constants
+from api.forecast import forecaster
+from model.crop_type import CropType
+from model.decisions.buy_decision import BuyDecision
+from model.upgrade_type import UpgradeType
+
+constants = Constants()
+
+_CROPS = tuple(crop for crop in CropType if crop is not CropType.NONE)
+
+# Money is counted in steps of this size; every seed price is a multiple of it
+MONEY_BUCKET = 5.0
+
+_NONE = float('-inf')
+
+
+class SeedPortfolio:
+
+    def __init__(self, money_bucket: float = MONEY_BUCKET) -> None:
+        self.money_bucket = money_bucket
+        self._solutions: Dict[Tuple[int, int, UpgradeType], Dict[CropType, int]] = {}
+
+    def seed_profits(self, turn: int, upgrade: UpgradeType) -> Dict[CropType, float]:
+        """
+        Returns the expected return per seed of every crop worth buying on a
+        turn: its profit, times the number of times the money can be put
+        through the same crop (buy, walk to the row, grow, walk back and sell)
+        before the game ends
+        """
+        movement = constants.LONGER_LEGS_MAX_MOVEMENT \
+            if upgrade is UpgradeType.LONGER_LEGS else constants.MAX_MOVEMENT
+        profits = {}
+        for crop in _CROPS:
+            best = None
+            for row in range(constants.GRASS_ROWS, forecaster.height):
+                # Walk from the grocer (row 0) to the row, then plant
+                walk = -(-row // movement)
+                ready = forecaster.ready_turn(crop, turn + walk)
+                if ready >= constants.LAST_TURN:
+                    continue
+                profit = forecaster.harvest_value(crop, row, turn + walk) - crop.seed_price
+                cycles = max((constants.LAST_TURN - turn) // (ready - turn + walk + 1), 1)
+                if best is None or profit * cycles > best:
+                    best = profit * cycles
+            if best is not None and best > 0:
+                profits[crop] = best
+        return profits
+
+    def solve(self, money: float, turn: int, upgrade: UpgradeType) -> Dict[CropType, int]:
+        """
+        Returns how many seeds of each crop to buy
+        :param money: money available to spend
+        :param turn: turn the seeds are bought on
+        :param upgrade: the player's upgrade (movement, capacity and discount)
+        :return: dict of CropType -> positive count, empty if nothing is worth buying
+        """
+        key = (int(money // self.money_bucket), turn, upgrade)
+        counts = self._solutions.get(key)
+        if counts is None:
+            counts = self._solutions[key] = self._knapsack(key[0], turn, upgrade)
+        return dict(counts)
+
+    def decision(self, money: float, turn: int, upgrade: UpgradeType) -> BuyDecision:
+        return BuyDecision.from_counts(self.solve(money, turn, upgrade))
+
+    def _knapsack(self, budget: int, turn: int, upgrade: UpgradeType) -> Dict[CropType, int]:
+        profits = self.seed_profits(turn, upgrade)
+        bucket = self.money_bucket
+        items = [(crop, int(-(-crop.seed_price // bucket)), profit) for crop, profit in profits.items()]
+        items = [item for item in items if item[1] <= budget]
+        if not items:
+            return {}
+        max_seeds = constants.BACKPACK_CARRYING_CAPACITY \
+            if upgrade is UpgradeType.BACKPACK else constants.CARRYING_CAPACITY
+        # No point in tracking more money than max_seeds of the dearest seed
+        budget = min(budget, max_seeds * max(cost for _, cost, _ in items))
+
+        # best[s][m]: most profit from exactly s seeds costing exactly m buckets,
+        # chosen[s][m]: the item added to best[s - 1] to get it
+        best: List[List[float]] = [[0.0] + [_NONE] * budget]
+        chosen: List[List[int]] = [[-1] * (budget + 1)]
+        for seeds in range(1, max_seeds + 1):
+            previous = best[-1]
+            row = [_NONE] * (budget + 1)
+            choice = [-1] * (budget + 1)
+            for i, (_, cost, profit) in enumerate(items):
+                for spent, value in enumerate(previous[:budget + 1 - cost], cost):
+                    value += profit
+                    if value > row[spent]:
+                        row[spent] = value
+                        choice[spent] = i
+            best.append(row)
+            chosen.append(choice)
+
+        top, top_at = 0.0, (0, 0)
+        for seeds in range(1, max_seeds + 1):
+            for spent, value in enumerate(best[seeds]):
+                if value == _NONE:
+                    continue
+                # Once per buy, not per cycle like the seed profits
+                value += game_util.loyalty_discount(spent * bucket, upgrade)
+                if value > top:
+                    top, top_at = value, (seeds, spent)
+
+        # Walk back through the seeds chosen on the way to the best cell
+        counts: Dict[CropType, int] = {}
+        seeds, spent = top_at
+        while seeds:
+            crop, cost, _ = items[chosen[seeds][spent]]
+            counts[crop] = counts.get(crop, 0) + 1
+            seeds, spent = seeds - 1, spent - cost
+        return counts
+
+
+portfolio = SeedPortfolio()
@@ -0,0 +1,107 @@
+from typing import Dict, List, Tuple
+
+from api.constants import Constants
+from model.position import Position
+
+constants = Constants()
+
+
+class Reachability:
+    """
+    Answers movement questions on the board without enumerating cells.
+
+    The cells within Manhattan distance r of a point form a diamond. Each
+    radius is stored once as row spans, (dy, half_width) pairs, so the
+    reachable area around any position is a handful of slice writes into a
+    bytearray mask. The closest reachable cell toward a target, and the
+    number of turns needed to reach it, are computed in closed form.
+    """
+
+    def __init__(self, width: int = constants.BOARD_WIDTH, height: int = constants.BOARD_HEIGHT) -> None:
+        self.width = width
+        self.height = height
+        self._spans: Dict[int, List[Tuple[int, int]]] = {}
+        self._ones = b'\x01' * width
+        for radius in (constants.MAX_MOVEMENT,
+                       constants.LONGER_LEGS_MAX_MOVEMENT,
+                       constants.MAX_MOVEMENT * constants.COFFEE_THERMOS_MOVEMENT_MULTIPLIER):
+            self.spans(radius)
+
+    def spans(self, radius: int) -> List[Tuple[int, int]]:
+        """
+        Returns the diamond of the given radius as (dy, half_width) row spans
+        """
+        spans = self._spans.get(radius)
+        if spans is None:
+            spans = [(dy, radius - abs(dy)) for dy in range(-radius, radius + 1)]
+            self._spans[radius] = spans
+        return spans
+
+    def valid(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def mask(self, position: Position, radius: int) -> bytearray:
+        """
+        Returns a board mask (index y * width + x) of every cell within radius
+        of position
+        """
+        width = self.width
+        mask = bytearray(width * self.height)
+        for dy, half_width in self.spans(radius):
+            y = position.y + dy
+            if not 0 <= y < self.height:
+                continue
+            start = max(position.x - half_width, 0)
+            stop = min(position.x + half_width + 1, width)
+            if start < stop:
+                mask[y * width + start:y * width + stop] = self._ones[:stop - start]
+        return mask
+
+    def positions(self, position: Position, radius: int) -> List[Position]:
+        """
+        Returns every on-board Position within radius of position
+        """
+        res = []
+        for dy, half_width in self.spans(radius):
+            y = position.y + dy
+            if not 0 <= y < self.height:
+                continue
+            for x in range(max(position.x - half_width, 0), min(position.x + half_width + 1, self.width)):
+                res.append(Position(x, y))
+        return res
+
+    def step_towards(self, position: Position, target: Position, radius: int) -> Position:
+        """
+        Returns the reachable cell closest (by Manhattan distance) to target
+        :param position: where the player is now
+        :param target: where the player wants to go; clamped onto the board
+        :param radius: how far the player can move this turn
+        :return: Position to move to
+        """
+        target_x = min(max(target.x, 0), self.width - 1)
+        target_y = min(max(target.y, 0), self.height - 1)
+        dx = target_x - position.x
+        dy = target_y - position.y
+        if abs(dx) + abs(dy) <= radius:
+            return Position(target_x, target_y)
+        step_x = max(-radius, min(radius, dx))
+        left = radius - abs(step_x)
+        step_y = max(-left, min(left, dy))
+        return Position(position.x + step_x, position.y + step_y)
+
+    def turns_to_reach(self, position: Position, target: Position, radius: int) -> int:
+        """
+        Returns the number of move steps needed to get from position to target
+        """
+        distance = abs(position.x - target.x) + abs(position.y - target.y)
+        return -(-distance // radius)
+
+    def turns_to_reach_all(self, target: Position, radius: int) -> List[int]:
+        """
+        Returns turns_to_reach() from every cell to target, indexed y * width + x
+        """
+        return [-(-(abs(x - target.x) + abs(y - target.y)) // radius)
+                for y in range(self.height) for x in range(self.width)]
+
+
+reachability = Reachability()
@@ -0,0 +1,177 @@
+"""
+Per-cell view of who can harvest what.
+
+For every cell the ThreatMap holds:
+  * steps: how many moves the opponent needs before the cell is within its
+    harvest radius (0 = it can harvest there without moving)
+  * covered: whether our protection radius or our scarecrow stops the
+    opponent harvesting there
+  * blocked: whether the opponent's protection radius or scarecrow stops us
+    harvesting there
+
+All three are bytearrays indexed like the TileMap columns (y * width + x), so
+a query is one index. The distance field around a player is a translation of
+one fixed template, so these are cut out of templates cached per radius:
+each row of the field is a single slice copy. update() only redoes the parts
+whose inputs changed, i.e. a player moved, a radius changed or a scarecrow was
+placed.
+"""
+from array import array
+from typing import Dict, Optional, Tuple
+
+from api.constants import Constants
+from model.game_state import GameState
+from model.position import Position
+
+constants = Constants()
+
+
+class ThreatMap:
+
+    def __init__(self, width: int = constants.BOARD_WIDTH, height: int = constants.BOARD_HEIGHT) -> None:
+        self.width = width
+        self.height = height
+        size = width * height
+        self.steps = bytearray(size)
+        self.covered = bytearray(size)
+        self.blocked = bytearray(size)
+        self.turn = 0
+        self.moved = False
+        self._templates: Dict[Tuple, bytes] = {}
+        # Inputs the current fields were built from
+        self._steps_key = None
+        self._covered_key = None
+        self._blocked_key = None
+        self._scarecrows: Optional[array] = None
+        self._ours = bytearray(size)
+        self._theirs = bytearray(size)
+
+    # Templates
+
+    def _template(self, kind: str, radius: int, movement: int = 1) -> bytes:
+        """
+        Returns a (2 * height - 1) x (2 * width - 1) grid centred on a player.
+        'steps' cells hold the moves needed to get within radius of the cell
+        (capped at 255); 'diamond' cells are 1 within radius
+        """
+        key = (kind, radius, movement)
+        template = self._templates.get(key)
+        if template is None:
+            width, height = self.width, self.height
+            values = bytearray()
+            for dy in range(1 - height, height):
+                for dx in range(1 - width, width):
+                    distance = abs(dx) + abs(dy)
+                    if kind == 'steps':
+                        values.append(min(255, -(-max(0, distance - radius) // max(movement, 1))))
+                    else:
+                        values.append(distance <= radius)
+            template = self._templates[key] = bytes(values)
+        return template
+
+    def _cut(self, template: bytes, position: Position, out: bytearray) -> None:
+        """
+        Copies the board-sized window of a template centred on position into out
+        """
+        width, height = self.width, self.height
+        span = 2 * width - 1
+        start_x = width - 1 - position.x
+        for y in range(height):
+            start = (y - position.y + height - 1) * span + start_x
+            out[y * width:(y + 1) * width] = template[start:start + width]
+
+    # Updates
+
+    def update(self, game_state: GameState, moved: bool = False) -> None:
+        """
+        Refreshes the map for a new game state
+        :param game_state: the state just received
+        :param moved: whether both players have already moved this turn (the
+                      action phase); used by earliest_turn()
+        """
+        me = game_state.get_my_player()
+        opponent = game_state.get_opponent_player()
+        my_num = game_state.player_num
+        self.turn = game_state.turn
+        self.moved = moved
+
+        scarecrows = game_state.tile_map.scarecrow_effects
+        if scarecrows != self._scarecrows:
+            self._scarecrows = array('i', scarecrows)
+            self._ours = bytearray(value == my_num for value in scarecrows)
+            self._theirs = bytearray(value not in (-1, my_num) for value in scarecrows)
+            self._covered_key = self._blocked_key = None
+
+        key = (opponent.position, opponent.harvest_radius, opponent.max_movement)
+        if key != self._steps_key:
+            self._cut(self._template('steps', opponent.harvest_radius, opponent.max_movement),
+                      opponent.position, self.steps)
+            self._steps_key = key
+
+        key = (me.position, me.protection_radius)
+        if key != self._covered_key:
+            self._cut(self._template('diamond', me.protection_radius), me.position, self.covered)
+            self._merge(self.covered, self._ours)
+            self._covered_key = key
+
+        key = (opponent.position, opponent.protection_radius)
+        if key != self._blocked_key:
+            self._cut(self._template('diamond', opponent.protection_radius), opponent.position, self.blocked)
+            self._merge(self.blocked, self._theirs)
+            self._blocked_key = key
+
+    @staticmethod
+    def _merge(mask: bytearray, extra: bytearray) -> None:
+        if any(extra):
+            mask[:] = bytes(a | b for a, b in zip(mask, extra))
+
+    # Queries
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def earliest_turn(self, index: int) -> int:
+        """
+        Returns the earliest turn the opponent could be within harvest range of a cell
+        """
+        steps = self.steps[index]
+        if self.moved:
+            return self.turn + steps
+        return self.turn + max(steps - 1, 0)
+
+    def exposed(self, index: int, turn: int) -> bool:
+        """
+        Returns whether the opponent could reach a cell by the given turn (e.g.
+        the turn a crop there is ready) while it isn't covered by our
+        protection or scarecrow
+        """
+        return not self.covered[index] and self.earliest_turn(index) <= turn
+
+    def outpaced(self, index: int, steps: int) -> bool:
+        """
+        Returns whether the opponent needs fewer moves than steps to get within
+        harvest range of a cell while it isn't covered by our protection or
+        scarecrow, i.e. would get there first
+        """
+        return not self.covered[index] and self.steps[index] < steps
+
+    def ours(self, index: int) -> bool:
+        """
+        Returns whether our scarecrow stops the opponent harvesting a cell
+        wherever we stand
+        """
+        return bool(self._ours[index])
+
+    def theirs(self, index: int) -> bool:
+        """
+        Returns whether the opponent's scarecrow stops us harvesting a cell
+        wherever it stands
+        """
+        return bool(self._theirs[index])
+
+    def can_harvest(self, index: int) -> bool:
+        """
+        Returns whether the opponent's protection and scarecrow leave a cell
+        open for us to harvest
+        """
+        return not self.blocked[index]
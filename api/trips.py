@@ -0,0 +1,258 @@
+"""
+Harvest-then-sell round trips.
+
+Crops can only be sold by moving onto a green grocer tile (or straight away
+once a delivery drone has been used), and a player only carries
+carring_capacity crops. A trip is a short route of cells to stand on and
+harvest from, ending at the nearest grocer. TripPlanner searches the routes
+over the best few ripe clusters and picks the one that earns the most per
+turn.
+
+GrocerMap holds the distance from every cell to the nearest grocer tile, so
+the selling leg of a route costs one lookup.
+
+Turn model: standing on a cell and harvesting there takes one turn, plus
+however many extra turns it takes to walk there. The grocer leg takes the
+turns needed to walk onto the tile. Selling happens on arrival, in the move
+phase.
+"""
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from api import game_util
+from api.constants import Constants
+from api.portfolio import portfolio
+from api.reachability import reachability
+from model.game_state import GameState
+from model.item_type import ItemType
+from model.position import Position
+from model.tile_map import TileMap
+from model.tile_type import TileType
+from model.upgrade_type import UpgradeType
+
+constants = Constants()
+
+
+class GrocerMap:
+    """
+    Distance from every cell to its nearest green grocer tile, indexed like the
+    TileMap columns. Use GrocerMap.of(tile_map), which builds one per grocer
+    layout and reuses it.
+    """
+
+    _cache: Dict[bytes, 'GrocerMap'] = {}
+    # The map of() returned last; the grocers rarely move, so it is checked first
+    _last: Optional['GrocerMap'] = None
+
+    def __init__(self, width: int, height: int, grocers: List[Position]) -> None:
+        self.width = width
+        self.height = height
+        self.grocers = grocers
+        size = width * height
+        # 1 for every grocer tile, like TileMap.tile_type_mask(TileType.GREEN_GROCER)
+        self.mask = bytearray(size)
+        for grocer in grocers:
+            self.mask[grocer.y * width + grocer.x] = 1
+        self.distances = array('i', [0] * size)
+        self.nearest: List[Optional[Position]] = [None] * size
+        for y in range(height):
+            for x in range(width):
+                index = y * width + x
+                best = min(grocers, key=lambda grocer: abs(grocer.x - x) + abs(grocer.y - y), default=None)
+                if best is not None:
+                    self.distances[index] = abs(best.x - x) + abs(best.y - y)
+                    self.nearest[index] = best
+
+    @classmethod
+    def of(cls, tile_map: TileMap) -> 'GrocerMap':
+        last = cls._last
+        if last is not None and last.matches(tile_map):
+            return last
+        mask = bytes(tile_map.tile_type_mask(TileType.GREEN_GROCER))
+        grocer_map = cls._cache.get(mask)
+        if grocer_map is None:
+            grocer_map = cls._cache[mask] = cls(tile_map.map_width, tile_map.map_height,
+                                                tile_map.positions(mask))
+        cls._last = grocer_map
+        return grocer_map
+
+    def matches(self, tile_map: TileMap) -> bool:
+        """
+        Returns whether a tile map has exactly these grocer tiles. Counting the
+        grocers is a single C-level pass over the column, unlike building the
+        mask, and if there are as many as before and all of ours are still
+        there, they are the same set.
+        """
+        tile_types = tile_map.tile_types
+        width = self.width
+        return tile_map.map_width == width and tile_map.map_height == self.height \
+            and tile_types.count(TileType.GREEN_GROCER) == len(self.grocers) \
+            and all(tile_types[grocer.y * width + grocer.x] is TileType.GREEN_GROCER for grocer in self.grocers)
+
+    def distance(self, position: Position) -> int:
+        return self.distances[position.y * self.width + position.x]
+
+    def turns(self, position: Position, movement: int) -> int:
+        """
+        Returns the moves needed to get onto a grocer tile from position
+        """
+        return -(-self.distance(position) // movement)
+
+    def nearest_grocer(self, position: Position) -> Optional[Position]:
+        return self.nearest[position.y * self.width + position.x]
+
+
+class Trip(NamedTuple):
+    # Cells to stand on and harvest from, in order
+    stops: List[Position]
+    # Grocer tile to sell at, or None when the crops are sold by drone
+    grocer: Optional[Position]
+    turns: int
+    # Money the trip brings in, including any loyalty card saving it unlocks
+    value: float
+    # Whether to use the delivery drone item before setting off
+    use_drone: bool = False
+
+    @property
+    def rate(self) -> float:
+        return self.value / max(self.turns, 1)
+
+    @property
+    def next_target(self) -> Optional[Position]:
+        return self.stops[0] if self.stops else self.grocer
+
+
+class _Route(NamedTuple):
+    turns: int
+    value: float
+    stops: Tuple[int, ...]
+
+
+class TripPlanner:
+
+    def __init__(self, max_stops: int = 4, candidates: int = 8) -> None:
+        """
+        :param max_stops: most harvest stops on one trip
+        :param candidates: best cells to stand on that routes are built from
+        """
+        self.max_stops = max_stops
+        self.candidates = candidates
+
+    def plan(self, game_state: GameState, crops: Dict[int, float]) -> Optional[Trip]:
+        """
+        Returns the trip with the best money per turn, or None when there is
+        nothing to harvest or sell
+        :param crops: cell index -> value of the ripe crops we are allowed to
+                      harvest (e.g. from api.crop_index, minus protected cells)
+        """
+        me = game_state.get_my_player()
+        tile_map = game_state.tile_map
+        grocers = GrocerMap.of(tile_map)
+        carried = me.harvested_inventory
+        carried_value = sum(crop['value'] for crop in carried)
+        room = me.carring_capacity - len(carried)
+
+        trip = self._best(game_state, grocers, crops, carried_value, room, me.has_delivery_drone)
+        if me.item is ItemType.DELIVERY_DRONE and not me.used_item and not me.has_delivery_drone:
+            # Using the drone takes one action, after which nothing needs carrying home
+            drone = self._best(game_state, grocers, crops, carried_value, room, True)
+            if drone is not None and (trip is None or drone.value / (drone.turns + 1) > trip.rate):
+                trip = drone._replace(turns=drone.turns + 1, use_drone=True)
+        return trip
+
+    def _best(self, game_state: GameState, grocers: GrocerMap, crops: Dict[int, float],
+              carried_value: float, room: int, drone: bool) -> Optional[Trip]:
+        me = game_state.get_my_player()
+        width = game_state.tile_map.map_width
+        movement = me.max_movement
+        radius = me.harvest_radius
+        start = me.position
+        turns_left = constants.LAST_TURN - game_state.turn
+
+        # Each candidate stop: its Position and the crops harvestable from it, best first
+        stops = self._candidates(start, crops, radius, movement, width)
+
+        def sell_leg(position: Position) -> int:
+            return 0 if drone else grocers.turns(position, movement)
+
+        def hops_from(position: Position) -> List[int]:
+            # Turns to get to each stop and harvest there (at least one)
+            return [max(reachability.turns_to_reach(position, stop, movement), 1) for stop, _ in stops]
+
+        # The search visits every stop many times, so its travel and selling
+        # legs are worked out once here
+        hops = [hops_from(stop) for stop, _ in stops]
+        legs = [sell_leg(stop) for stop, _ in stops]
+        loyalty = me.upgrade is UpgradeType.LOYALTY_CARD
+
+        best: Optional[_Route] = None
+
+        def consider(turns: int, value: float, route: Tuple[int, ...]) -> None:
+            nonlocal best
+            if value <= 0 or turns > turns_left:
+                return
+            if loyalty:
+                value += self._loyalty_saving(game_state, value, turns)
+            if best is None or value / max(turns, 1) > best.value / max(best.turns, 1):
+                best = _Route(turns, value, route)
+
+        def visit(hop: List[int], leg: int, turns: int, value: float, room: int,
+                  taken: frozenset, route: Tuple[int, ...]) -> None:
+            consider(turns + leg, value, route)
+            if len(route) == self.max_stops or (room <= 0 and not drone):
+                return
+            for i, (_, cover) in enumerate(stops):
+                if i in route:
+                    continue
+                gained = [(index, crop_value) for index, crop_value in cover if index not in taken]
+                if not gained:
+                    continue
+                if not drone:
+                    gained = gained[:room]
+                visit(hops[i], legs[i], turns + hop[i], value + sum(crop_value for _, crop_value in gained),
+                      room - len(gained), taken | {index for index, _ in gained}, route + (i,))
+
+        visit(hops_from(start), sell_leg(start), 0, carried_value, room, frozenset(), ())
+        if best is None:
+            return None
+        last = stops[best.stops[-1]][0] if best.stops else start
+        return Trip([stops[i][0] for i in best.stops], None if drone else grocers.nearest_grocer(last),
+                    best.turns, best.value)
+
+    def _candidates(self, start: Position, crops: Dict[int, float], radius: int, movement: int,
+                    width: int) -> List[Tuple[Position, List[Tuple[int, float]]]]:
+        """
+        Returns the best cells to stand on, each with the crops in harvest range
+        of it, ranked by value over the turns to get there
+        """
+        covers: Dict[Position, List[Tuple[int, float]]] = {}
+        for index, value in crops.items():
+            for cell in reachability.positions(Position(index % width, index // width), radius):
+                covers.setdefault(cell, []).append((index, value))
+        scored = []
+        for stop, cover in covers.items():
+            steps = max(reachability.turns_to_reach(start, stop, movement), 1)
+            scored.append((sum(value for _, value in cover) / steps, stop, cover))
+        scored.sort(key=lambda item: -item[0])
+        return [(stop, sorted(cover, key=lambda item: -item[1])) for _, stop, cover in scored[:self.candidates]]
+
+    @staticmethod
+    def _loyalty_saving(game_state: GameState, value: float, turns: int) -> float:
+        """
+        Returns the seed discount a sale unlocks: the loyalty card discount on the
+        seeds api.portfolio would buy with the money after the sale, less the
+        discount on the seeds it would buy without it
+        """
+        me = game_state.get_my_player()
+        if me.upgrade is not UpgradeType.LOYALTY_CARD:
+            return 0.0
+        turn = min(game_state.turn + turns, constants.LAST_TURN)
+
+        def discount(money: float) -> float:
+            cost = sum(crop.seed_price * count for crop, count in portfolio.solve(money, turn, me.upgrade).items())
+            return game_util.loyalty_discount(cost, me.upgrade)
+
+        return max(discount(me.money + value) - discount(me.money), 0.0)
+
+
+trip_planner = TripPlanner()
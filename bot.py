@@ -1,3 +1,12 @@
+if __name__ == "__main__":
+    # The engine is waiting for these; send the heartbeat, then the item and
+    # upgrade, before the strategy's imports below
+    from networking import heartbeat
+    heartbeat.send()
+    from game import Game
+    # Item and upgrade from resources/loadouts.tsv; run tools.loadout after changing the strategy
+    game = Game(loadout='bot', delta=True)
+
 from networking.io import Logger
 from game import Game
 from api import game_util
@@ -8,6 +17,7 @@ from model.decisions.buy_decision import BuyDecision
 from model.decisions.harvest_decision import HarvestDecision
 from model.decisions.plant_decision import PlantDecision
 from model.decisions.do_nothing_decision import DoNothingDecision
+from model.decisions.use_item_decision import UseItemDecision
 from model.tile_type import TileType
 from model.item_type import ItemType
 from model.crop_type import CropType
@@ -15,20 +25,24 @@ from model.upgrade_type import UpgradeType
 from model.game_state import GameState
 from model.player import Player
 from api.constants import Constants
+from api.crop_index import CropIndex
+from api.portfolio import portfolio
+from api.threat import ThreatMap
+from api.trips import trip_planner
 
 import random
 
 logger = Logger()
 constants = Constants()
+# Board crops by ripeness, updated every half-turn
+crop_index = CropIndex()
+# Cells the opponent's protection radius or scarecrow keeps us from harvesting
+threat = ThreatMap()
 
 
 def crops_on_map(game_state):
-    crops = []
-    for x in range(len(game_state.tile_map.tiles)):
-        for y in range(len(game_state.tile_map.tiles[x])):
-            if game_state.tile_map.get_tile(x, y).crop.type:
-                crops.append(Position(x, y))
-    return crops
+    tile_map = game_state.tile_map
+    return tile_map.positions(tile_map.crop_mask())
 
 
 def get_move_decision(game: Game, state) -> MoveDecision:
@@ -47,26 +61,30 @@ def get_move_decision(game: Game, state) -> MoveDecision:
     """
     game_state: GameState = game.get_game_state()
     logger.debug(f"[Turn {game_state.turn}] Feedback received from engine: {game_state.feedback}")
+    crop_index.update(game_state)
+    threat.update(game_state)
 
     # Select your decision here!
     my_player: Player = game_state.get_my_player()
     pos: Position = my_player.position
     logger.info(f"Currently at {my_player.position}")
-    harvestables = game_util.within_harvest_range(game_state, my_player.name)
 
     def move_towards(posit: Position) -> Position:
-        dists = [(game_util.distance(move_pos, posit), move_pos)
-                 for move_pos in game_util.within_move_range(game_state, my_player.name)]
-        minim = min((dist for dist in dists), key=lambda x: x[0])[1]
-        return minim
-
-    # If we have something to sell that we harvested, then try to move towards the green grocer tiles
-    if sum(my_player.seed_inventory.values()) == 0 and my_player.money >= 100 and game_state.turn < 20 or \
-            (len(my_player.harvested_inventory) > 0 and game_state.turn > state['wait_time']):
+        return game_util.move_towards(game_state, my_player.name, posit)
 
+    # Stay put if the map has no grocer to head for
+    grocer = game_state.nearest_grocer() or pos
+    # If we need seeds, then try to move towards the green grocer tiles
+    if sum(my_player.seed_inventory.values()) == 0 and my_player.money >= 100 and game_state.turn < 20:
         logger.debug("Moving towards green grocer")
-        pos = min(move_towards(Position(13, 0)), move_towards(Position(17, 0)),
-                  key=lambda x: game_util.distance(x, my_player.position))
+        pos = move_towards(grocer)
+    # If we have something to sell that we harvested, pick up what else is ripe on the way there
+    elif len(my_player.harvested_inventory) > 0 and game_state.turn > state['wait_time']:
+        crops = {index: value for index, value in crop_index.ripe_values().items() if threat.can_harvest(index)}
+        trip = trip_planner.plan(game_state, crops)
+        logger.debug(f"Selling on trip {trip}")
+        state['use_drone'] = trip is not None and trip.use_drone
+        pos = move_towards(trip.next_target if trip is not None and trip.next_target else grocer)
     # else move towards optimal planting location
     elif sum(my_player.seed_inventory.values()) > 0 and game_state.turn >= 21 and game_state.turn > state['wait_time']:
         pos = move_towards(Position(my_player.position.x, game_state.fband_mid_y + 1))
@@ -92,26 +110,26 @@ def get_action_decision(game: Game, state) -> ActionDecision:
     """
     game_state: GameState = game.get_game_state()
     logger.debug(f"[Turn {game_state.turn}] Feedback received from engine: {game_state.feedback}")
+    crop_index.update(game_state)
     # Select your decision here!
     my_player: Player = game_state.get_my_player()
     pos: Position = my_player.position
-    # Focus on ducham fruit unless we have enough for golden corn
-    crop = CropType.GOLDEN_CORN \
-        if my_player.money >= 1000 or my_player.seed_inventory[CropType.GOLDEN_CORN] else CropType.DUCHAM_FRUIT
+    # The seeds we hold, one entry per seed
+    seeds = [crop for crop, count in my_player.seed_inventory.items() for _ in range(count)]
 
     # Get a list of possible harvest locations for our harvest radius
-    possible_harvest_locations = []
     harvest_radius = my_player.harvest_radius
-    for harvest_pos in game_util.within_harvest_range(game_state, my_player.name):
-        if game_state.tile_map.get_tile(harvest_pos.x, harvest_pos.y).crop.value > 0:
-            possible_harvest_locations.append(harvest_pos)
+    possible_harvest_locations = crop_index.ripe_within(pos, harvest_radius)
 
     logger.debug(f"Possible harvest locations={[str(loc) for loc in possible_harvest_locations]}")
+    # If the trip we're on is quicker with the delivery drone, use it first
+    if state['use_drone'] and not my_player.used_item:
+        decision = UseItemDecision()
     # If we can harvest something, try to harvest it
-    if len(possible_harvest_locations):
+    elif len(possible_harvest_locations):
         decision = HarvestDecision(possible_harvest_locations)
-    # If not but we have that seed, then try to plant it in a fertility band
-    elif my_player.seed_inventory[crop] > 0 and \
+    # If not but we have seeds, then try to plant them in a fertility band
+    elif len(seeds) > 0 and \
            pos.y > 2 and \
             pos.y == game_state.fband_mid_y + 1:
         # try to plant at all 5 tiles we can plant on
@@ -122,17 +140,16 @@ def get_action_decision(game: Game, state) -> ActionDecision:
             Position(pos.x + 1, pos.y),
             Position(pos.x, pos.y),
         ]
-        logger.debug(f"Deciding to try to plant at position {plant_pos}, planting {crop.name}")
-        state['wait_time'] = game_state.turn + crop.get_growth_time()
-        decision = PlantDecision([crop for i in range(len(plant_pos))], plant_pos)
-    # If we don't have that seed, but we have the money to buy it, then move towards the
-    # green grocer to buy it
-    elif my_player.money >= crop.get_seed_price() and \
-            game_state.tile_map.get_tile(pos.x, pos.y).type == TileType.GREEN_GROCER and \
-            game_state.turn < 160:
-        buy_count = min(my_player.money // crop.get_seed_price(), 5)
-        logger.debug(f"Buy {buy_count} of {crop}")
-        decision = BuyDecision([crop], [buy_count])
+        seeds = seeds[:len(plant_pos)]
+        logger.debug(f"Deciding to try to plant at position {plant_pos}, planting {seeds}")
+        state['wait_time'] = game_state.turn + max(crop.get_growth_time() for crop in seeds)
+        decision = PlantDecision(seeds, plant_pos[:len(seeds)])
+    # If we don't have seeds but we're at the green grocer, buy the most profitable mix we can afford
+    elif game_state.tile_map.get_tile(pos.x, pos.y).type == TileType.GREEN_GROCER and \
+            game_state.turn < 160 and \
+            portfolio.solve(my_player.money, game_state.turn, my_player.upgrade):
+        decision = portfolio.decision(my_player.money, game_state.turn, my_player.upgrade)
+        logger.debug(f"Buy {decision}")
     # If we can't do any of that, then just do nothing
     else:
         logger.debug(f"Couldn't find anything to do, waiting for move step")
@@ -142,17 +159,25 @@ def get_action_decision(game: Game, state) -> ActionDecision:
     return decision
 
 
-def main():
+def initial_state() -> dict:
     """
-    Competitor TODO: choose an item and upgrade for your bot
+    Returns the strategy state carried between turns
     """
-    game = Game(ItemType.DELIVERY_DRONE, UpgradeType.LONGER_LEGS)
-    state = {
+    return {
         'action': "start",
         'plant_chill_time': 5,
         'plants': [],
-        'wait_time': 0
+        'wait_time': 0,
+        'use_drone': False
     }
+
+
+def main(game: Game):
+    """
+    Plays the game on a Game that has already sent the item and upgrade
+    (competitor TODO: choose them at the top of this file)
+    """
+    state = initial_state()
     while (True):
         try:
             game.update_game()
@@ -168,4 +193,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(game)
@@ -1,3 +1,12 @@
+if __name__ == "__main__":
+    # The engine is waiting for these; send the heartbeat, then the item and
+    # upgrade, before the strategy's imports below
+    from networking import heartbeat
+    heartbeat.send()
+    from game import Game
+    # Item and upgrade from resources/loadouts.tsv; run tools.loadout after changing the strategy
+    game = Game(loadout='bot2', delta=True)
+
 from model.decisions.use_item_decision import UseItemDecision
 from networking.io import Logger
 from game import Game
@@ -16,11 +25,14 @@ from model.upgrade_type import UpgradeType
 from model.game_state import GameState
 from model.player import Player
 from api.constants import Constants
+from api.crop_index import CropIndex
 
 import random
 
 logger = Logger()
 constants = Constants()
+# Board crops by ripeness, updated every half-turn
+crop_index = CropIndex()
 
 
 def get_move_decision(game: Game) -> MoveDecision:
@@ -36,18 +48,15 @@ def get_move_decision(game: Game) -> MoveDecision:
     """
     game_state: GameState = game.get_game_state()
     logger.debug(f"[Turn {game_state.turn}] Feedback received from engine: {game_state.feedback}")
+    crop_index.update(game_state)
 
     # Select your decision here!
     my_player: Player = game_state.get_my_player()
     pos: Position = my_player.position
     logger.info(f"Currently at {my_player.position}")
-    harvestables = game_util.within_harvest_range(game_state, my_player.name)
 
     def move_towards(posit: Position) -> Position:
-        dists = [(game_util.distance(move_pos, posit), move_pos)
-                 for move_pos in game_util.within_move_range(game_state, my_player.name)]
-        minim = min((dist for dist in dists), key=lambda x: x[0])[1]
-        return minim
+        return game_util.move_towards(game_state, my_player.name, posit)
 
     # If we have something to sell that we harvested, then try to move towards the green grocer tiles
     if len(my_player.harvested_inventory):
@@ -73,6 +82,7 @@ def get_action_decision(game: Game) -> ActionDecision:
     """
     game_state: GameState = game.get_game_state()
     logger.debug(f"[Turn {game_state.turn}] Feedback received from engine: {game_state.feedback}")
+    crop_index.update(game_state)
     # Select your decision here!
     my_player: Player = game_state.get_my_player()
     pos: Position = my_player.position
@@ -81,11 +91,8 @@ def get_action_decision(game: Game) -> ActionDecision:
         if sum(my_player.seed_inventory.values()) > 0 else random.choice(list(CropType))
 
     # Get a list of possible harvest locations for our harvest radius
-    possible_harvest_locations = []
     harvest_radius = my_player.harvest_radius
-    for harvest_pos in game_util.within_harvest_range(game_state, my_player.name):
-        if game_state.tile_map.get_tile(harvest_pos.x, harvest_pos.y).crop.value > 0:
-            possible_harvest_locations.append(harvest_pos)
+    possible_harvest_locations = crop_index.ripe_within(pos, harvest_radius)
 
     logger.debug(f"Possible harvest locations={[str(loc) for loc in possible_harvest_locations]}")
 
@@ -117,12 +124,11 @@ def get_action_decision(game: Game) -> ActionDecision:
     return decision
 
 
-def main():
+def main(game: Game):
     """
-    Competitor TODO: choose an item and upgrade for your bot
+    Plays the game on a Game that has already sent the item and upgrade
+    (competitor TODO: choose them at the top of this file)
     """
-    game = Game(ItemType.COFFEE_THERMOS, UpgradeType.LONGER_LEGS)
-
     while (True):
         try:
             game.update_game()
@@ -138,4 +144,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(game)
\ No newline at end of file
@@ -0,0 +1,79 @@
+if __name__ == "__main__":
+    # The engine is waiting for these; send the heartbeat, then the item and
+    # upgrade, before the strategy's imports below
+    from networking import heartbeat
+    heartbeat.send()
+    from game import Game
+    # Item and upgrade from resources/loadouts.tsv; run tools.loadout after changing the strategy
+    game = Game(loadout='bot3', delta=True)
+
+from networking.io import Logger
+from game import Game
+from api.planner import Planner
+from model.decisions.move_decision import MoveDecision
+from model.decisions.action_decision import ActionDecision
+from model.game_state import GameState
+
+logger = Logger()
+
+
+def get_move_decision(game: Game, state) -> MoveDecision:
+    """
+    Returns the move the planner found best before its deadline.
+    This is part 1 of 2 of the turn.
+    :param: game The object that contains the game state and other related information
+    :returns: MoveDecision A location for the bot to move to this turn
+    """
+    game_state: GameState = game.get_game_state()
+    logger.debug(f"[Turn {game_state.turn}] Feedback received from engine: {game_state.feedback}")
+    planner: Planner = state['planner']
+    decision = planner.decide_move(game)
+    logger.debug(f"[Turn {game_state.turn}] Sending MoveDecision: {decision} ({planner.stats})")
+    return decision
+
+
+def get_action_decision(game: Game, state) -> ActionDecision:
+    """
+    Returns the action the planner found best before its deadline.
+    This is part 2 of 2 of the turn.
+    :param: game The object that contains the game state and other related information
+    :returns: ActionDecision A decision for the bot to make this turn
+    """
+    game_state: GameState = game.get_game_state()
+    logger.debug(f"[Turn {game_state.turn}] Feedback received from engine: {game_state.feedback}")
+    planner: Planner = state['planner']
+    decision = planner.decide_action(game)
+    logger.debug(f"[Turn {game_state.turn}] Sending ActionDecision: {decision} ({planner.stats})")
+    return decision
+
+
+def initial_state() -> dict:
+    """
+    Returns the strategy state carried between turns: one Planner for the
+    whole game, so the search tree carries over between turns
+    """
+    return {'planner': Planner()}
+
+
+def main(game: Game):
+    """
+    Plays the game on a Game that has already sent the item and upgrade
+    (competitor TODO: choose them at the top of this file)
+    """
+    state = initial_state()
+    while (True):
+        try:
+            game.update_game()
+        except IOError:
+            exit(-1)
+        game.send_move_decision(get_move_decision(game, state))
+
+        try:
+            game.update_game()
+        except IOError:
+            exit(-1)
+        game.send_action_decision(get_action_decision(game, state))
+
+
+if __name__ == "__main__":
+    main(game)
@@ -1,5 +1,7 @@
+from api import loadouts
 from model.game_state import GameState
 from networking import io
+from networking.latency import LatencyTracker, make_profiler
 from model.item_type import ItemType
 from model import upgrade_type
 from model.decisions.move_decision import MoveDecision
@@ -8,22 +10,129 @@ from model.decisions.action_decision import ActionDecision
 
 class Game:
 
-    def __init__(self, item: ItemType, upgrade: upgrade_type):
+    def __init__(self, item: ItemType = None, upgrade: upgrade_type = None, incremental: bool = False,
+                 profiler: str = None, profile_logger: io.Logger = None, record_path: str = None,
+                 delta: bool = False, loadout: str = None):
+        """
+        :param item: ItemType to play with; with upgrade, leave out to use the
+                     loadout table
+        :param upgrade: UpgradeType to play with
+        :param incremental: reuse and patch the previous GameState every half-turn
+                            instead of rebuilding it (see networking.decoder)
+        :param profiler: profile every strategy call with 'cprofile' or 'sampling'
+        :param profile_logger: Logger the per-half-turn profiles and timings go to
+                               (defaults to stderr)
+        :param record_path: file to append every received game state line to, for
+                            offline replay with tools.replay. A path ending in
+                            .snap records a compact binary snapshot of every
+                            GameState instead (see networking.snapshot).
+        :param delta: accept state-diff messages (see networking.delta) from an
+                      engine that sends them; full states are still accepted.
+                      Implies incremental.
+        :param loadout: bot name to look up in resources/loadouts.tsv (see
+                        api.loadouts and tools.loadout) when item or upgrade
+                        is left out, e.g. 'bot'; without it they default to NONE
+        """
+        self.incremental = incremental or delta
+        self.latency = LatencyTracker()
+        self.profiler = make_profiler(profiler)
+        self.profile_logger = profile_logger or io.Logger()
+        self.record = None
+        self.snapshot = None
+        if record_path is not None and record_path.endswith('.snap'):
+            # Only imported when recording, to keep it out of the bot's startup
+            from networking.snapshot import SnapshotWriter
+            self.snapshot = SnapshotWriter(record_path)
+        elif record_path is not None:
+            self.record = open(record_path, 'ab')
+        # Reused for every decision message
+        self.buffer = bytearray()
+        self.handshake(item, upgrade, loadout)
+
+    def handshake(self, item: ItemType, upgrade: upgrade_type, loadout: str = None) -> None:
+        """
+        Sends the heartbeat, item and upgrade to the engine, filling in a missing
+        item or upgrade from the loadout table. Games that don't talk to the
+        engine (replay, simulation) override this.
+        """
+        if item is None or upgrade is None:
+            item, upgrade = self.choose_loadout(item, upgrade, loadout)
         io.send_heartbeat()
         self.send_item(item)
         self.send_upgrade(upgrade)
 
+    @staticmethod
+    def choose_loadout(item: ItemType, upgrade: upgrade_type, loadout: str = None) -> tuple:
+        """
+        Fills in a missing item or upgrade from the precomputed loadout table,
+        or with NONE when no loadout is named or the table has nothing for it
+        """
+        best = (loadout is not None and loadouts.choose(loadout)) \
+            or (ItemType.NONE, upgrade_type.UpgradeType.NONE)
+        return item or best[0], upgrade or best[1]
+
     def update_game(self) -> None:
-        self.game_state = io.receive_gamestate()
+        self.latency.start()
+        try:
+            self.game_state = io.receive_gamestate(self.incremental, self.latency, self.record)
+        except IOError:
+            # The engine closed the connection: the game is over
+            self.close()
+            raise
+        if self.snapshot is not None:
+            self.snapshot.write(self.game_state)
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def close(self) -> None:
+        """
+        Finishes the game's recording, writing a snapshot recording's index, and
+        closes the profile log
+        """
+        self.profile_logger.close()
+        if self.record is not None:
+            self.record.close()
+            self.record = None
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
 
     def get_game_state(self) -> GameState:
         return self.game_state
 
+    def remaining_budget_ms(self) -> float:
+        """
+        Returns how many milliseconds are left before the engine times out this decision
+        """
+        return self.latency.remaining_ms()
+
     def send_move_decision(self, decision: MoveDecision) -> None:
-        io.send_string(decision.engine_str())
+        self._send_decision(decision)
 
     def send_action_decision(self, decision: ActionDecision) -> None:
-        io.send_string(decision.engine_str())
+        self._send_decision(decision)
+
+    def _send_decision(self, decision) -> None:
+        self.latency.lap('strategy')
+        if self.profiler is not None:
+            self.profiler.disable()
+        message = self.buffer
+        del message[:]
+        decision.encode(message)
+        message += b"\n"
+        self.latency.lap('encode')
+        self.write(message)
+        self.latency.lap('write')
+        self.latency.finish()
+        if self.profiler is not None:
+            timings = ", ".join(f"{phase} {elapsed:.2f}" for phase, elapsed in self.latency.current.items())
+            self.profile_logger.debug(f"[Turn {self.game_state.turn}] ms: {timings}\n{self.profiler.report()}")
+
+    def write(self, message: bytearray) -> None:
+        """
+        Sends one encoded, newline-terminated decision to the engine
+        """
+        io.send_bytes(message)
 
     def send_item(self, item: ItemType) -> None:
         io.send_string(item.engine_str())
@@ -1,5 +1,14 @@
+from model.crop_type import CropType
+
+
 class Crop:
-    def __init__(self, crop_dict) -> None:
-        self.type = crop_dict['type']
-        self.growth_timer = crop_dict['growthTimer']
-        self.value = crop_dict['value']
\ No newline at end of file
+    __slots__ = ('type', 'growth_timer', 'value')
+
+    def __init__(self, crop_type: CropType, growth_timer: int, value: float) -> None:
+        self.type = crop_type
+        self.growth_timer = growth_timer
+        self.value = value
+
+    @staticmethod
+    def from_dict(crop_dict) -> 'Crop':
+        return Crop(CropType[crop_dict['type']], crop_dict['growthTimer'], crop_dict['value'])
@@ -1,7 +1,6 @@
 from enum import Enum
-from pathlib import Path
-import os
-import configparser
+from api.constants import Constants
+
 
 class CropType(Enum):
     GRAPE = 1
@@ -15,11 +14,11 @@ class CropType(Enum):
     NONE = 9
 
     def __init__(self, *args, **kwargs):
-        with open(Path(os.path.dirname(os.path.dirname(__file__))) / "resources" / "mm27.properties") as f:
-            file_content = '[dummy_section]\n' + f.read()
-        config_parser = configparser.RawConfigParser()
-        config_parser.read_string(file_content)
-        self.config = config_parser['dummy_section']
+        stats = Constants.CROP_STATS[self.name.lower()]
+        self.seed_price = stats.seed_price
+        self.growth_time = stats.growth_time
+        self.fertility_sensitivity = stats.fertility_sensitivity
+        self.growth_value = stats.growth_value
 
     def __str__(self):
         return f"{self.name}"
@@ -28,14 +27,13 @@ class CropType(Enum):
         return f"{self.name}"
 
     def get_seed_price(self) -> float:
-        return float(self.config[f"croptype.{self.name.lower()}.seedprice"])
+        return self.seed_price
 
     def get_growth_time(self) -> int:
-        return int(self.config[f"croptype.{self.name.lower()}.growthtime"])
+        return self.growth_time
 
     def get_fertility_sensitivity(self) -> float:
-        return float(self.config[f"croptype.{self.name.lower()}.fertilitysens"])
+        return self.fertility_sensitivity
 
     def get_growth_value(self) -> float:
-        return float(self.config[f"croptype.{self.name.lower()}.growthvalue"])
-
+        return self.growth_value
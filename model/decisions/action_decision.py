@@ -10,3 +10,9 @@ class ActionDecision(metaclass=ABCMeta):
     @abstractmethod
     def engine_str(self) -> str:
         pass
+
+    def encode(self, out: bytearray) -> None:
+        """
+        Appends the engine message for this decision to out
+        """
+        out += self.engine_str().encode()
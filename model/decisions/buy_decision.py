@@ -1,5 +1,6 @@
 from model.decisions.action_decision import ActionDecision
-from model.decisions.move_decision import MoveDecision
+from model.decisions.encoding import crop_bytes
+from typing import Dict
 
 class BuyDecision(ActionDecision):
 
@@ -8,16 +9,28 @@ class BuyDecision(ActionDecision):
         self.crop_types = crop_types
         self.quantities = quantities
 
+    @staticmethod
+    def from_counts(counts: Dict) -> 'BuyDecision':
+        """
+        Buys counts[crop_type] seeds of every crop type with a positive count
+        """
+        crop_types = [crop_type for crop_type, count in counts.items() if count > 0]
+        return BuyDecision(crop_types, [counts[crop_type] for crop_type in crop_types])
+
     def engine_str(self) -> str:
-        res = f"buy "
-        for i in range(len(self.crop_types)):
-            res += str(self.crop_types[i])
-            res += " "
-            res += str(self.quantities[i])
-            res += " "
-        if len(self.crop_types) > 0:
-            res = res[:-1]
-        return res
+        out = bytearray()
+        self.encode(out)
+        return out.decode()
+
+    def encode(self, out: bytearray) -> None:
+        out += b"buy "
+        for crop_type, quantity in zip(self.crop_types, self.quantities):
+            out += crop_bytes(crop_type)
+            out += b" "
+            out += str(quantity).encode()
+            out += b" "
+        if self.crop_types:
+            del out[-1]
 
     def __str__(self) -> str:
         res = "BuyDecision("
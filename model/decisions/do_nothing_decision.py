@@ -9,5 +9,8 @@ class DoNothingDecision(ActionDecision):
     def engine_str(self) -> str:
         return "do_nothing "
 
+    def encode(self, out: bytearray) -> None:
+        out += b"do_nothing "
+
     def __str__(self) -> str:
         return f"DoNothingDecision()"
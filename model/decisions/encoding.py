@@ -0,0 +1,30 @@
+"""
+Byte encodings of the pieces of a decision message, cached so encoding a
+decision is mostly buffer appends
+"""
+from model.crop_type import CropType
+from model.position import Position
+from typing import Dict
+
+_position_bytes: Dict[Position, bytes] = {}
+_crop_bytes: Dict[CropType, bytes] = {crop: crop.engine_str().encode() for crop in CropType}
+
+
+def position_bytes(pos: Position) -> bytes:
+    """
+    Returns b"x y" for a position
+    """
+    encoded = _position_bytes.get(pos)
+    if encoded is None:
+        encoded = _position_bytes[pos] = pos.engine_str().encode()
+    return encoded
+
+
+def crop_bytes(crop) -> bytes:
+    """
+    Returns the engine name of a CropType (or anything whose str() is one) as bytes
+    """
+    encoded = _crop_bytes.get(crop)
+    if encoded is None:
+        encoded = str(crop).encode()
+    return encoded
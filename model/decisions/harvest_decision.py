@@ -1,11 +1,27 @@
 from model.position import Position
 from model.decisions.action_decision import ActionDecision
-from typing import List
+from model.decisions.encoding import position_bytes
+from typing import Iterable, List
 
 
 class HarvestDecision(ActionDecision):
     def __init__(self, positions: List[Position]) -> None:
         self.positions = positions
+
+    @staticmethod
+    def from_coords(xs: Iterable[int], ys: Iterable[int]) -> 'HarvestDecision':
+        """
+        Harvests the cells (xs[i], ys[i])
+        """
+        return HarvestDecision(list(map(Position, xs, ys)))
+
+    @staticmethod
+    def from_mask(tile_map, mask: bytearray) -> 'HarvestDecision':
+        """
+        Harvests every cell set in a TileMap mask, e.g. the result of
+        tile_map.ripe_mask() combined with a range mask
+        """
+        return HarvestDecision(tile_map.positions(mask))
     
     def __str__(self) -> str:
         res = "HarvestDecision("
@@ -18,10 +34,10 @@ class HarvestDecision(ActionDecision):
         return res
 
     def engine_str(self) -> str:
-        res = "harvest "
-        for i in range(len(self.positions)):
-            res += self.positions[i].engine_str()
-            res += " "
-        if len(self.positions) > 0:
-            res = res[:-1]
-        return res
+        out = bytearray()
+        self.encode(out)
+        return out.decode()
+
+    def encode(self, out: bytearray) -> None:
+        out += b"harvest "
+        out += b" ".join(map(position_bytes, self.positions))
@@ -1,4 +1,5 @@
 from model.position import Position
+from model.decisions.encoding import position_bytes
 
 
 class MoveDecision:
@@ -10,3 +11,10 @@ class MoveDecision:
 
     def engine_str(self) -> str:
         return f"move {self.pos.engine_str()}"
+
+    def encode(self, out: bytearray) -> None:
+        """
+        Appends the engine message for this decision to out
+        """
+        out += b"move "
+        out += position_bytes(self.pos)
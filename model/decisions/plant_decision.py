@@ -1,4 +1,7 @@
+from model.position import Position
 from model.decisions.action_decision import ActionDecision
+from model.decisions.encoding import crop_bytes, position_bytes
+from typing import Iterable
 
 
 class PlantDecision(ActionDecision):
@@ -7,6 +10,25 @@ class PlantDecision(ActionDecision):
         self.coords = coords
         assert(len(crop_types) == len(coords))
 
+    @staticmethod
+    def from_coords(crop_types, xs: Iterable[int], ys: Iterable[int]) -> 'PlantDecision':
+        """
+        Plants crop_types[i] at (xs[i], ys[i])
+        :param crop_types: a list of CropTypes, or one CropType to plant everywhere
+        """
+        coords = list(map(Position, xs, ys))
+        if not isinstance(crop_types, (list, tuple)):
+            crop_types = [crop_types] * len(coords)
+        return PlantDecision(list(crop_types), coords)
+
+    @staticmethod
+    def from_mask(crop_type, tile_map, mask: bytearray) -> 'PlantDecision':
+        """
+        Plants one crop type on every cell set in a TileMap mask
+        """
+        coords = tile_map.positions(mask)
+        return PlantDecision([crop_type] * len(coords), coords)
+
     def __str__(self) -> str:
         res = f"PlantDecision("
         for i in range(len(self.crop_types)):
@@ -19,11 +41,15 @@ class PlantDecision(ActionDecision):
         return res
 
     def engine_str(self) -> str:
-        res = f"plant "
-        for i in range(len(self.crop_types)):
-            res += str(self.crop_types[i])
-            res += " "
-            res += self.coords[i].engine_str()
-            res += " "
-        res = res[:-1]
-        return res
+        out = bytearray()
+        self.encode(out)
+        return out.decode()
+
+    def encode(self, out: bytearray) -> None:
+        out += b"plant "
+        for crop_type, coord in zip(self.crop_types, self.coords):
+            out += crop_bytes(crop_type)
+            out += b" "
+            out += position_bytes(coord)
+            out += b" "
+        del out[-1]
@@ -2,7 +2,7 @@ from model.decisions.action_decision import ActionDecision
 from model.position import Position
 
 class UseItemDecision(ActionDecision):
-    def __init__(self, pos: Position) -> None:
+    def __init__(self, pos: Position = None) -> None:
         self.pos = pos
 
     def __str__(self) -> str:
@@ -10,3 +10,6 @@ class UseItemDecision(ActionDecision):
 
     def engine_str(self) -> str:
         return f"use_item"
+
+    def encode(self, out: bytearray) -> None:
+        out += b"use_item"
@@ -1,31 +1,137 @@
 from api.constants import Constants
+from api.fertility import timeline
+from api.reachability import reachability
 from model.player import Player
 from model.tile_map import TileMap
-from typing import Dict
+from model.position import Position
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+constants = Constants()
 
 
 class GameState:
+    """
+    Everything the engine sends for one half-turn.
+
+    Derived views (get_opponent_player(), harvest_range(), move_range_mask(), ...) are
+    computed on first use and kept until invalidate_views(). The incremental
+    decoder calls it when it patches this object for the next half-turn.
+    The views return shared objects, so don't modify them.
+    """
+
     def __init__(self, gamestate_dict: Dict) -> None:
-        constants = Constants()
-        self.turn = gamestate_dict['turn']
+        self._views: Dict = {}
         self.player1 = Player(gamestate_dict['p1'])
         self.player2 = Player(gamestate_dict['p2'])
         self.tile_map = TileMap(gamestate_dict['tileMap'])
         self.player_num = gamestate_dict['playerNum']
         self.feedback = gamestate_dict['feedback']
-        self.fband_bot_y = ((self.turn - 1) / 3) - 1
+        self.set_turn(gamestate_dict['turn'])
+        # Positions whose tile changed since the previous state, filled in by
+        # networking.decoder.IncrementalDecoder. None means every cell is new.
+        self.changed_cells: Optional[Set[Position]] = None
+
+    @staticmethod
+    def from_parts(turn: int, player1: Player, player2: Player, tile_map: TileMap,
+                   player_num: int, feedback: list) -> 'GameState':
+        """
+        Builds a GameState from already decoded model objects, skipping the engine
+        dictionary entirely (used by the local simulator)
+        """
+        game_state = GameState.__new__(GameState)
+        game_state._views = {}
+        game_state.player1 = player1
+        game_state.player2 = player2
+        game_state.tile_map = tile_map
+        game_state.player_num = player_num
+        game_state.feedback = feedback
+        game_state.set_turn(turn)
+        game_state.changed_cells = None
+        return game_state
+
+    def set_turn(self, turn: int) -> None:
+        self.turn = turn
+        self.fband_bot_y = timeline.band_bottom_row(turn)
         self.fband_mid_y = self.fband_bot_y - constants.FBAND_INNER_HEIGHT - constants.FBAND_OUTER_HEIGHT
         self.fband_top_y = self.fband_bot_y - constants.FBAND_OUTER_HEIGHT - constants.FBAND_INNER_HEIGHT - constants.FBAND_MID_HEIGHT
-        self.fband_ticks_to_swap = 3 - (self.turn - 1) % 3
+        self.fband_ticks_to_swap = timeline.ticks_to_shift(turn)
 
     def get_my_player(self) -> Player:
-        if self.player_num == 1:
-            return self.player1
-        else:
-            return self.player2
+        return self._view('me', lambda: self.player1 if self.player_num == 1 else self.player2)
 
     def get_opponent_player(self) -> Player:
-        if self.player_num == 1:
-            return self.player2
-        else:
-            return self.player1
+        return self._view('opponent', lambda: self.player2 if self.player_num == 1 else self.player1)
+
+    def invalidate_views(self) -> None:
+        """
+        Forgets every derived view, after this state's fields have changed
+        """
+        self._views.clear()
+
+    def _view(self, key, compute: Callable):
+        views = self._views
+        try:
+            return views[key]
+        except KeyError:
+            value = views[key] = compute()
+            return value
+
+    def _player(self, player: Optional[Player]) -> Tuple[Player, int]:
+        """
+        Returns the player (my player for None) and its number, which keys its
+        views; names don't, as both players may have the same one
+        """
+        if player is None:
+            player = self.get_my_player()
+        if player is self.player1:
+            return player, 1
+        if player is self.player2:
+            return player, 2
+        raise ValueError(f"{player.name} is not a player of this game state")
+
+    def player_named(self, name: str) -> Player:
+        """
+        Returns the player with the given name (player 2 if neither matches)
+        """
+        return self._view(('player', name),
+                          lambda: self.player1 if self.player1.name == name else self.player2)
+
+    def harvest_range(self, player: Player = None) -> List[Position]:
+        """
+        Returns the on-board Positions within a player's harvest radius
+        :param player: defaults to my player
+        """
+        player, number = self._player(player)
+        return self._view(('harvest', number),
+                          lambda: reachability.positions(player.position, player.harvest_radius))
+
+    def move_range(self, player: Player = None) -> List[Position]:
+        """
+        Returns the on-board Positions a player can move to
+        :param player: defaults to my player
+        """
+        player, number = self._player(player)
+        return self._view(('move', number),
+                          lambda: reachability.positions(player.position, player.max_movement))
+
+    def move_range_mask(self, player: Player = None) -> bytearray:
+        """
+        Returns a board mask (index y * width + x) of the cells a player can move to
+        :param player: defaults to my player
+        """
+        player, number = self._player(player)
+        return self._view(('move_mask', number),
+                          lambda: reachability.mask(player.position, player.max_movement))
+
+    def nearest_grocer(self, player: Player = None) -> Optional[Position]:
+        """
+        Returns the green grocer tile closest to a player
+        :param player: defaults to my player
+        """
+        player, number = self._player(player)
+        return self._view(('grocer', number), lambda: self._nearest_grocer(player))
+
+    def _nearest_grocer(self, player: Player) -> Optional[Position]:
+        # Imported here, since api.trips depends on this module
+        from api.trips import GrocerMap
+        return GrocerMap.of(self.tile_map).nearest_grocer(player.position)
@@ -3,29 +3,56 @@ from model.crop_type import CropType
 from model.item_type import ItemType
 from model.upgrade_type import UpgradeType
 from api.constants import Constants
+from typing import Dict, Iterable
+
+
+def _seed_inventory(seed_dict: Dict) -> Dict[CropType, int]:
+    return {CropType[k]: v for k, v in seed_dict.items()}
+
+
+def _identity(value):
+    return value
+
+
+# Engine key -> (attribute name, converter)
+_FIELDS = {
+    'name':               ('name', _identity),
+    'position':           ('position', Position.from_dict),
+    'upgrade':            ('upgrade', lambda name: UpgradeType[name]),
+    'item':               ('item', lambda name: ItemType[name]),
+    'money':              ('money', _identity),
+    'seedInventory':      ('seed_inventory', _seed_inventory),
+    'harvestedInventory': ('harvested_inventory', _identity),
+    'discount':           ('discount', _identity),
+    'protectionRadius':   ('protection_radius', _identity),
+    'harvestRadius':      ('harvest_radius', _identity),
+    'plantRadius':        ('plant_radius', _identity),
+    'carryingCapacity':   ('carring_capacity', _identity),
+    'maxMovement':        ('max_movement', _identity),
+    'doubleDropChance':   ('double_drop_chance', _identity),
+    'usedItem':           ('used_item', _identity),
+    'hasDeliveryDrone':   ('has_delivery_drone', _identity),
+    'hasCoffeeThermos':   ('has_coffee_thermos', _identity),
+    'itemTimeExpired':    ('item_time_expired', _identity),
+}
 
 
 class Player:
+    __slots__ = tuple(attribute for attribute, _ in _FIELDS.values())
+
     constants = Constants()
+    # Engine keys a Player reads; any other key the engine sends is ignored
+    KEYS = frozenset(_FIELDS)
 
     def __init__(self, player_dict) -> None:
-        self.name = player_dict['name']
-        self.position = Position(0, 0).from_dict(player_dict['position'])
-        self.upgrade = UpgradeType[player_dict['upgrade']]
-        self.item = ItemType[player_dict['item']]
-        self.money = player_dict['money']
-        self.seed_inventory = {CropType[k]:v for k,v in player_dict['seedInventory'].items()}
-        
-        self.harvested_inventory = player_dict['harvestedInventory']
-
-        self.discount = player_dict['discount']
-        self.protection_radius = player_dict['protectionRadius']
-        self.harvest_radius = player_dict['harvestRadius']
-        self.plant_radius = player_dict['plantRadius']
-        self.carring_capacity = player_dict['carryingCapacity']
-        self.max_movement = player_dict['maxMovement']
-        self.double_drop_chance = player_dict['doubleDropChance']
-        self.used_item = player_dict['usedItem']
-        self.has_delivery_drone = player_dict['hasDeliveryDrone']
-        self.has_coffee_thermos = player_dict['hasCoffeeThermos']
-        self.item_time_expired = player_dict['itemTimeExpired']
+        self.update(player_dict, _FIELDS)
+
+    def update(self, player_dict, keys: Iterable[str]) -> None:
+        """
+        Overwrites the attributes for the given engine keys from player_dict
+        :param player_dict: player dictionary sent by the engine
+        :param keys: engine keys (e.g. 'money', 'seedInventory') to refresh
+        """
+        for key in keys:
+            attribute, convert = _FIELDS[key]
+            setattr(self, attribute, convert(player_dict[key]))
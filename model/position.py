@@ -1,29 +1,67 @@
 
-from typing import Dict
+from typing import Dict, Tuple
+
+from api.constants import Constants
+
+_WIDTH = Constants.BOARD_WIDTH
+_HEIGHT = Constants.BOARD_HEIGHT
 
 
 class Position:
-    def from_dict(self, pos_dict: Dict):
-        self.x = pos_dict['x']
-        self.y = pos_dict['y']
+    """
+    Immutable board coordinate. Positions compare and hash by value, so they can
+    be used in sets and as dict keys. Every on-board cell is interned:
+    Position(x, y) returns the same shared object for the same cell instead of
+    allocating a new one.
+    """
+    __slots__ = ('x', 'y', '_hash')
+
+    _board = []
+
+    def __new__(cls, x: int, y: int) -> 'Position':
+        if 0 <= x < _WIDTH and 0 <= y < _HEIGHT and cls._board:
+            return cls._board[y * _WIDTH + x]
+        return cls._create(x, y)
+
+    @classmethod
+    def _create(cls, x: int, y: int) -> 'Position':
+        self = object.__new__(cls)
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+        object.__setattr__(self, '_hash', hash((x, y)))
         return self
 
-    def __init__(self, x, y) -> None:
-        self.x = x
-        self.y = y
+    @staticmethod
+    def from_dict(pos_dict: Dict) -> 'Position':
+        return Position(pos_dict['x'], pos_dict['y'])
+
+    def getpos(self) -> Tuple[int, int]:
+        return self.x, self.y
 
-    def getpos(self, x, y):
-        return x, y
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return Position, (self.x, self.y)
 
     def __eq__(self, o: object) -> bool:
-        if object is None:
-            return False
-        if type(object) != type(self):
+        if self is o:
+            return True
+        if type(o) != type(self):
             return False
-        return (self.x, self.y) == object.getpos()
+        return self.x == o.x and self.y == o.y
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"Position({self.x}, {self.y})"
 
     def __str__(self) -> str:
         return f"({self.x},{self.y})"
 
     def engine_str(self) -> str:
         return f"{self.x} {self.y}"
+
+
+Position._board = [Position._create(x, y) for y in range(_HEIGHT) for x in range(_WIDTH)]
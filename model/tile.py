@@ -1,13 +1,78 @@
 from model.item_type import ItemType
 from model.tile_type import TileType
 from model.crop import Crop
+from model.crop_type import CropType
+
+
 class Tile:
-    def __init__(self, tile_dict) -> None:
-        self.type = TileType[tile_dict['type']]
-        self.crop = Crop(tile_dict['crop'])
-        self.p1_item = ItemType[tile_dict['p1_item']]
-        self.p1_item = ItemType[tile_dict['p2_item']]
-        self.turns_left_to_grow = tile_dict['turnsLeftToGrow']
-        self.rain_totem_effect = tile_dict['rainTotemEffect']
-        self.fertility_idol_effect = tile_dict['fertilityIdolEffect']
-        self.scarecrow_effect = tile_dict['scarecrowEffect']
\ No newline at end of file
+    """
+    Read-only view of a single cell of a TileMap. The data lives in the map's
+    column arrays; the view only remembers which cell it points at, and the
+    Crop, items and effects are only read from the columns when accessed.
+
+    crop_type, growth_timer and crop_value read the crop columns without
+    building anything; use them in loops over the board.
+    """
+    __slots__ = ('tile_map', 'index', '_crop')
+
+    def __init__(self, tile_map, index: int) -> None:
+        self.tile_map = tile_map
+        self.index = index
+        self._crop = None
+
+    @property
+    def type(self) -> TileType:
+        return self.tile_map.tile_types[self.index]
+
+    @property
+    def crop(self) -> Crop:
+        """
+        The tile's Crop, built on first access and refreshed from the columns on
+        every access after that (the same object each time)
+        """
+        tile_map = self.tile_map
+        i = self.index
+        crop = self._crop
+        if crop is None:
+            crop = self._crop = Crop(tile_map.crop_types[i], tile_map.growth_timers[i], tile_map.crop_values[i])
+        else:
+            crop.type = tile_map.crop_types[i]
+            crop.growth_timer = tile_map.growth_timers[i]
+            crop.value = tile_map.crop_values[i]
+        return crop
+
+    @property
+    def crop_type(self) -> CropType:
+        return self.tile_map.crop_types[self.index]
+
+    @property
+    def growth_timer(self) -> int:
+        return self.tile_map.growth_timers[self.index]
+
+    @property
+    def crop_value(self) -> float:
+        return self.tile_map.crop_values[self.index]
+
+    @property
+    def p1_item(self) -> ItemType:
+        return self.tile_map.p1_items[self.index]
+
+    @property
+    def p2_item(self) -> ItemType:
+        return self.tile_map.p2_items[self.index]
+
+    @property
+    def turns_left_to_grow(self) -> int:
+        return self.tile_map.turns_left_to_grow[self.index]
+
+    @property
+    def rain_totem_effect(self) -> bool:
+        return bool(self.tile_map.rain_totem_effects[self.index])
+
+    @property
+    def fertility_idol_effect(self) -> bool:
+        return bool(self.tile_map.fertility_idol_effects[self.index])
+
+    @property
+    def scarecrow_effect(self) -> int:
+        return self.tile_map.scarecrow_effects[self.index]
@@ -1,15 +1,164 @@
+from array import array
+from typing import Dict, List
+
+from model.crop_type import CropType
+from model.item_type import ItemType
+from model.position import Position
 from model.tile import Tile
+from model.tile_type import TileType
+
 
 class TileMap:
+    """
+    Column-oriented tile map. Every per-tile field is stored in its own flat,
+    row-major array (index = y * map_width + x) instead of as one Tile and one
+    Crop object per cell. Use get_tile() for a single-cell view and the *_mask()
+    helpers for board-wide queries.
+    """
+
+    # Names of the per-cell column attributes
+    COLUMNS = ('tile_types', 'crop_types', 'growth_timers', 'crop_values', 'turns_left_to_grow',
+               'p1_items', 'p2_items', 'rain_totem_effects', 'fertility_idol_effects', 'scarecrow_effects')
+
+    # Grid of Tile views, built by the tiles property
+    _tiles = None
+
     def __init__(self, tilemap_dict) -> None:
         self.map_height = tilemap_dict['mapHeight']
         self.map_width = tilemap_dict['mapWidth']
-        self.tiles = [] 
-        for row_list in tilemap_dict['tiles']:
-            tile_row = []
-            for tile in row_list:
-                tile_row.append(Tile(tile))
-            self.tiles.append(tile_row)
-        
+        cells = [tile for row_list in tilemap_dict['tiles'] for tile in row_list]
+        crops = [tile['crop'] for tile in cells]
+        tile_types = TileType.__members__
+        crop_types = CropType.__members__
+        item_types = ItemType.__members__
+
+        self.tile_types: List[TileType] = [tile_types[tile['type']] for tile in cells]
+        self.crop_types: List[CropType] = [crop_types[crop['type']] for crop in crops]
+        self.growth_timers = array('i', [crop['growthTimer'] for crop in crops])
+        self.crop_values = array('d', [crop['value'] for crop in crops])
+        self.turns_left_to_grow = array('i', [tile['turnsLeftToGrow'] for tile in cells])
+        self.p1_items: List[ItemType] = [item_types[tile['p1_item']] for tile in cells]
+        self.p2_items: List[ItemType] = [item_types[tile['p2_item']] for tile in cells]
+        self.rain_totem_effects = bytearray(bool(tile['rainTotemEffect']) for tile in cells)
+        self.fertility_idol_effects = bytearray(bool(tile['fertilityIdolEffect']) for tile in cells)
+        self.scarecrow_effects = array('i', [tile['scarecrowEffect'] for tile in cells])
+
+    def set_tile(self, index: int, tile_dict) -> None:
+        """
+        Overwrites every column at a flat index from an engine tile dictionary
+        """
+        crop = tile_dict['crop']
+        self.tile_types[index] = TileType[tile_dict['type']]
+        self.crop_types[index] = CropType[crop['type']]
+        self.growth_timers[index] = crop['growthTimer']
+        self.crop_values[index] = crop['value']
+        self.turns_left_to_grow[index] = tile_dict['turnsLeftToGrow']
+        self.p1_items[index] = ItemType[tile_dict['p1_item']]
+        self.p2_items[index] = ItemType[tile_dict['p2_item']]
+        self.rain_totem_effects[index] = bool(tile_dict['rainTotemEffect'])
+        self.fertility_idol_effects[index] = bool(tile_dict['fertilityIdolEffect'])
+        self.scarecrow_effects[index] = tile_dict['scarecrowEffect']
+
+    def tile_dict(self, index: int) -> Dict:
+        """
+        Returns the engine dictionary for the cell at a flat index
+        """
+        return {
+            'type': self.tile_types[index].name,
+            'crop': {
+                'type': self.crop_types[index].name,
+                'growthTimer': self.growth_timers[index],
+                'value': self.crop_values[index],
+            },
+            'p1_item': self.p1_items[index].name,
+            'p2_item': self.p2_items[index].name,
+            'turnsLeftToGrow': self.turns_left_to_grow[index],
+            'rainTotemEffect': bool(self.rain_totem_effects[index]),
+            'fertilityIdolEffect': bool(self.fertility_idol_effects[index]),
+            'scarecrowEffect': self.scarecrow_effects[index],
+        }
+
+    def to_dict(self) -> Dict:
+        """
+        Returns the tile map in the engine's JSON layout
+        """
+        width = self.map_width
+        return {
+            'mapHeight': self.map_height,
+            'mapWidth': width,
+            'tiles': [[self.tile_dict(y * width + x) for x in range(width)] for y in range(self.map_height)],
+        }
+
+    def copy(self) -> 'TileMap':
+        """
+        Returns an independent copy of the map
+        """
+        tile_map = TileMap.__new__(TileMap)
+        tile_map.map_height = self.map_height
+        tile_map.map_width = self.map_width
+        for column in TileMap.COLUMNS:
+            setattr(tile_map, column, getattr(self, column)[:])
+        return tile_map
+
+    def index(self, x: int, y: int) -> int:
+        """
+        Returns the flat array index of the cell at (x, y)
+        """
+        return y * self.map_width + x
+
+    def position(self, index: int) -> Position:
+        """
+        Returns the Position of the cell at a flat array index
+        """
+        return Position(index % self.map_width, index // self.map_width)
+
     def get_tile(self, x: int, y: int) -> Tile:
-        return self.tiles[y][x]
\ No newline at end of file
+        return Tile(self, self.index(x, y))
+
+    @property
+    def tiles(self) -> List[List[Tile]]:
+        """
+        Row-major grid of Tile views, indexed as tiles[y][x]. The views read the
+        columns when accessed, so the grid is built on first use and reused.
+        """
+        if self._tiles is None:
+            width = self.map_width
+            self._tiles = [[Tile(self, y * width + x) for x in range(width)] for y in range(self.map_height)]
+        return self._tiles
+
+    def crop_mask(self) -> bytearray:
+        """
+        Returns a mask with a 1 for every cell that has a crop planted on it
+        """
+        return bytearray(crop_type is not CropType.NONE for crop_type in self.crop_types)
+
+    def value_mask(self, minimum: float = 0) -> bytearray:
+        """
+        Returns a mask with a 1 for every cell whose crop value is above minimum
+        """
+        return bytearray(value > minimum for value in self.crop_values)
+
+    def ripe_mask(self) -> bytearray:
+        """
+        Returns a mask with a 1 for every cell holding a fully grown crop
+        """
+        return bytearray(crop_type is not CropType.NONE and timer <= 0
+                         for crop_type, timer in zip(self.crop_types, self.growth_timers))
+
+    def tile_type_mask(self, tile_type: TileType) -> bytearray:
+        """
+        Returns a mask with a 1 for every cell of the given TileType
+        """
+        return bytearray(cell_type is tile_type for cell_type in self.tile_types)
+
+    def indices(self, mask: bytearray) -> List[int]:
+        """
+        Returns the flat indices set in a mask
+        """
+        return [i for i, flag in enumerate(mask) if flag]
+
+    def positions(self, mask: bytearray) -> List[Position]:
+        """
+        Returns the Positions set in a mask
+        """
+        return [self.position(i) for i in self.indices(mask)]
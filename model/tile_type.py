@@ -1,4 +1,17 @@
 from enum import Enum
+from api.constants import Constants
+
+# TileType name -> tiletype.<name>.fertility property stem
+_PROPERTY_NAMES = {
+    'GREEN_GROCER': 'greengrocer',
+    'GRASS': 'grass',
+    'ARID': 'arid',
+    'SOIL': 'soil',
+    'F_BAND_OUTER': 'fband_outer',
+    'F_BAND_MID': 'fband_mid',
+    'F_BAND_INNER': 'fband_inner',
+}
+
 
 class TileType(Enum):
     GREEN_GROCER = 1
@@ -9,8 +22,11 @@ class TileType(Enum):
     F_BAND_MID = 6
     F_BAND_INNER = 7
 
+    def __init__(self, *args):
+        self.fertility = Constants.TILE_FERTILITY[_PROPERTY_NAMES[self.name]]
+
     def __str__(self) -> str:
         return f"{self.name}"
 
     def get_fertility(self) -> float:
-        return float(self.config[f"tiletype.{self.name.lower()}.fertility"])
+        return self.fertility
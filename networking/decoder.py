@@ -0,0 +1,133 @@
+from model.game_state import GameState
+from model.player import Player
+from model.position import Position
+from networking import delta
+from typing import Dict, List, Optional, Set
+
+
+class IncrementalDecoder:
+    """
+    Turns engine game state dictionaries into GameState objects, reusing the
+    previous GameState instead of rebuilding it. Only the tile rows, tiles and
+    player fields that differ from the previous message are re-decoded.
+
+    The returned GameState is the same object every call (after the first),
+    patched in place, so don't hold on to it expecting last turn's values.
+    Its changed_cells attribute holds the Positions of the cells that were
+    patched, and its derived views are cleared.
+
+    State-diff messages (see networking.delta) are applied to the previous
+    state directly, without comparing whole documents.
+    """
+
+    def __init__(self) -> None:
+        self.game_state: Optional[GameState] = None
+        self._previous: Optional[Dict] = None
+
+    def reset(self) -> None:
+        """
+        Forgets the previous state so the next decode is a full one
+        """
+        self.game_state = None
+        self._previous = None
+
+    def decode(self, gamestate_dict: Dict) -> GameState:
+        if delta.is_patch(gamestate_dict):
+            return self._apply_patch(gamestate_dict[delta.PATCH_KEY])
+        previous = self._previous
+        game_state = self.game_state
+        if game_state is None or not self._compatible(previous, gamestate_dict):
+            game_state = GameState(gamestate_dict)
+        else:
+            self._patch_player(game_state.player1, previous['p1'], gamestate_dict['p1'])
+            self._patch_player(game_state.player2, previous['p2'], gamestate_dict['p2'])
+            game_state.changed_cells = self._patch_tiles(game_state, previous['tileMap']['tiles'],
+                                                         gamestate_dict['tileMap']['tiles'])
+            game_state.player_num = gamestate_dict['playerNum']
+            game_state.feedback = gamestate_dict['feedback']
+            if game_state.turn != gamestate_dict['turn']:
+                game_state.set_turn(gamestate_dict['turn'])
+            game_state.invalidate_views()
+
+        self.game_state = game_state
+        self._previous = gamestate_dict
+        return game_state
+
+    def _apply_patch(self, ops: List[Dict]) -> GameState:
+        game_state = self.game_state
+        if game_state is None:
+            raise IOError("Received a state diff before any full game state")
+        previous = delta.apply(self._previous, ops)
+        self._previous = previous
+
+        player_keys = {'p1': set(), 'p2': set()}
+        cells = set()
+        rebuild = False
+        for op in ops:
+            tokens = delta.split_path(op['path'])
+            head = tokens[0] if tokens else None
+            if head in player_keys:
+                if len(tokens) == 1:
+                    player_keys[head] = None
+                elif player_keys[head] is not None and tokens[1] in Player.KEYS:
+                    player_keys[head].add(tokens[1])
+            elif head == 'tileMap' and len(tokens) >= 3 and tokens[1] == 'tiles':
+                y = int(tokens[2])
+                if len(tokens) == 3:
+                    cells.update((x, y) for x in range(game_state.tile_map.map_width))
+                else:
+                    cells.add((int(tokens[3]), y))
+            elif head not in ('turn', 'playerNum', 'feedback'):
+                rebuild = True
+
+        if rebuild:
+            # The map's shape or the document root changed: start over
+            game_state = GameState(previous)
+            self.game_state = game_state
+            return game_state
+
+        for key, attribute in (('p1', 'player1'), ('p2', 'player2')):
+            keys = player_keys[key]
+            if keys is None:
+                setattr(game_state, attribute, Player(previous[key]))
+            elif keys:
+                getattr(game_state, attribute).update(previous[key], keys)
+        tile_map = game_state.tile_map
+        rows = previous['tileMap']['tiles']
+        for x, y in cells:
+            tile_map.set_tile(y * tile_map.map_width + x, rows[y][x])
+        game_state.changed_cells = {Position(x, y) for x, y in cells}
+        game_state.player_num = previous['playerNum']
+        game_state.feedback = previous['feedback']
+        if game_state.turn != previous['turn']:
+            game_state.set_turn(previous['turn'])
+        game_state.invalidate_views()
+        return game_state
+
+    @staticmethod
+    def _compatible(previous: Dict, current: Dict) -> bool:
+        old_map = previous['tileMap']
+        new_map = current['tileMap']
+        return old_map['mapWidth'] == new_map['mapWidth'] and old_map['mapHeight'] == new_map['mapHeight']
+
+    @staticmethod
+    def _patch_player(player, old_dict: Dict, new_dict: Dict) -> None:
+        if old_dict == new_dict:
+            return
+        player.update(new_dict, [key for key, value in new_dict.items()
+                                 if key in Player.KEYS and old_dict.get(key) != value])
+
+    @staticmethod
+    def _patch_tiles(game_state: GameState, old_rows: List[List[Dict]],
+                     new_rows: List[List[Dict]]) -> Set[Position]:
+        tile_map = game_state.tile_map
+        width = tile_map.map_width
+        changed = set()
+        for y, (old_row, new_row) in enumerate(zip(old_rows, new_rows)):
+            if old_row == new_row:
+                continue
+            for x, (old_tile, new_tile) in enumerate(zip(old_row, new_row)):
+                if old_tile != new_tile:
+                    tile_map.set_tile(y * width + x, new_tile)
+                    changed.add(Position(x, y))
+        return changed
@@ -0,0 +1,104 @@
+"""
+State-diff messages. Instead of the full game state, an engine that supports
+them can send only what changed since the previous message to the same
+player, as a JSON-patch style list of operations:
+
+    {"patch": [{"op": "replace", "path": "/p1/position/x", "value": 4},
+               {"op": "replace", "path": "/tileMap/tiles/3/12/crop/growthTimer", "value": 2},
+               {"op": "remove", "path": "/p2/harvestedInventory/0"}]}
+
+Paths are JSON pointers (RFC 6901) into the previous state and the ops are
+'add', 'remove' and 'replace'. A message without a "patch" key is a full state,
+so a client reading diffs keeps working against an engine that never sends them.
+"""
+from typing import Any, Dict, List
+
+PATCH_KEY = 'patch'
+
+
+def is_patch(message: Dict) -> bool:
+    return PATCH_KEY in message
+
+
+def _escape(token) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def split_path(path: str) -> List[str]:
+    """
+    Returns the unescaped reference tokens of a JSON pointer
+    """
+    if not path:
+        return []
+    return [_unescape(token) for token in path[1:].split('/')]
+
+
+def diff(old: Any, new: Any, path: str = '') -> List[Dict]:
+    """
+    Returns the operations that turn old into new. Dicts are compared key by key
+    and lists of the same length element by element; anything else that
+    differs is replaced whole.
+    """
+    ops = []
+    _diff(old, new, path, ops)
+    return ops
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Dict]) -> None:
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape(key)}"})
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            _diff(old_item, new_item, f"{path}/{i}", ops)
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def apply(document: Dict, ops: List[Dict]) -> Dict:
+    """
+    Applies operations to a document in place
+    :return: the patched document (a new object if an op replaced the root)
+    """
+    for op in ops:
+        tokens = split_path(op['path'])
+        kind = op['op']
+        if not tokens:
+            if kind != 'replace':
+                raise ValueError(f"Can't {kind} the whole document")
+            document = op['value']
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if kind == 'add':
+                parent.insert(len(parent) if last == '-' else int(last), op['value'])
+            elif kind == 'remove':
+                del parent[int(last)]
+            elif kind == 'replace':
+                parent[int(last)] = op['value']
+            else:
+                raise ValueError(f"Unknown patch op {kind!r}")
+        else:
+            if kind in ('add', 'replace'):
+                parent[last] = op['value']
+            elif kind == 'remove':
+                del parent[last]
+            else:
+                raise ValueError(f"Unknown patch op {kind!r}")
+    return document
@@ -0,0 +1,24 @@
+"""
+The engine starts every bot in a new process and waits for a heartbeat line
+before anything else. This module only imports sys, so a bot script can send
+the heartbeat before importing the rest of the client:
+
+    if __name__ == "__main__":
+        from networking import heartbeat
+        heartbeat.send()
+
+Game sends it through networking.io otherwise, and sending it twice is a no-op.
+"""
+import sys
+
+sent = False
+
+
+def send() -> None:
+    global sent
+    if sent:
+        return
+    stdout = sys.stdout.buffer
+    stdout.write(b"heartbeat\n")
+    stdout.flush()
+    sent = True
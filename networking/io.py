@@ -1,30 +1,164 @@
 from model.game_state import GameState
+from networking.decoder import IncrementalDecoder
+from networking import delta, heartbeat, json_backend
+from networking.latency import LatencyTracker
 import sys
-import json
 
+decoder = IncrementalDecoder()
+
+
+class LineReader:
+    """
+    Reads newline-terminated messages from a binary stream into one reusable
+    buffer. A line returned by readline() is a view into that buffer and is only
+    valid until the next call.
+    """
+
+    def __init__(self, stream, size: int = 1 << 19) -> None:
+        self.stream = stream
+        self.buffer = bytearray(size)
+        self.start = 0
+        self.end = 0
+        self.line = None
+
+    def readline(self) -> memoryview:
+        if self.line is not None:
+            self.line.release()
+            self.line = None
+
+        scanned = self.start
+        while True:
+            newline = self.buffer.find(b'\n', scanned, self.end)
+            if newline >= 0:
+                break
+            scanned = self.end
+            if self.end == len(self.buffer):
+                if self.start > 0:
+                    # Move the partial line to the front before reading more
+                    remaining = self.end - self.start
+                    self.buffer[:remaining] = self.buffer[self.start:self.end]
+                    self.start, self.end, scanned = 0, remaining, remaining
+                else:
+                    self.buffer.extend(bytes(len(self.buffer)))
+            with memoryview(self.buffer) as view:
+                count = self.stream.readinto1(view[self.end:])
+            if not count:
+                raise IOError("Engine closed the connection")
+            self.end += count
+
+        self.line = memoryview(self.buffer)[self.start:newline]
+        self.start = newline + 1
+        if self.start == self.end:
+            self.start = self.end = 0
+        return self.line
+
+
+_reader = None
+
+
+def _stdin_reader() -> LineReader:
+    global _reader
+    if _reader is None:
+        _reader = LineReader(sys.stdin.buffer)
+    return _reader
+
+
+def receive_gamestate(incremental: bool = False, latency: LatencyTracker = None, record=None) -> GameState:
+    """
+    Reads and decodes the next game state sent by the engine
+    :param incremental: patch the previously received GameState in place instead
+                        of building a new one (see networking.decoder). State-diff
+                        messages (see networking.delta) need this.
+    :param latency: optional tracker to record the read, decode and build phases on
+    :param record: optional binary file every raw game state line is appended to
+    :return: GameState for this half-turn
+    """
+    gamestate_bytes = _stdin_reader().readline()
+    if latency is not None:
+        latency.lap('read')
+    if record is not None:
+        record.write(gamestate_bytes)
+        record.write(b'\n')
+        record.flush()
+    return decode_gamestate(gamestate_bytes, decoder if incremental else None, latency)
+
+
+def decode_gamestate(gamestate_bytes, state_decoder: IncrementalDecoder = None,
+                     latency: LatencyTracker = None) -> GameState:
+    """
+    Decodes one game state line
+    :param gamestate_bytes: the JSON document as bytes, bytearray or memoryview
+    :param state_decoder: IncrementalDecoder to patch the previous GameState with,
+                          or None to build a new GameState (full states only)
+    :param latency: optional tracker to record the decode and build phases on
+    :return: GameState for this half-turn
+    """
+    gamestate_dict = json_backend.loads(gamestate_bytes)
+    if latency is not None:
+        latency.lap('decode')
+    if state_decoder is not None:
+        game_state = state_decoder.decode(gamestate_dict)
+    elif delta.is_patch(gamestate_dict):
+        raise IOError("Received a state diff without incremental decoding")
+    else:
+        game_state = GameState(gamestate_dict)
+    if latency is not None:
+        latency.lap('build')
+    return game_state
 
-def receive_gamestate():
-    gamestate_bytes = sys.stdin.readline()
-    gamestate_dict = json.loads(gamestate_bytes)
-    a = GameState(gamestate_dict)
-    return a
 
 def readline() -> str:
-    return sys.stdin.readline()
+    return bytes(_stdin_reader().readline()).decode()
+
+def send_bytes(message) -> None:
+    """
+    Writes an already newline-terminated message to stdout and flushes it, in
+    one write call
+    :param message: bytes, bytearray or memoryview
+    """
+    stdout = sys.stdout.buffer
+    stdout.write(message)
+    stdout.flush()
 
 def send_string(s: str):
-    print(s)
+    send_bytes(f"{s}\n".encode())
 
 def send_heartbeat():
-    print("heartbeat")
+    # No-op if the bot script already sent it before its imports
+    heartbeat.send()
 
 
 class Logger:
-    def __init__(self) -> None:
-        pass
+    # Set to False to silence every Logger, e.g. while simulating many games
+    enabled = True
+
+    def __init__(self, path: str = None) -> None:
+        """
+        :param path: file to append messages to instead of stderr
+        """
+        self.file = open(path, 'a') if path is not None else None
+
+    def _write(self, message: str) -> None:
+        if not Logger.enabled:
+            return
+        print(message, file=self.file or sys.stderr, flush=True)
 
     def info(self, message) -> None:
-        print(f"info: {str(message)}", file=sys.stderr, flush=True)
+        self._write(f"info: {str(message)}")
 
     def debug(self, message: str) -> None:
-        print(f"debug: {str(message)}", file=sys.stderr, flush=True)
+        self._write(f"debug: {str(message)}")
+
+    def close(self) -> None:
+        """
+        Closes the log file; messages after this go to stderr
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> 'Logger':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,81 @@
+"""
+Pluggable JSON parser used to decode engine messages. The fastest installed
+backend is picked on the first loads(), falling back to the standard library,
+so importing this module doesn't delay a bot's heartbeat.
+"""
+from typing import Any, Callable, Dict, List
+
+
+def _load_orjson():
+    import orjson
+    # orjson parses bytes, bytearray and memoryview without copying
+    return orjson.loads
+
+
+def _load_ujson():
+    import ujson
+    return lambda data: ujson.loads(bytes(data))
+
+
+def _load_json():
+    import json
+    return lambda data: json.loads(bytes(data))
+
+
+# In order of preference
+_BACKENDS: Dict[str, Callable[[], Callable[[Any], Any]]] = {
+    'orjson': _load_orjson,
+    'ujson': _load_ujson,
+    'json': _load_json,
+}
+
+backend_name = None
+_loads = None
+
+
+def available_backends() -> List[str]:
+    """
+    Returns the names of the backends that can be imported, fastest first
+    """
+    names = []
+    for name, load in _BACKENDS.items():
+        try:
+            load()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_backend(name: str) -> None:
+    """
+    Selects the parser used by loads()
+    :param name: one of 'orjson', 'ujson' or 'json'
+    """
+    global backend_name, _loads
+    _loads = _BACKENDS[name]()
+    backend_name = name
+
+
+def set_fastest_backend() -> None:
+    """
+    Selects the first backend, in order of preference, that can be imported
+    """
+    for name, load in _BACKENDS.items():
+        try:
+            load()
+        except ImportError:
+            continue
+        set_backend(name)
+        return
+
+
+def loads(data) -> Any:
+    """
+    Parses a JSON document
+    :param data: bytes, bytearray or memoryview holding the document
+    :return: the decoded Python object
+    """
+    if _loads is None:
+        set_fastest_backend()
+    return _loads(data)
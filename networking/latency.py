@@ -0,0 +1,186 @@
+"""
+Per-half-turn timing for the Game loop: how long each phase took, rolling
+percentiles over recent half-turns, how much of the engine timeout is left,
+and optional per-half-turn profiling of the strategy.
+"""
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Sequence
+import math
+import signal
+import time
+
+from api.constants import Constants
+
+PHASES = ('read', 'decode', 'build', 'strategy', 'encode', 'write')
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Returns the q-th percentile (0-100, nearest rank) of already sorted values,
+    or 0.0 if there are none
+    """
+    if not values:
+        return 0.0
+    rank = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[min(rank, len(values) - 1)]
+
+
+class LatencyTracker:
+    """
+    Records the duration of every phase of a half-turn.
+
+    Call start() before reading a game state, then lap(phase) at the end of each
+    phase, then finish() after the decision is written. The engine's timeout
+    clock is taken to start once the state has been read (the 'read' lap),
+    because time spent blocked on stdin is the engine and opponent thinking.
+    """
+
+    def __init__(self, budget_ms: float = Constants.PLAYER_TIMEOUT, window: int = 360) -> None:
+        """
+        :param budget_ms: time allowed per decision (networking.timeout.player)
+        :param window: number of half-turns kept for the rolling percentiles
+        """
+        self.budget_ms = budget_ms
+        self.samples: Dict[str, Deque[float]] = {phase: deque(maxlen=window) for phase in PHASES + ('total',)}
+        self.current: Dict[str, float] = {}
+        self.half_turns = 0
+        self._last = None
+        self._budget_start = None
+
+    def start(self) -> None:
+        self.current = {}
+        self._last = time.perf_counter()
+        self._budget_start = None
+
+    def lap(self, phase: str) -> float:
+        """
+        Records the time since the previous lap (or start()) under phase
+        :return: the phase duration in milliseconds
+        """
+        now = time.perf_counter()
+        if self._last is None:
+            self._last = now
+        elapsed = (now - self._last) * 1000
+        self.current[phase] = self.current.get(phase, 0.0) + elapsed
+        self._last = now
+        if phase == 'read':
+            self._budget_start = now
+        return elapsed
+
+    def finish(self) -> None:
+        """
+        Closes the half-turn and adds its phase times to the rolling window
+        """
+        for phase, elapsed in self.current.items():
+            self.samples.setdefault(phase, deque(maxlen=self.samples['total'].maxlen)).append(elapsed)
+        self.samples['total'].append(sum(elapsed for phase, elapsed in self.current.items() if phase != 'read'))
+        self.half_turns += 1
+        self._last = None
+
+    def elapsed_ms(self) -> float:
+        """
+        Returns the time used so far against this half-turn's budget
+        """
+        if self._budget_start is None:
+            return 0.0
+        return (time.perf_counter() - self._budget_start) * 1000
+
+    def remaining_ms(self) -> float:
+        """
+        Returns how much of the engine timeout is left for this half-turn
+        """
+        return self.budget_ms - self.elapsed_ms()
+
+    def percentile(self, phase: str, q: float) -> float:
+        """
+        Returns the q-th percentile (0-100, nearest rank) of a phase over the window
+        """
+        return percentile(sorted(self.samples.get(phase, ())), q)
+
+    def summary(self, quantiles=(50, 90, 99)) -> str:
+        """
+        Returns a one-line report of the rolling percentiles of every phase
+        """
+        parts = []
+        for phase, values in self.samples.items():
+            if values:
+                parts.append(f"{phase} " + "/".join(f"{self.percentile(phase, q):.2f}" for q in quantiles))
+        return f"[{self.half_turns} half-turns, p{'/p'.join(map(str, quantiles))} ms] " + ", ".join(parts)
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler. A CPU-time interval timer interrupts the
+    process and the signal handler counts the function that was executing.
+    Only available on platforms with signal.setitimer (not Windows).
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._previous_handler = None
+
+    def _sample(self, signum, frame) -> None:
+        if frame is not None:
+            code = frame.f_code
+            self.counts[f"{code.co_filename}:{frame.f_lineno}({code.co_name})"] += 1
+            self.samples += 1
+
+    def enable(self) -> None:
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def disable(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+    def report(self, limit: int = 15) -> str:
+        lines = [f"{self.samples} samples"]
+        for location, count in self.counts.most_common(limit):
+            lines.append(f"{count:6d} {100 * count / max(self.samples, 1):5.1f}% {location}")
+        self.counts.clear()
+        self.samples = 0
+        return "\n".join(lines)
+
+
+class CProfileProfiler:
+    """
+    Deterministic profiler built on cProfile
+    """
+
+    def __init__(self, sort: str = 'cumulative') -> None:
+        # Imported here, since they are slow to import and most games run unprofiled
+        import cProfile
+        self.sort = sort
+        self.profile = cProfile.Profile()
+
+    def enable(self) -> None:
+        self.profile.enable()
+
+    def disable(self) -> None:
+        self.profile.disable()
+
+    def report(self, limit: int = 15) -> str:
+        import cProfile
+        import io
+        import pstats
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(self.sort).print_stats(limit)
+        self.profile = cProfile.Profile()
+        return stream.getvalue()
+
+
+PROFILERS = {
+    'cprofile': CProfileProfiler,
+    'sampling': SamplingProfiler,
+}
+
+
+def make_profiler(name: Optional[str]):
+    """
+    Returns a new profiler by name ('cprofile' or 'sampling'), or None
+    """
+    if name is None:
+        return None
+    return PROFILERS[name]()
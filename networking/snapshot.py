@@ -0,0 +1,415 @@
+"""
+Compact binary recording of GameStates.
+
+A recording is a header, one record per half-turn and an index of record
+offsets at the end:
+
+    header   MAGIC, then <HB: keyframe interval, zlib level (0 = stored)
+    record   <BI: kind (KEYFRAME or DELTA), payload length, then the payload
+    index    <Q offset of every record, then <QI: index offset, record count,
+             then INDEX_MAGIC
+
+A payload holds the turn, the player number, both players as packed structs,
+the feedback strings and the tile map. Keyframes hold every TileMap column.
+A delta holds, for every column, the indices of the cells that changed
+since the previous record and their new values. Every keyframe_interval-th
+record is a keyframe, so SnapshotReader decodes turn N from the keyframe
+before it plus at most keyframe_interval - 1 deltas. It never touches
+earlier records. Each payload is compressed on its own, and the reader
+memory-maps the file, so only the records it decodes are read.
+
+Enum members are stored as their values, the int columns as 4-byte
+little-endian and the float columns as little-endian doubles, so decoding
+gives back the same model values. A recording cut short (e.g. a bot that
+was killed) has no index, and the reader finds its records by walking them
+from the header instead.
+"""
+from array import array
+from typing import Iterator, List, Optional, Set, Tuple
+import mmap
+import struct
+import sys
+import zlib
+
+from model.crop_type import CropType
+from model.game_state import GameState
+from model.item_type import ItemType
+from model.player import Player
+from model.position import Position
+from model.tile_map import TileMap
+from model.tile_type import TileType
+from model.upgrade_type import UpgradeType
+
+MAGIC = b"MMSNAP\x00\x01"
+INDEX_MAGIC = b"MMSNIDX\x00"
+# Conventional file suffix; Game(record_path=...) records snapshots to paths ending in it
+SUFFIX = ".snap"
+
+KEYFRAME = 0
+DELTA = 1
+KEYFRAME_INTERVAL = 20
+
+_HEADER = struct.Struct('<HB')
+_RECORD = struct.Struct('<BI')
+_FOOTER = struct.Struct('<QI')
+_FRAME = struct.Struct('<iBHH')
+# x, y, upgrade, item, money, discount, double drop chance, protection, harvest and
+# plant radius, carrying capacity, max movement, used item, has drone, has
+# thermos, item time expired
+_PLAYER = struct.Struct('<hhBBdddiiiiiBBBB')
+_COUNT = struct.Struct('<I')
+_SEED = struct.Struct('<Bi')
+_CROP = struct.Struct('<Bid')
+
+_SWAP = sys.byteorder != 'little'
+
+
+def _by_value(enum) -> list:
+    """
+    Returns a list mapping an enum value to its member
+    """
+    members = [None] * (max(member.value for member in enum) + 1)
+    for member in enum:
+        members[member.value] = member
+    return members
+
+
+_CROPS = _by_value(CropType)
+_ITEMS = _by_value(ItemType)
+_UPGRADES = _by_value(UpgradeType)
+
+# TileMap column -> enum whose members it holds, array typecode, or None for a bytearray
+_COLUMNS = {
+    'tile_types': _by_value(TileType),
+    'crop_types': _CROPS,
+    'growth_timers': 'i',
+    'crop_values': 'd',
+    'turns_left_to_grow': 'i',
+    'p1_items': _ITEMS,
+    'p2_items': _ITEMS,
+    'rain_totem_effects': None,
+    'fertility_idol_effects': None,
+    'scarecrow_effects': 'i',
+}
+assert tuple(_COLUMNS) == TileMap.COLUMNS
+
+
+def _pack_column(kind, values) -> bytes:
+    if kind is None:
+        return bytes(values)
+    if isinstance(kind, list):
+        return bytes(member.value for member in values)
+    if not isinstance(values, array):
+        values = array(kind, values)
+    if _SWAP:
+        values = array(kind, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_column(kind, data):
+    if kind is None:
+        return bytearray(data)
+    if isinstance(kind, list):
+        return list(map(kind.__getitem__, data))
+    values = array(kind)
+    values.frombytes(data)
+    if _SWAP:
+        values.byteswap()
+    return values
+
+
+def _column_size(kind, count: int) -> int:
+    return count * (array(kind).itemsize if isinstance(kind, str) else 1)
+
+
+def _pack_string(text: str, out: List[bytes]) -> None:
+    data = text.encode()
+    out.append(_COUNT.pack(len(data)))
+    out.append(data)
+
+
+def _pack_player(player: Player, out: List[bytes]) -> None:
+    out.append(_PLAYER.pack(player.position.x, player.position.y, player.upgrade.value, player.item.value,
+                            player.money, player.discount, player.double_drop_chance, player.protection_radius,
+                            player.harvest_radius, player.plant_radius, player.carring_capacity,
+                            player.max_movement, player.used_item, player.has_delivery_drone,
+                            player.has_coffee_thermos, player.item_time_expired))
+    _pack_string(player.name, out)
+    out.append(_COUNT.pack(len(player.seed_inventory)))
+    out.extend(_SEED.pack(crop.value, count) for crop, count in player.seed_inventory.items())
+    out.append(_COUNT.pack(len(player.harvested_inventory)))
+    out.extend(_CROP.pack(CropType[crop['type']].value, crop['growthTimer'], crop['value'])
+               for crop in player.harvested_inventory)
+
+
+class _Cursor:
+    """
+    Reads fields off a payload in order
+    """
+
+    def __init__(self, data) -> None:
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def take(self, size: int):
+        data = self.data[self.offset:self.offset + size]
+        self.offset += size
+        return data
+
+    def string(self) -> str:
+        size, = self.unpack(_COUNT)
+        return bytes(self.take(size)).decode()
+
+
+def _unpack_player(cursor: _Cursor) -> Player:
+    (x, y, upgrade, item, money, discount, double_drop_chance, protection_radius, harvest_radius,
+     plant_radius, carrying_capacity, max_movement, used_item, has_delivery_drone, has_coffee_thermos,
+     item_time_expired) = cursor.unpack(_PLAYER)
+    player = Player.__new__(Player)
+    player.position = Position(x, y)
+    player.upgrade = _UPGRADES[upgrade]
+    player.item = _ITEMS[item]
+    player.money = money
+    player.discount = discount
+    player.double_drop_chance = double_drop_chance
+    player.protection_radius = protection_radius
+    player.harvest_radius = harvest_radius
+    player.plant_radius = plant_radius
+    player.carring_capacity = carrying_capacity
+    player.max_movement = max_movement
+    player.used_item = bool(used_item)
+    player.has_delivery_drone = bool(has_delivery_drone)
+    player.has_coffee_thermos = bool(has_coffee_thermos)
+    player.item_time_expired = bool(item_time_expired)
+    player.name = cursor.string()
+    count, = cursor.unpack(_COUNT)
+    seeds = (cursor.unpack(_SEED) for _ in range(count))
+    player.seed_inventory = {_CROPS[crop]: seed_count for crop, seed_count in seeds}
+    count, = cursor.unpack(_COUNT)
+    crops = (cursor.unpack(_CROP) for _ in range(count))
+    player.harvested_inventory = [{'type': _CROPS[crop].name, 'growthTimer': timer, 'value': value}
+                                  for crop, timer, value in crops]
+    return player
+
+
+def encode(game_state: GameState, previous: Optional[TileMap] = None) -> bytes:
+    """
+    Packs a GameState into an uncompressed payload
+    :param previous: tile map of the previous record to store the changes
+                     against, or None for a keyframe
+    """
+    tile_map = game_state.tile_map
+    out = [_FRAME.pack(game_state.turn, game_state.player_num, tile_map.map_width, tile_map.map_height)]
+    _pack_player(game_state.player1, out)
+    _pack_player(game_state.player2, out)
+    out.append(_COUNT.pack(len(game_state.feedback)))
+    for message in game_state.feedback:
+        _pack_string(message, out)
+
+    for name, kind in _COLUMNS.items():
+        column = getattr(tile_map, name)
+        if previous is None:
+            out.append(_pack_column(kind, column))
+            continue
+        old = getattr(previous, name)
+        # Comparing arrays with == goes element by element in Python; compare their bytes
+        if (column.tobytes() == old.tobytes()) if isinstance(column, array) else column == old:
+            out.append(_COUNT.pack(0))
+            continue
+        indices = array('I', [i for i, (new, before) in enumerate(zip(column, old)) if new != before])
+        out.append(_COUNT.pack(len(indices)))
+        out.append(_pack_column('I', indices))
+        out.append(_pack_column(kind, [column[i] for i in indices]))
+    return b"".join(out)
+
+
+def decode(payload, previous: Optional[GameState] = None) -> GameState:
+    """
+    Unpacks a payload into a new GameState
+    :param previous: the state of the record before, which a delta payload is
+                     applied to (on a copy of its tile map); None for a keyframe
+    :return: the GameState; after a delta, its changed_cells holds the
+             Positions of the cells that changed
+    """
+    cursor = _Cursor(payload)
+    turn, player_num, width, height = cursor.unpack(_FRAME)
+    player1 = _unpack_player(cursor)
+    player2 = _unpack_player(cursor)
+    count, = cursor.unpack(_COUNT)
+    feedback = [cursor.string() for _ in range(count)]
+
+    changed_cells: Optional[Set[Position]] = None
+    if previous is None:
+        tile_map = TileMap.__new__(TileMap)
+        tile_map.map_width, tile_map.map_height = width, height
+        for name, kind in _COLUMNS.items():
+            setattr(tile_map, name, _unpack_column(kind, cursor.take(_column_size(kind, width * height))))
+    else:
+        tile_map = previous.tile_map.copy()
+        changed = set()
+        for name, kind in _COLUMNS.items():
+            count, = cursor.unpack(_COUNT)
+            if not count:
+                continue
+            indices = _unpack_column('I', cursor.take(_column_size('I', count)))
+            values = _unpack_column(kind, cursor.take(_column_size(kind, count)))
+            column = getattr(tile_map, name)
+            for index, value in zip(indices, values):
+                column[index] = value
+            changed.update(indices)
+        changed_cells = {Position(index % width, index // width) for index in changed}
+
+    game_state = GameState.from_parts(turn, player1, player2, tile_map, player_num, feedback)
+    game_state.changed_cells = changed_cells
+    return game_state
+
+
+class SnapshotWriter:
+    """
+    Appends GameStates to a recording. Every record is flushed as it is
+    written, so a recording cut short is still readable up to its last record.
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = KEYFRAME_INTERVAL, level: int = 6) -> None:
+        """
+        :param keyframe_interval: records from one keyframe to the next
+        :param level: zlib compression level, 0 to store payloads uncompressed
+        """
+        self.file = open(path, 'wb')
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.offsets = array('Q')
+        self._previous: Optional[TileMap] = None
+        self.file.write(MAGIC + _HEADER.pack(keyframe_interval, level))
+        self.file.flush()
+
+    def write(self, game_state: GameState) -> None:
+        previous = self._previous
+        if previous is not None and (len(self.offsets) % self.keyframe_interval == 0
+                                     or previous.map_width != game_state.tile_map.map_width
+                                     or previous.map_height != game_state.tile_map.map_height):
+            previous = None
+        payload = encode(game_state, previous)
+        if self.level:
+            payload = zlib.compress(payload, self.level)
+        self.offsets.append(self.file.tell())
+        self.file.write(_RECORD.pack(KEYFRAME if previous is None else DELTA, len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        # The decoder may patch this tile map in place, so keep our own copy to diff against
+        self._previous = game_state.tile_map.copy()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(_pack_column('Q', self.offsets))
+        self.file.write(_FOOTER.pack(index_offset, len(self.offsets)) + INDEX_MAGIC)
+        self.file.close()
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SnapshotReader:
+    """
+    Random access to the GameStates of a recording. reader[n] decodes the
+    n-th recorded half-turn from the keyframe before it. Reading states in
+    order decodes every record once.
+
+    Treat the returned GameStates as read-only: the next delta is applied to a
+    copy of the last decoded tile map, but players and feedback are rebuilt
+    every time.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise IOError(f"{path} is not a game state recording")
+        self.keyframe_interval, self.level = _HEADER.unpack_from(self.data, len(MAGIC))
+        self.offsets = self._read_index() or self._scan()
+        self._last: Optional[Tuple[int, GameState]] = None
+
+    def _read_index(self) -> Optional[array]:
+        data = self.data
+        end = len(data) - len(INDEX_MAGIC)
+        if end < _FOOTER.size or data[end:] != INDEX_MAGIC:
+            return None
+        index_offset, count = _FOOTER.unpack_from(data, end - _FOOTER.size)
+        return _unpack_column('Q', data[index_offset:index_offset + _column_size('Q', count)])
+
+    def _scan(self) -> array:
+        """
+        Finds the records of a recording without an index, stopping at the
+        first incomplete one
+        """
+        offsets = array('Q')
+        offset = len(MAGIC) + _HEADER.size
+        while offset + _RECORD.size <= len(self.data):
+            _, size = _RECORD.unpack_from(self.data, offset)
+            if offset + _RECORD.size + size > len(self.data):
+                break
+            offsets.append(offset)
+            offset += _RECORD.size + size
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def kind(self, n: int) -> int:
+        return self.data[self.offsets[n]]
+
+    def payload(self, n: int) -> bytes:
+        """
+        Returns the uncompressed payload of the n-th record
+        """
+        offset = self.offsets[n]
+        _, size = _RECORD.unpack_from(self.data, offset)
+        start = offset + _RECORD.size
+        payload = self.data[start:start + size]
+        return zlib.decompress(payload) if self.level else payload
+
+    def __getitem__(self, n: int) -> GameState:
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(f"Recording has {len(self)} states")
+        if self._last is not None and self._last[0] == n:
+            return self._last[1]
+
+        start = n
+        while self.kind(start) != KEYFRAME:
+            start -= 1
+        game_state = None
+        if self._last is not None and start <= self._last[0] < n:
+            start, game_state = self._last
+            start += 1
+        for index in range(start, n + 1):
+            game_state = decode(self.payload(index), game_state if self.kind(index) == DELTA else None)
+        self._last = (n, game_state)
+        return game_state
+
+    def __iter__(self) -> Iterator[GameState]:
+        for n in range(len(self)):
+            yield self[n]
+
+    def close(self) -> None:
+        self._last = None
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> 'SnapshotReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,76 @@
+import json
+import unittest
+
+from api.crop_index import CropIndex
+from model.crop_type import CropType
+from model.item_type import ItemType
+from model.position import Position
+from model.upgrade_type import UpgradeType
+from networking.decoder import IncrementalDecoder
+from networking.io import Logger
+from tools.replay import Strategy
+from tools.simulator import SimGame, Simulator
+from tools.tournament import load_bot
+
+
+def simulated_states(turns: int, incremental: bool):
+    """
+    Yields the GameStates player 1 sees over the first turns of a game between
+    bot and bot2, either built straight from the simulator (no changed_cells)
+    or decoded incrementally from the engine's JSON (with changed_cells)
+    """
+    simulator = Simulator(ItemType.NONE, UpgradeType.NONE, ItemType.NONE, UpgradeType.NONE, 0)
+    strategies = [Strategy(load_bot('bot', 2)), Strategy(load_bot('bot2', 2))]
+    games = [SimGame(), SimGame()]
+    decoder = IncrementalDecoder()
+    was_enabled = Logger.enabled
+    Logger.enabled = False
+    try:
+        while simulator.turn < turns:
+            for step, phase in ((simulator.move, 'move'), (simulator.act, 'action')):
+                for game, game_state in zip(games, simulator.game_states()):
+                    game.game_state = game_state
+                if incremental:
+                    yield decoder.decode(json.loads(json.dumps(simulator.state_dict(1))))
+                else:
+                    yield games[0].game_state
+                step(*[game.decide(getattr(strategy, phase)) for game, strategy in zip(games, strategies)])
+    finally:
+        Logger.enabled = was_enabled
+
+
+class CropIndexTest(unittest.TestCase):
+
+    def check_against_scan(self, incremental: bool):
+        index = CropIndex()
+        harvested = 0
+        previous = set()
+        for game_state in simulated_states(60, incremental):
+            index.update(game_state)
+            tile_map = game_state.tile_map
+            width = tile_map.map_width
+            ripe = {cell: tile_map.crop_values[cell] for cell in range(width * tile_map.map_height)
+                    if tile_map.crop_types[cell] is not CropType.NONE and tile_map.growth_timers[cell] <= 0}
+            message = f"turn {game_state.turn}"
+            self.assertEqual(sorted(index.ripe()), sorted(ripe), message)
+            self.assertEqual(index.ripe_values(), ripe, message)
+            for radius in (1, 2):
+                for cell in range(0, width * tile_map.map_height, 7):
+                    x, y = cell % width, cell // width
+                    expected = sum(value for other, value in ripe.items()
+                                   if abs(other % width - x) + abs(other // width - y) <= radius)
+                    self.assertAlmostEqual(index.harvestable_value(Position(x, y), radius), expected, msg=message)
+            harvested += len(previous - set(ripe))
+            previous = set(ripe)
+        # Crops ripened and were harvested along the way
+        self.assertGreater(harvested, 0)
+
+    def test_matches_scan(self):
+        self.check_against_scan(incremental=False)
+
+    def test_matches_scan_with_changed_cells(self):
+        self.check_against_scan(incremental=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from model.game_state import GameState
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+from networking.decoder import IncrementalDecoder
+from networking.io import Logger
+from tools.replay import Strategy
+from tools.simulator import SimGame, Simulator
+from tools.snapshot import state_key
+from tools.tournament import load_bot
+
+
+def simulated_lines(turns: int):
+    """
+    Returns the JSON lines the engine would send each player over the first
+    turns of a game between bot and bot2, as ([player 1 lines], [player 2 lines])
+    """
+    simulator = Simulator(ItemType.DELIVERY_DRONE, UpgradeType.LONGER_LEGS, ItemType.NONE, UpgradeType.NONE, 0)
+    strategies = [Strategy(load_bot('bot', 2)), Strategy(load_bot('bot2', 2))]
+    games = [SimGame(), SimGame()]
+    lines = ([], [])
+    was_enabled = Logger.enabled
+    Logger.enabled = False
+    try:
+        while simulator.turn < turns:
+            for step, phase in ((simulator.move, 'move'), (simulator.act, 'action')):
+                for number in (1, 2):
+                    state = simulator.state_dict(number)
+                    # A key the engine may add that Player doesn't read
+                    state['p1']['engineOnly'] = simulator.turn
+                    lines[number - 1].append(json.dumps(state))
+                for game, game_state in zip(games, simulator.game_states()):
+                    game.game_state = game_state
+                step(*[game.decide(getattr(strategy, phase)) for game, strategy in zip(games, strategies)])
+    finally:
+        Logger.enabled = was_enabled
+    return lines
+
+
+class IncrementalDecoderTest(unittest.TestCase):
+
+    def test_matches_full_decode(self):
+        for lines in simulated_lines(40):
+            decoder = IncrementalDecoder()
+            changed = 0
+            for line in lines:
+                game_state = decoder.decode(json.loads(line))
+                self.assertEqual(state_key(game_state), state_key(GameState(json.loads(line))))
+                changed += len(game_state.changed_cells or ())
+            # The game got far enough for crops to be planted and grow
+            self.assertGreater(changed, 0)
+
+    def test_reset(self):
+        lines, _ = simulated_lines(2)
+        decoder = IncrementalDecoder()
+        first = decoder.decode(json.loads(lines[0]))
+        decoder.reset()
+        self.assertIsNot(decoder.decode(json.loads(lines[1])), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
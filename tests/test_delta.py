@@ -0,0 +1,131 @@
+import copy
+import unittest
+
+from model.game_state import GameState
+from networking import delta
+from networking.decoder import IncrementalDecoder
+from tools.simulator import Simulator
+from tools.snapshot import state_key
+
+
+def next_state(state, turn: int):
+    """
+    Returns a copy of an engine state dict a turn later, with a few tiles and
+    player fields changed
+    """
+    state = copy.deepcopy(state)
+    state['turn'] = turn
+    state['p1']['money'] += 10
+    state['p1']['position'] = {'x': turn % 30, 'y': 2}
+    state['p2']['harvestedInventory'] = [{'type': 'CORN', 'growthTimer': 0, 'value': 3.0}] * (turn % 3)
+    tile = state['tileMap']['tiles'][10][turn % 30]
+    tile['crop'] = {'type': 'POTATO', 'growthTimer': turn, 'value': 1.5}
+    tile['turnsLeftToGrow'] = turn
+    state['feedback'] = [f"turn {turn}"]
+    return state
+
+
+class DiffTest(unittest.TestCase):
+
+    def test_split_path(self):
+        self.assertEqual(delta.split_path(''), [])
+        self.assertEqual(delta.split_path('/p1/money'), ['p1', 'money'])
+        self.assertEqual(delta.split_path('/a~1b/c~0d/~01'), ['a/b', 'c~d', '~1'])
+
+    def test_round_trip(self):
+        old = {'a': 1, 'b': [1, 2, 3], 'c': {'d': 'x', 'e/f': 2}, 'gone': True, 'short': [1]}
+        new = {'a': 2, 'b': [1, 5, 3], 'c': {'d': 'y', 'e/f': 2, 'g~': None}, 'short': [1, 2], 'added': []}
+        ops = delta.diff(old, new)
+        self.assertIn({'op': 'remove', 'path': '/gone'}, ops)
+        self.assertIn({'op': 'replace', 'path': '/b/1', 'value': 5}, ops)
+        self.assertIn({'op': 'replace', 'path': '/short', 'value': [1, 2]}, ops)
+        self.assertIn({'op': 'add', 'path': '/c/g~0', 'value': None}, ops)
+        self.assertEqual(delta.apply(copy.deepcopy(old), ops), new)
+        self.assertEqual(delta.diff(new, new), [])
+
+    def test_list_ops(self):
+        document = {'items': [1, 2, 3]}
+        delta.apply(document, [{'op': 'add', 'path': '/items/-', 'value': 4},
+                               {'op': 'add', 'path': '/items/0', 'value': 0},
+                               {'op': 'remove', 'path': '/items/2'}])
+        self.assertEqual(document, {'items': [0, 1, 3, 4]})
+
+    def test_root(self):
+        self.assertEqual(delta.apply({'a': 1}, delta.diff({'a': 1}, [1])), [1])
+        with self.assertRaises(ValueError):
+            delta.apply({}, [{'op': 'remove', 'path': ''}])
+        with self.assertRaises(ValueError):
+            delta.apply({'a': 1}, [{'op': 'move', 'path': '/a'}])
+
+
+class ApplyPatchTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.states = [Simulator().state_dict(1)]
+        for turn in range(2, 8):
+            self.states.append(next_state(self.states[-1], turn))
+
+    def check(self, decoder: IncrementalDecoder, state) -> GameState:
+        game_state = decoder.game_state
+        self.assertEqual(state_key(game_state), state_key(GameState(copy.deepcopy(state))))
+        return game_state
+
+    def test_diffs(self):
+        decoder = IncrementalDecoder()
+        first = decoder.decode(copy.deepcopy(self.states[0]))
+        for old, new in zip(self.states, self.states[1:]):
+            game_state = decoder.decode({delta.PATCH_KEY: delta.diff(old, new)})
+            self.assertIs(game_state, first)
+            self.check(decoder, new)
+            self.assertEqual({position.y for position in game_state.changed_cells}, {10})
+
+    def test_row_replace(self):
+        decoder = IncrementalDecoder()
+        decoder.decode(copy.deepcopy(self.states[0]))
+        new = next_state(self.states[0], 2)
+        ops = [{'op': 'replace', 'path': '/tileMap/tiles/10', 'value': copy.deepcopy(new['tileMap']['tiles'][10])}]
+        new['p1'], new['p2'], new['turn'], new['feedback'] = (copy.deepcopy(self.states[0][key])
+                                                              for key in ('p1', 'p2', 'turn', 'feedback'))
+        game_state = decoder.decode({delta.PATCH_KEY: ops})
+        self.check(decoder, new)
+        self.assertEqual({position.y for position in game_state.changed_cells}, {10})
+        self.assertEqual(len(game_state.changed_cells), game_state.tile_map.map_width)
+
+    def test_whole_player_replace(self):
+        decoder = IncrementalDecoder()
+        game_state = decoder.decode(copy.deepcopy(self.states[0]))
+        player1 = game_state.player1
+        new = copy.deepcopy(self.states[0])
+        new['p1']['money'] = 1234.5
+        new['p1']['name'] = 'someone-else'
+        ops = [{'op': 'replace', 'path': '/p1', 'value': copy.deepcopy(new['p1'])}]
+        game_state = decoder.decode({delta.PATCH_KEY: ops})
+        self.check(decoder, new)
+        self.assertIsNot(game_state.player1, player1)
+        self.assertEqual(game_state.player1.money, 1234.5)
+
+    def test_unknown_player_key(self):
+        decoder = IncrementalDecoder()
+        decoder.decode(copy.deepcopy(self.states[0]))
+        decoder.decode({delta.PATCH_KEY: [{'op': 'add', 'path': '/p2/newEngineField', 'value': 1},
+                                          {'op': 'replace', 'path': '/p2/money', 'value': 7.0}]})
+        self.assertEqual(decoder.game_state.player2.money, 7.0)
+
+    def test_rebuild_on_resize(self):
+        decoder = IncrementalDecoder()
+        first = decoder.decode(copy.deepcopy(self.states[0]))
+        new = copy.deepcopy(self.states[0])
+        new['tileMap']['tiles'] = [row[:20] for row in new['tileMap']['tiles']]
+        new['tileMap']['mapWidth'] = 20
+        game_state = decoder.decode({delta.PATCH_KEY: delta.diff(self.states[0], new)})
+        self.assertIsNot(game_state, first)
+        self.assertEqual(game_state.tile_map.map_width, 20)
+        self.check(decoder, new)
+
+    def test_diff_before_state(self):
+        with self.assertRaises(IOError):
+            IncrementalDecoder().decode({delta.PATCH_KEY: []})
+
+
+if __name__ == '__main__':
+    unittest.main()
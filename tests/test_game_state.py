@@ -0,0 +1,37 @@
+import unittest
+
+from model.game_state import GameState
+from model.player import Player
+from tools.simulator import Simulator
+
+
+class ViewsTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.state_dict = Simulator().state_dict(1)
+        self.game_state = GameState(self.state_dict)
+
+    def test_players(self):
+        self.assertIs(self.game_state.get_my_player(), self.game_state.player1)
+        self.assertIs(self.game_state.get_opponent_player(), self.game_state.player2)
+        self.game_state.player_num = 2
+        self.game_state.invalidate_views()
+        self.assertIs(self.game_state.get_my_player(), self.game_state.player2)
+        self.assertIs(self.game_state.get_opponent_player(), self.game_state.player1)
+
+    def test_views_are_kept_until_invalidated(self):
+        harvest = self.game_state.harvest_range()
+        self.assertIs(self.game_state.harvest_range(), harvest)
+        self.assertIsNot(self.game_state.harvest_range(self.game_state.player2), harvest)
+        self.game_state.invalidate_views()
+        self.assertIsNot(self.game_state.harvest_range(), harvest)
+        self.assertEqual(self.game_state.harvest_range(), harvest)
+
+    def test_foreign_player(self):
+        stranger = Player(self.state_dict['p1'])
+        with self.assertRaises(ValueError):
+            self.game_state.move_range(stranger)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from api import game_util
+from api.constants import Constants
+from model.upgrade_type import UpgradeType
+
+constants = Constants()
+
+
+class LoyaltyDiscountTest(unittest.TestCase):
+
+    def test_minimum(self):
+        minimum = constants.GREEN_GROCER_LOYALTY_CARD_MINIMUM
+        self.assertEqual(game_util.loyalty_discount(minimum - 1, UpgradeType.LOYALTY_CARD), 0.0)
+        self.assertAlmostEqual(game_util.loyalty_discount(minimum, UpgradeType.LOYALTY_CARD),
+                               minimum * constants.GREEN_GROCER_LOYALTY_CARD_DISCOUNT)
+
+    def test_needs_card(self):
+        self.assertEqual(game_util.loyalty_discount(1000.0, UpgradeType.NONE), 0.0)
+        self.assertEqual(game_util.loyalty_discount(1000.0, UpgradeType.BACKPACK), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
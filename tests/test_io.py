@@ -0,0 +1,35 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from networking.io import Logger
+
+
+class LoggerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'bot.log')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_context_manager_closes_the_file(self):
+        with Logger(self.path) as logger:
+            logger.info("hello")
+            file = logger.file
+        self.assertTrue(file.closed)
+        self.assertIsNone(logger.file)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "info: hello\n")
+
+    def test_close_twice(self):
+        logger = Logger(self.path)
+        logger.close()
+        logger.close()
+        Logger().close()
+
+
+if __name__ == '__main__':
+    unittest.main()
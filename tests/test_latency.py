@@ -0,0 +1,23 @@
+import unittest
+
+from networking.latency import percentile
+
+
+class PercentileTest(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        self.assertEqual(percentile([1, 2], 50), 1)
+        self.assertEqual(percentile(list(range(1, 11)), 50), 5)
+        self.assertEqual(percentile(list(range(1, 11)), 90), 9)
+        self.assertEqual(percentile([1, 2, 3, 4], 25), 1)
+
+    def test_bounds(self):
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+        self.assertEqual(percentile([1, 2, 3], 0), 1)
+        self.assertEqual(percentile([1, 2, 3], 100), 3)
+        self.assertEqual(percentile(list(range(1, 11)), 91), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from game import Game
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+from tools.loadout import parse_opponents
+
+
+class LoadoutTest(unittest.TestCase):
+
+    def test_parse_opponents(self):
+        self.assertEqual(parse_opponents('bot2'), [('bot2', 'NONE', 'NONE')])
+        self.assertEqual(parse_opponents('bot2:SCARECROW:SCYTHE'), [('bot2', 'SCARECROW', 'SCYTHE')])
+        upgrades = parse_opponents('bot2:NONE:*')
+        self.assertEqual(len(upgrades), len(UpgradeType))
+        self.assertEqual({upgrade for _, _, upgrade in upgrades}, set(UpgradeType.__members__))
+        with self.assertRaises(ValueError):
+            parse_opponents('bot2:SHOVEL')
+
+    def test_choose_loadout(self):
+        self.assertEqual(Game.choose_loadout(None, None), (ItemType.NONE, UpgradeType.NONE))
+        self.assertEqual(Game.choose_loadout(None, None, 'no-such-bot'), (ItemType.NONE, UpgradeType.NONE))
+        item, upgrade = Game.choose_loadout(None, UpgradeType.BACKPACK, 'bot')
+        self.assertEqual(upgrade, UpgradeType.BACKPACK)
+        self.assertEqual(Game.choose_loadout(ItemType.SCARECROW, UpgradeType.SCYTHE, 'bot'),
+                         (ItemType.SCARECROW, UpgradeType.SCYTHE))
+
+
+if __name__ == '__main__':
+    unittest.main()
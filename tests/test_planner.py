@@ -0,0 +1,107 @@
+import unittest
+from time import perf_counter
+
+from api.planner import ACTION, MOVE, PlanNode, Planner
+from model.decisions.move_decision import MoveDecision
+from networking.io import Logger
+from tools.simulator import SimGame, Simulator
+
+
+class PlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.was_enabled = Logger.enabled
+        Logger.enabled = False
+        self.simulator = Simulator(seed=0)
+        self.game = SimGame()
+        self.planner = Planner(think_ms=20, max_depth=4)
+
+    def tearDown(self):
+        Logger.enabled = self.was_enabled
+
+    def observe(self):
+        self.game.game_state = self.simulator.game_states()[0]
+
+    def play_move(self, opponent_move: str = None):
+        """
+        Sends the planner's move to the simulator; the opponent stays put
+        unless opponent_move is given
+        """
+        self.observe()
+        message = self.game.decide(self.planner.decide_move)
+        opponent = self.simulator.players[1]
+        self.simulator.move(message, opponent_move or f"move {opponent.x} {opponent.y}")
+
+    def test_expand_once(self):
+        self.observe()
+        self.planner.think_ms = 0
+        self.planner.decide_move(self.game)
+        node = PlanNode(self.planner.root.state, None, None, 0.0)
+        children = self.planner._expand(node)
+        expanded = self.planner.stats['expanded']
+        self.assertTrue(children)
+        self.assertIs(self.planner._expand(node), children)
+        self.assertEqual(self.planner.stats['expanded'], expanded)
+        for child in children:
+            self.assertIs(child.parent, node)
+            self.assertEqual(child.state.phase, MOVE if node.state.phase == ACTION else ACTION)
+            self.assertEqual(child.state.turn, node.state.turn + (node.state.phase == ACTION))
+
+    def test_reroot_reuses_prediction(self):
+        self.play_move()
+        self.observe()
+        self.assertEqual(self.planner.root.state.phase, ACTION)
+        self.planner.decide_action(self.game)
+        self.assertEqual(self.planner.stats['reused'], 1)
+        self.assertEqual(self.planner.stats['rebuilt'], 1)
+
+    def test_reroot_rebuilds_on_mismatch(self):
+        # The opponent moves although the planner expects it to stay put
+        self.play_move(opponent_move=f"move {self.simulator.width - 2} 0")
+        self.observe()
+        self.planner.decide_action(self.game)
+        self.assertEqual(self.planner.stats['reused'], 0)
+        self.assertEqual(self.planner.stats['rebuilt'], 2)
+
+    def test_reroot_keeps_matching_subtrees(self):
+        self.observe()
+        self.planner.max_depth = 3
+        self.planner.think_ms = 1000
+        self.planner.decide_move(self.game)
+        old_children = self.planner.root.children
+        self.assertIsNotNone(old_children)
+        observed = self.planner.root.state
+        root = self.planner._reroot(observed)
+        kept = [child for child in root.children if child.children is not None]
+        self.assertTrue(kept)
+        for child in kept:
+            for grandchild in child.children:
+                self.assertIs(grandchild.parent, child)
+
+    def test_deadline(self):
+        self.game.latency.start()
+        planner = Planner(margin_ms=100)
+        now = perf_counter()
+        deadline = planner.deadline(self.game)
+        budget = self.game.latency.budget_ms
+        self.assertGreaterEqual(deadline, now + (budget - 100) / 1000)
+        self.assertLessEqual(deadline, perf_counter() + (budget - 100) / 1000)
+        planner.think_ms = 5
+        self.assertLessEqual(planner.deadline(self.game), perf_counter() + 0.005)
+        planner.margin_ms = budget + 1
+        self.assertLessEqual(planner.deadline(self.game), perf_counter())
+
+    def test_past_deadline_still_decides(self):
+        self.observe()
+        self.planner.think_ms = 0
+        decision = self.planner.decide_move(self.game)
+        self.assertIsInstance(decision, MoveDecision)
+        self.assertEqual(self.planner.stats['depth'], 1)
+        root = PlanNode(self.planner.root.state, None, None, 0.0)
+        best = self.planner._search(root, perf_counter() - 1)
+        self.assertIn(best, root.children)
+        self.assertEqual(best.value, max(child.value for child in root.children))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import itertools
+import unittest
+
+from api import game_util
+from api.constants import Constants
+from api.portfolio import SeedPortfolio
+from model.crop_type import CropType
+from model.upgrade_type import UpgradeType
+
+constants = Constants()
+
+
+class FixedProfits(SeedPortfolio):
+
+    def __init__(self, profits) -> None:
+        super().__init__()
+        self.profits = profits
+
+    def seed_profits(self, turn, upgrade):
+        return dict(self.profits)
+
+
+class KnapsackTest(unittest.TestCase):
+
+    def check(self, portfolio: SeedPortfolio, money: float, upgrade: UpgradeType = UpgradeType.NONE):
+        counts = portfolio.solve(money, 1, upgrade)
+        self.assertLessEqual(sum(crop.seed_price * count for crop, count in counts.items()), money)
+        capacity = constants.BACKPACK_CARRYING_CAPACITY \
+            if upgrade is UpgradeType.BACKPACK else constants.CARRYING_CAPACITY
+        self.assertLessEqual(sum(counts.values()), capacity)
+        return counts
+
+    def test_inexact_profits(self):
+        # Sums of these don't round the same way in every order
+        crops = [crop for crop in CropType if crop is not CropType.NONE and crop.seed_price > 0]
+        portfolio = FixedProfits({crop: 0.1 * (n + 1) + 1e-9 * n for n, crop in enumerate(crops)})
+        for money in (0, 5, 37.5, 100, 250, 1000):
+            for upgrade in (UpgradeType.NONE, UpgradeType.BACKPACK, UpgradeType.LOYALTY_CARD):
+                self.check(portfolio, money, upgrade)
+
+    def test_best_mix(self):
+        cheap = min((crop for crop in CropType if crop is not CropType.NONE and crop.seed_price > 0),
+                    key=lambda crop: crop.seed_price)
+        portfolio = FixedProfits({cheap: 1.0})
+        counts = self.check(portfolio, 1000)
+        self.assertEqual(counts, {cheap: constants.CARRYING_CAPACITY})
+
+    def test_real_profits(self):
+        portfolio = SeedPortfolio()
+        for money in (0, 25, 100, 400):
+            self.check(portfolio, money)
+
+    def brute_force(self, profits, money: float, upgrade: UpgradeType) -> float:
+        """
+        Returns the best total return over every affordable mix of seeds
+        """
+        crops = list(profits)
+        capacity = constants.CARRYING_CAPACITY
+        best = 0.0
+        for counts in itertools.product(*(range(int(money // crop.seed_price) + 1) for crop in crops)):
+            cost = sum(crop.seed_price * count for crop, count in zip(crops, counts))
+            if cost > money or sum(counts) > capacity:
+                continue
+            value = sum(profits[crop] * count for crop, count in zip(crops, counts))
+            best = max(best, value + game_util.loyalty_discount(cost, upgrade))
+        return best
+
+    def check_brute_force(self, portfolio: SeedPortfolio, profits):
+        for money in (0, 10, 20, 25, 35, 60, 75):
+            for upgrade in (UpgradeType.NONE, UpgradeType.LOYALTY_CARD):
+                counts = self.check(portfolio, money, upgrade)
+                cost = sum(crop.seed_price * count for crop, count in counts.items())
+                value = sum(profits[crop] * count for crop, count in counts.items()) \
+                    + game_util.loyalty_discount(cost, upgrade)
+                self.assertAlmostEqual(value, self.brute_force(profits, money, upgrade),
+                                       msg=f"money {money}, {upgrade.name}")
+
+    def test_matches_brute_force(self):
+        # Corn loses money, so the loyalty card discount decides whether it is
+        # worth buying to reach the minimum spend
+        for corn in (-1.0, -1.5):
+            profits = {CropType.CORN: corn, CropType.GRAPE: 0.2, CropType.JOGAN_FRUIT: 3.0,
+                       CropType.QUADROTRITICALE: 0.4}
+            self.check_brute_force(FixedProfits(profits), profits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from model.game_state import GameState
+from networking import snapshot
+from tools.simulator import Simulator
+from tools.snapshot import state_key
+
+
+def make_states(count: int):
+    """
+    Returns count GameStates that change a little every half-turn: the turn,
+    money, carried crops, feedback and a few tiles
+    """
+    simulator = Simulator()
+    states = []
+    for n in range(count):
+        state = simulator.state_dict(1 + n % 2)
+        state['turn'] = 1 + n // 2
+        state['feedback'] = [f"half-turn {n}"] * (n % 3)
+        state['p1']['money'] = 100.0 + n * 2.5
+        state['p2']['harvestedInventory'] = [{'type': 'CORN', 'growthTimer': 0, 'value': 1.5 * i}
+                                             for i in range(n % 4)]
+        tiles = state['tileMap']['tiles']
+        for i in range(n):
+            tile = tiles[5 + i % 20][i % 30]
+            tile['crop'] = {'type': 'POTATO', 'growthTimer': n - i, 'value': 0.25 * i}
+            tile['turnsLeftToGrow'] = n - i
+            tile['rainTotemEffect'] = i % 2 == 0
+        states.append(GameState(state))
+    return states
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'game' + snapshot.SUFFIX)
+        self.states = make_states(30)
+        self.keys = [state_key(state) for state in self.states]
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def write(self, level: int = 6, close: bool = True) -> None:
+        writer = snapshot.SnapshotWriter(self.path, keyframe_interval=7, level=level)
+        for state in self.states:
+            writer.write(state)
+        if close:
+            writer.close()
+        else:
+            writer.file.close()
+
+    def test_encode_decode(self):
+        for state, key in zip(self.states, self.keys):
+            self.assertEqual(state_key(snapshot.decode(snapshot.encode(state))), key)
+
+    def test_round_trip_in_order(self):
+        for level in (0, 6):
+            self.write(level)
+            with snapshot.SnapshotReader(self.path) as reader:
+                self.assertEqual(len(reader), len(self.states))
+                self.assertEqual([state_key(state) for state in reader], self.keys)
+
+    def test_random_access(self):
+        self.write()
+        with snapshot.SnapshotReader(self.path) as reader:
+            for n in (29, 3, 13, 14, 0, 22, -1):
+                self.assertEqual(state_key(reader[n]), self.keys[n])
+            with self.assertRaises(IndexError):
+                reader[len(self.states)]
+
+    def test_changed_cells(self):
+        self.write()
+        with snapshot.SnapshotReader(self.path) as reader:
+            self.assertIsNone(reader[0].changed_cells)
+            self.assertTrue(reader[5].changed_cells)
+
+    def test_unclosed_recording(self):
+        self.write(close=False)
+        with snapshot.SnapshotReader(self.path) as reader:
+            self.assertEqual([state_key(state) for state in reader], self.keys)
+
+    def test_truncated_recording(self):
+        self.write()
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(data[:len(data) * 2 // 3])
+        with snapshot.SnapshotReader(self.path) as reader:
+            self.assertGreater(len(reader), 0)
+            self.assertLess(len(reader), len(self.states))
+            self.assertEqual(state_key(reader[-1]), self.keys[len(reader) - 1])
+            self.assertEqual([state_key(state) for state in reader], self.keys[:len(reader)])
+
+
+if __name__ == '__main__':
+    unittest.main()
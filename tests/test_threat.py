@@ -0,0 +1,69 @@
+import unittest
+
+from api.threat import ThreatMap
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+from tools.simulator import Simulator
+
+
+def distance(x1: int, y1: int, x2: int, y2: int) -> int:
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+class ThreatMapTest(unittest.TestCase):
+
+    def brute_steps(self, simulator: Simulator, opponent, x: int, y: int) -> int:
+        """
+        Returns the fewest moves the opponent needs to stand on a board cell
+        within harvest radius of (x, y)
+        """
+        radius = opponent.harvest_radius
+        best = None
+        for stand_y in range(max(y - radius, 0), min(y + radius + 1, simulator.height)):
+            for stand_x in range(max(x - radius, 0), min(x + radius + 1, simulator.width)):
+                if distance(stand_x, stand_y, x, y) <= radius:
+                    moves = -(-distance(opponent.x, opponent.y, stand_x, stand_y) // opponent.max_movement)
+                    best = moves if best is None else min(best, moves)
+        return min(best, 255)
+
+    def check(self, threat: ThreatMap, simulator: Simulator, number: int):
+        threat.update(simulator.game_states()[number - 1])
+        me, opponent = simulator.players[number - 1], simulator.players[2 - number]
+        scarecrows = simulator.tile_map.scarecrow_effects
+        for index in range(simulator.width * simulator.height):
+            x, y = index % simulator.width, index // simulator.width
+            message = f"cell ({x},{y}), me at ({me.x},{me.y}), opponent at ({opponent.x},{opponent.y})"
+            covered = distance(me.x, me.y, x, y) <= me.protection_radius or scarecrows[index] == number
+            blocked = distance(opponent.x, opponent.y, x, y) <= opponent.protection_radius \
+                or scarecrows[index] == opponent.number
+            self.assertEqual(bool(threat.covered[index]), covered, message)
+            self.assertEqual(bool(threat.blocked[index]), blocked, message)
+            self.assertEqual(threat.can_harvest(index), not blocked, message)
+            self.assertEqual(threat.ours(index), scarecrows[index] == number, message)
+            self.assertEqual(threat.theirs(index), scarecrows[index] == opponent.number, message)
+            if index % 5 == 0:
+                self.assertEqual(threat.steps[index], self.brute_steps(simulator, opponent, x, y), message)
+
+    def test_matches_brute_force(self):
+        upgrades = [(UpgradeType.NONE, UpgradeType.NONE), (UpgradeType.SPYGLASS, UpgradeType.SCYTHE),
+                    (UpgradeType.SCYTHE, UpgradeType.LONGER_LEGS), (UpgradeType.LONGER_LEGS, UpgradeType.SPYGLASS)]
+        positions = [((0, 0), (29, 0)), ((15, 20), (16, 22)), ((3, 49), (28, 1)), ((29, 30), (0, 31))]
+        for upgrade1, upgrade2 in upgrades:
+            simulator = Simulator(ItemType.NONE, upgrade1, ItemType.SCARECROW, upgrade2, 0)
+            # One map per player, kept across positions so the partial updates are checked too
+            threats = {1: ThreatMap(simulator.width, simulator.height),
+                       2: ThreatMap(simulator.width, simulator.height)}
+            for turn, ((x1, y1), (x2, y2)) in enumerate(positions):
+                player1, player2 = simulator.players
+                player1.x, player1.y, player2.x, player2.y = x1, y1, x2, y2
+                if turn == 2:
+                    # Player 2's scarecrow goes down around where it stands
+                    for index in range(simulator.width * simulator.height):
+                        if distance(x2, y2, index % simulator.width, index // simulator.width) <= 2:
+                            simulator.tile_map.scarecrow_effects[index] = 2
+                for number in (1, 2):
+                    self.check(threats[number], simulator, number)
+
+
+if __name__ == '__main__':
+    unittest.main()
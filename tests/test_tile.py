@@ -0,0 +1,34 @@
+import unittest
+
+from model.crop_type import CropType
+from model.tile_map import TileMap
+from tools.simulator import initial_tilemap_dict
+
+
+class TileTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tile_map = TileMap(initial_tilemap_dict())
+        self.index = self.tile_map.index(3, 10)
+        self.tile = self.tile_map.tiles[10][3]
+
+    def test_crop_follows_the_columns(self):
+        crop = self.tile.crop
+        self.assertIs(crop.type, CropType.NONE)
+        self.tile_map.crop_types[self.index] = CropType.POTATO
+        self.tile_map.growth_timers[self.index] = 4
+        self.tile_map.crop_values[self.index] = 2.5
+        self.assertIs(self.tile.crop, crop)
+        self.assertEqual((crop.type, crop.growth_timer, crop.value), (CropType.POTATO, 4, 2.5))
+
+    def test_column_properties(self):
+        self.tile_map.crop_types[self.index] = CropType.CORN
+        self.tile_map.growth_timers[self.index] = 7
+        self.tile_map.crop_values[self.index] = 1.25
+        self.assertEqual((self.tile.crop_type, self.tile.growth_timer, self.tile.crop_value),
+                         (CropType.CORN, 7, 1.25))
+        self.assertEqual(self.tile_map.get_tile(3, 10).crop_type, CropType.CORN)
+
+
+if __name__ == '__main__':
+    unittest.main()
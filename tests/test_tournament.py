@@ -0,0 +1,21 @@
+import unittest
+
+from tools import tournament
+
+
+class LoadBotTest(unittest.TestCase):
+
+    def test_self_play_sides_are_separate(self):
+        bot1 = tournament.load_bot('bot', 1)
+        bot2 = tournament.load_bot('bot', 2)
+        self.assertIsNot(bot1, bot2)
+        self.assertIsNot(bot1.crop_index, bot2.crop_index)
+        restore = tournament._apply_params(bot2, {'crop_index': None})
+        try:
+            self.assertIsNotNone(bot1.crop_index)
+        finally:
+            tournament._apply_params(bot2, restore)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from api.trips import GrocerMap
+from model.tile_type import TileType
+from tools.simulator import Simulator
+
+
+class GrocerMapTest(unittest.TestCase):
+
+    def test_of_follows_grocer_changes(self):
+        tile_map = Simulator().game_states()[0].tile_map
+        grocer_map = GrocerMap.of(tile_map)
+        self.assertEqual(bytes(grocer_map.mask), bytes(tile_map.tile_type_mask(TileType.GREEN_GROCER)))
+        self.assertIs(GrocerMap.of(tile_map.copy()), grocer_map)
+
+        # A grocer moved: same count, different cells
+        moved = tile_map.copy()
+        first = grocer_map.grocers[0]
+        moved.tile_types[first.y * moved.map_width + first.x] = TileType.GRASS
+        moved.tile_types[(moved.map_height - 1) * moved.map_width] = TileType.GREEN_GROCER
+        self.assertEqual(GrocerMap.of(moved).mask, moved.tile_type_mask(TileType.GREEN_GROCER))
+
+        # A grocer added
+        added = tile_map.copy()
+        added.tile_types[(added.map_height - 1) * added.map_width] = TileType.GREEN_GROCER
+        self.assertEqual(GrocerMap.of(added).mask, added.tile_type_mask(TileType.GREEN_GROCER))
+        self.assertIs(GrocerMap.of(tile_map), grocer_map)
+
+
+if __name__ == '__main__':
+    unittest.main()
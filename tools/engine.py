@@ -0,0 +1,119 @@
+"""
+Local stand-in for the engine. Runs two bot scripts as subprocesses and talks
+to them over stdin/stdout exactly like the engine does. The game itself is
+played by tools.simulator. Players listed with --delta get every state after
+their first one as a state-diff message (see networking.delta) against the
+previous state they were sent. Only bots built with Game(delta=True) or
+Game(incremental=True) can read these; bot.py, bot2.py and bot3.py are. A bot
+that can't read them exits on the first diff.
+
+    python -m tools.engine bot.py bot2.py --delta 1 2
+
+Prints the winner and how many bytes of game state each player was sent.
+"""
+from typing import Dict, Iterable, List, Optional
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+from networking import delta
+from tools.simulator import Simulator
+
+
+class BotProcess:
+    """
+    One bot subprocess, sent game states on stdin and answering on stdout
+    """
+
+    def __init__(self, script: str, use_delta: bool = False, stderr=None) -> None:
+        self.process = subprocess.Popen([sys.executable, script], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=stderr)
+        self.use_delta = use_delta
+        self.previous: Optional[Dict] = None
+        self.bytes_sent = 0
+
+    def readline(self) -> str:
+        line = self.process.stdout.readline()
+        if not line:
+            raise IOError("Bot closed the connection")
+        return line.decode().strip()
+
+    def handshake(self) -> tuple:
+        """
+        Reads the heartbeat and returns the bot's (ItemType, UpgradeType)
+        """
+        heartbeat = self.readline()
+        if heartbeat != "heartbeat":
+            raise IOError(f"Expected a heartbeat, got {heartbeat!r}")
+        return ItemType[self.readline()], UpgradeType[self.readline()]
+
+    def send_state(self, state: Dict) -> None:
+        if self.use_delta and self.previous is not None:
+            message = {delta.PATCH_KEY: delta.diff(self.previous, state)}
+        else:
+            message = state
+        self.previous = state
+        line = json.dumps(message, separators=(',', ':')).encode() + b'\n'
+        self.bytes_sent += len(line)
+        self.process.stdin.write(line)
+        self.process.stdin.flush()
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.kill()
+        self.process.wait()
+
+
+def run(script1: str, script2: str, delta_players: Iterable[int] = (), seed: Optional[int] = None,
+        quiet: bool = True) -> Dict:
+    """
+    Plays one game between two bot scripts
+    :param delta_players: numbers of the players to send state diffs to
+    :param quiet: discard the bots' stderr
+    :return: dict with the winner, final money and bytes of state sent to each bot
+    """
+    stderr = subprocess.DEVNULL if quiet else None
+    bots: List[BotProcess] = [BotProcess(script, number in delta_players, stderr)
+                              for number, script in ((1, script1), (2, script2))]
+    try:
+        (item1, upgrade1), (item2, upgrade2) = bots[0].handshake(), bots[1].handshake()
+        simulator = Simulator(item1, upgrade1, item2, upgrade2, seed)
+        while not simulator.finished:
+            for step in (simulator.move, simulator.act):
+                for number, bot in enumerate(bots, 1):
+                    bot.send_state(simulator.state_dict(number))
+                step(*[bot.readline() for bot in bots])
+    finally:
+        for bot in bots:
+            bot.close()
+    return {
+        'winner': simulator.winner(),
+        'money': [player.money for player in simulator.players],
+        'bytes_sent': [bot.bytes_sent for bot in bots],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run two bot scripts against the local simulator over stdin/stdout")
+    parser.add_argument('bot1', help="bot script for player 1, e.g. bot.py")
+    parser.add_argument('bot2', help="bot script for player 2, e.g. bot2.py")
+    parser.add_argument('--delta', type=int, nargs='+', default=[], choices=(1, 2),
+                        help="players to send state diffs to after their first full state")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--verbose', action='store_true', help="show the bots' log output")
+    args = parser.parse_args()
+
+    result = run(args.bot1, args.bot2, args.delta, args.seed, not args.verbose)
+    print(f"winner {result['winner']}, money {result['money'][0]:.2f} vs {result['money'][1]:.2f}")
+    print(f"state bytes sent: {result['bytes_sent'][0]} to player 1, {result['bytes_sent'][1]} to player 2")
+
+
+if __name__ == "__main__":
+    main()
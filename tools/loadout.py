@@ -0,0 +1,127 @@
+"""
+Offline item and upgrade evaluation. Plays a bot with every ItemType x
+UpgradeType combination against a set of reference opponents, on all cores
+through tools.tournament, and writes the ranking to resources/loadouts.tsv
+(see api.loadouts). Game(loadout=...) then picks its item and upgrade from
+that table at startup.
+
+An opponent is a bot module name, optionally with the loadout it plays,
+e.g. bot2:COFFEE_THERMOS:LONGER_LEGS (default NONE:NONE); * stands for every
+item or upgrade, so bot2:NONE:* is eight opponents. Every game is played
+from both sides of the board.
+
+The simulator is deterministic apart from RABBITS_FOOT's double drops, so
+more seeds replay the same games: loadouts are told apart by playing a
+varied set of opponents, not by adding seeds.
+
+Each combination is ranked by its win rate averaged over the opponents and
+sides, counting ties as half a win, then by its average money. Combinations
+that play the same games (an item the bot never uses gives the same result
+as NONE) tie on both, and the one declared first in ItemType, then
+UpgradeType, is ranked first.
+
+    python -m tools.loadout bot --opponents 'bot2:NONE:*' 'bot:NONE:*' --seeds 2
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import argparse
+import itertools
+import json
+import os
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.loadouts import LOADOUTS_PATH, Loadout, load_table, save_table
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+from tools.tournament import load_checkpoint, make_jobs, run
+
+
+def parse_opponents(spec: str) -> List[Tuple[str, str, str]]:
+    """
+    Returns (bot, item, upgrade) for every opponent an opponent spec like
+    bot2:SCARECROW:SCYTHE or bot2:NONE:* stands for
+    """
+    parts = spec.split(':')
+    bot = parts[0]
+    item = parts[1] if len(parts) > 1 else ItemType.NONE.name
+    upgrade = parts[2] if len(parts) > 2 else UpgradeType.NONE.name
+    items = list(ItemType.__members__) if item == '*' else [item]
+    upgrades = list(UpgradeType.__members__) if upgrade == '*' else [upgrade]
+    if not set(items) <= set(ItemType.__members__) or not set(upgrades) <= set(UpgradeType.__members__):
+        raise ValueError(f"Unknown item or upgrade in {spec!r}")
+    return [(bot, item, upgrade) for item in items for upgrade in upgrades]
+
+
+def evaluate(bot: str, opponents: List[str], seeds: int, checkpoint: Optional[str] = None,
+             workers: Optional[int] = None) -> List[Loadout]:
+    """
+    Plays every loadout of a bot against every opponent, from both sides
+    :return: the loadouts, best first
+    """
+    items = [item.name for item in ItemType]
+    upgrades = [upgrade.name for upgrade in UpgradeType]
+    jobs = []
+    # Job key -> (the bot's side, its item and upgrade, the opponent and side) of
+    # every result the game counts towards: in self-play one game can count for
+    # both sides
+    configs: Dict[str, List[Tuple[int, tuple, tuple]]] = defaultdict(list)
+    for spec in opponents:
+        for opponent, item2, upgrade2 in parse_opponents(spec):
+            for side in (1, 2):
+                if side == 1:
+                    side_jobs = make_jobs(bot, opponent, range(seeds), items, upgrades, (item2,), (upgrade2,))
+                else:
+                    side_jobs = make_jobs(opponent, bot, range(seeds), (item2,), (upgrade2,), items, upgrades)
+                for job in side_jobs:
+                    loadout = (job.item1, job.upgrade1) if side == 1 else (job.item2, job.upgrade2)
+                    if job.key() not in configs:
+                        jobs.append(job)
+                    configs[job.key()].append((side, loadout, (opponent, item2, upgrade2, side)))
+
+    # (item, upgrade) -> (opponent config, side) -> [score, money, games]
+    results: Dict[tuple, Dict[tuple, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0.0, 0.0, 0]))
+    # Games already in the checkpoint count too: run() only yields the ones it plays
+    resumed = [row for row in load_checkpoint(checkpoint) if json.dumps(row['job']) in configs]
+    for done, row in enumerate(itertools.chain(resumed, run(jobs, checkpoint, workers)), 1):
+        for side, loadout, opponent in configs[json.dumps(row['job'])]:
+            totals = results[loadout][opponent]
+            totals[0] += 1.0 if row['winner'] == side else 0.5 if row['winner'] == 0 else 0.0
+            totals[1] += row[f'money{side}']
+            totals[2] += 1
+        if done % 100 == 0:
+            print(f"{done}/{len(jobs)} games played", file=sys.stderr)
+
+    loadouts = []
+    for (item, upgrade), by_opponent in results.items():
+        games = sum(totals[2] for totals in by_opponent.values())
+        win_rate = sum(totals[0] / totals[2] for totals in by_opponent.values()) / len(by_opponent)
+        money = sum(totals[1] for totals in by_opponent.values()) / games
+        loadouts.append(Loadout(bot, ItemType[item], UpgradeType[upgrade], games, win_rate, money))
+    loadouts.sort(key=lambda loadout: (-loadout.win_rate, -loadout.money, loadout.item.value, loadout.upgrade.value))
+    return loadouts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rank every item x upgrade of a bot and store the result")
+    parser.add_argument('bot', help="bot module to evaluate, e.g. bot")
+    parser.add_argument('--opponents', nargs='+', required=True,
+                        help="reference opponents as module[:ITEM[:UPGRADE]], * for every item or upgrade")
+    parser.add_argument('--seeds', type=int, default=2, help="games per loadout, opponent and side")
+    parser.add_argument('--checkpoint', help="JSON-lines file to append games to and resume from")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--out', default=LOADOUTS_PATH, help="table to update")
+    args = parser.parse_args()
+
+    loadouts = evaluate(args.bot, args.opponents, args.seeds, args.checkpoint, args.workers)
+    table = load_table(args.out)
+    table[args.bot] = loadouts
+    save_table(table, args.out)
+    for loadout in loadouts[:5]:
+        print(loadout.row())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""
+Engine and player log analytics.
+
+The engine writes one JSON document per game, {"Logs": [...]}, with a record
+per turn holding its Info, Debug and Exception message lists (see
+engine.json). EngineLog streams these records, so a file with many games
+(concatenated documents, one per line, or gzipped) is never loaded in full.
+It extracts one row per turn into array columns:
+
+    game, turn, took_ms
+    p1_/p2_ state_bytes     game state bytes sent to the player this turn
+    p1_/p2_ decision_bytes  decision bytes read from the player
+    p1_/p2_ action          index into ACTIONS of the action decision
+    p1_/p2_ sold            1 if the player sold their inventory
+    p1_/p2_ seeds_bought, spent, planted, exceptions
+
+Per-game facts (loadouts, winner, final money, achievements) go into
+EngineLog.games. Player logs are the bots' stderr. Bots built with
+Game(profiler=...) write a "[Turn N] ms: read 0.10, decode 1.20, ..." line
+every half-turn, and PhaseLog collects those lines the same way.
+
+    python -m tools.logs engine.json more_games/ --player-logs p1.log --tsv turns.tsv
+
+Prints each game, then percentiles of the turn times and state sizes, then
+the turns slower than the upper Tukey fence (q3 + k * IQR) of their column.
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from networking.latency import PHASES, percentile
+
+# First word of an action decision; 0 means none was read
+ACTIONS = ('', 'do_nothing', 'harvest', 'plant', 'buy', 'use_item')
+
+# Column name -> array typecode; player columns exist once per player
+TURN_COLUMNS = {'game': 'i', 'turn': 'i', 'took_ms': 'd'}
+PLAYER_COLUMNS = {'state_bytes': 'i', 'decision_bytes': 'i', 'action': 'b', 'sold': 'b',
+                  'seeds_bought': 'i', 'spent': 'd', 'planted': 'i', 'exceptions': 'i'}
+COLUMNS = dict(TURN_COLUMNS, **{f"p{player}_{name}": typecode for player in (1, 2)
+                                for name, typecode in PLAYER_COLUMNS.items()})
+
+_TOOK = re.compile(r"Turn \d+ took ([\d.]+) milliseconds")
+_SOLD = re.compile(r"Player ([12]): Selling inventory")
+_BOUGHT = re.compile(r"Player ([12]): Bought (\d+) \w+ seeds for \$([\d.]+)")
+_PLANTED = re.compile(r"Player ([12]): Planted ")
+_WON = re.compile(r"Player ([12]) has won(?:.*\(([\d.]+) > ([\d.]+)\))?")
+_ACHIEVEMENTS = re.compile(r"Player ([12]) has unlocked the following achievements:")
+_SENDING = re.compile(r"Sending player ([12])'s game state")
+_GETTING = re.compile(r"Getting player ([12])'s (action )?decision")
+_ASKING = re.compile(r"Asking player ([12]) for starting items")
+_RECEIVED = re.compile(r'Received "(.*)"')
+_WRITING = re.compile(r"writing \(len:(\d+)\)")
+_READING = re.compile(r"reading \(len:(\d+)\): (\S*)")
+_EXCEPTION = re.compile(r"Player ([12]):")
+_PHASE_LINE = re.compile(r"\[Turn (\d+)\] ms: (.*)")
+
+
+class GameSummary(NamedTuple):
+    game: int
+    source: str
+    turns: int
+    # 1 or 2, or 0 when the log doesn't say
+    winner: int
+    # Final money of players 1 and 2, when the log has it
+    money: Optional[Tuple[float, float]]
+    # Item and upgrade engine strings of players 1 and 2
+    loadouts: Tuple[Tuple[str, ...], Tuple[str, ...]]
+    achievements: Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+def open_text(path: str) -> TextIO:
+    return gzip.open(path, 'rt') if path.endswith('.gz') else open(path)
+
+
+def log_files(paths: Iterable[str], suffixes: Tuple[str, ...] = ('.json', '.json.gz')) -> Iterator[str]:
+    """
+    Yields the given files, and the files with one of suffixes in the given
+    directories, in name order
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for name in sorted(os.listdir(path)):
+            if name.endswith(suffixes):
+                yield os.path.join(path, name)
+
+
+def iter_turn_records(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Tuple[int, dict]]:
+    """
+    Yields (game number in the file, turn record) from every "Logs" array in
+    a text stream, holding about one record in memory at a time
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, game = "", 0, -1
+    in_logs = eof = False
+
+    def refill() -> None:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    while True:
+        if not in_logs:
+            found = buffer.find('"Logs"', pos)
+            bracket = buffer.find('[', found) if found >= 0 else -1
+            if bracket < 0:
+                if eof:
+                    return
+                # Keep enough to find a marker split across reads
+                pos = found if found >= 0 else max(pos, len(buffer) - len('"Logs"'))
+                refill()
+                continue
+            pos, in_logs, game = bracket + 1, True, game + 1
+            continue
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Log ends inside a \"Logs\" array")
+            refill()
+            continue
+        if buffer[pos] == ']':
+            pos, in_logs = pos + 1, False
+            continue
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            refill()
+            continue
+        yield game, record
+        pos = end
+
+
+class EngineLog:
+    """
+    Columnar table of engine log turns, one row per turn record
+    """
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, array] = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.games: List[GameSummary] = []
+
+    def __len__(self) -> int:
+        return len(self.columns['turn'])
+
+    def column(self, name: str) -> array:
+        return self.columns[name]
+
+    def read(self, path: str) -> 'EngineLog':
+        """
+        Adds every game in a log file
+        """
+        with open_text(path) as f:
+            return self.read_stream(f, path)
+
+    def read_stream(self, f: TextIO, source: str = '<stream>') -> 'EngineLog':
+        current, state = None, None
+        for game, record in iter_turn_records(f):
+            if game != current:
+                if state is not None:
+                    self.games.append(state.summary())
+                current, state = game, _GameState(len(self.games), source)
+            self._add(state, record)
+        if state is not None:
+            self.games.append(state.summary())
+        return self
+
+    def _add(self, state: '_GameState', record: dict) -> None:
+        row = {name: 0 for name in COLUMNS}
+        row['game'] = state.game
+        row['turn'] = state.turns = record.get('Turn', state.turns)
+        row['took_ms'] = float('nan')
+
+        # Column prefix of the player the engine is talking to
+        player = None
+        for message in record.get('Info', ()):
+            if state.achievements_of is not None:
+                if _ACHIEVEMENTS.match(message) is None and not message.startswith(('Player ', 'Finished')):
+                    state.achievements[state.achievements_of].append(message)
+                    continue
+                state.achievements_of = None
+            match = _TOOK.match(message)
+            if match:
+                row['took_ms'] = float(match.group(1))
+                continue
+            match = _SOLD.match(message)
+            if match:
+                row[f"p{match.group(1)}_sold"] = 1
+                continue
+            match = _BOUGHT.match(message)
+            if match:
+                prefix = f"p{match.group(1)}_"
+                row[prefix + 'seeds_bought'] += int(match.group(2))
+                row[prefix + 'spent'] += float(match.group(3))
+                continue
+            match = _PLANTED.match(message)
+            if match:
+                row[f"p{match.group(1)}_planted"] += 1
+                continue
+            match = _ACHIEVEMENTS.match(message)
+            if match:
+                state.achievements_of = int(match.group(1)) - 1
+                continue
+            match = _WON.match(message)
+            if match:
+                state.winner = int(match.group(1))
+                if match.group(2) is not None:
+                    won, lost = float(match.group(2)), float(match.group(3))
+                    state.money = (won, lost) if state.winner == 1 else (lost, won)
+
+        for message in record.get('Debug', ()):
+            match = _SENDING.match(message)
+            if match:
+                player = f"p{match.group(1)}_"
+                continue
+            match = _GETTING.match(message)
+            if match:
+                player = f"p{match.group(1)}_"
+                state.action_phase = match.group(2) is not None
+                continue
+            match = _ASKING.match(message)
+            if match:
+                state.asking = int(match.group(1)) - 1
+                continue
+            match = _WRITING.search(message)
+            if match and player is not None:
+                row[player + 'state_bytes'] += int(match.group(1))
+                continue
+            match = _READING.search(message)
+            if match and player is not None:
+                row[player + 'decision_bytes'] += int(match.group(1))
+                if state.action_phase:
+                    word = match.group(2)
+                    row[player + 'action'] = ACTIONS.index(word) if word in ACTIONS else 0
+                continue
+            match = _RECEIVED.match(message)
+            if match and state.asking is not None and row['turn'] == 0 and message != 'Received "heartbeat"':
+                state.loadouts[state.asking].append(match.group(1))
+
+        for message in record.get('Exception', ()):
+            match = _EXCEPTION.match(message)
+            if match:
+                row[f"p{match.group(1)}_exceptions"] += 1
+
+        for name, value in row.items():
+            self.columns[name].append(value)
+
+    def rows(self) -> Iterator[Tuple]:
+        return zip(*self.columns.values())
+
+    def write_tsv(self, f: TextIO) -> None:
+        f.write("\t".join(self.columns) + "\n")
+        for row in self.rows():
+            f.write("\t".join(map(str, row)) + "\n")
+
+    def percentiles(self, name: str, quantiles=(50, 90, 99, 100)) -> List[float]:
+        """
+        Returns percentiles of a column over all turns that have a value for it
+        """
+        values = sorted(value for value in self.columns[name] if value == value)
+        return [percentile(values, q) for q in quantiles]
+
+    def outliers(self, name: str = 'took_ms', k: float = 1.5) -> List[Tuple[int, int, float]]:
+        """
+        Returns (game, turn, value) of the turns above q3 + k * IQR of a column,
+        slowest first
+        """
+        fence = tukey_fence([value for value in self.columns[name] if value == value], k)
+        found = [(game, turn, value) for game, turn, value
+                 in zip(self.columns['game'], self.columns['turn'], self.columns[name]) if value > fence]
+        found.sort(key=lambda item: -item[2])
+        return found
+
+    def report(self, k: float = 1.5, limit: int = 10) -> str:
+        lines = []
+        for game in self.games:
+            money = f", money {game.money[0]:.2f} vs {game.money[1]:.2f}" if game.money else ""
+            lines.append(f"game {game.game} ({game.source}): {game.turns} turns, winner {game.winner}{money}")
+            for player in (0, 1):
+                lines.append(f"  p{player + 1} {'/'.join(game.loadouts[player]) or '?'}: "
+                             f"{', '.join(game.achievements[player]) or 'no achievements'}")
+        lines.append(f"{len(self)} turns, p50/p90/p99/max")
+        for name in ('took_ms', 'p1_state_bytes', 'p2_state_bytes'):
+            lines.append(f"  {name}: " + "/".join(f"{value:.0f}" for value in self.percentiles(name)))
+        for player in (1, 2):
+            prefix = f"p{player}_"
+            actions = array('i', [0] * len(ACTIONS))
+            for action in self.columns[prefix + 'action']:
+                actions[action] += 1
+            lines.append(f"  p{player}: " + ", ".join(f"{ACTIONS[i]} {count}" for i, count in enumerate(actions)
+                                                      if i and count)
+                         + f"; sold {sum(self.columns[prefix + 'sold'])} times, spent "
+                           f"{sum(self.columns[prefix + 'spent']):.2f}, "
+                           f"{sum(self.columns[prefix + 'exceptions'])} exceptions")
+        slow = self.outliers('took_ms', k)
+        lines.append(f"{len(slow)} slow turns (took_ms above q3 + {k} IQR)")
+        for game, turn, value in slow[:limit]:
+            lines.append(f"  game {game} turn {turn}: {value:.2f} ms")
+        return "\n".join(lines)
+
+
+class _GameState:
+    """
+    What EngineLog carries from one turn record of a game to the next
+    """
+
+    def __init__(self, game: int, source: str) -> None:
+        self.game = game
+        self.source = source
+        self.turns = 0
+        self.winner = 0
+        self.money = None
+        self.loadouts: Tuple[List[str], List[str]] = ([], [])
+        self.achievements: Tuple[List[str], List[str]] = ([], [])
+        self.achievements_of: Optional[int] = None
+        self.asking: Optional[int] = None
+        self.action_phase = False
+
+    def summary(self) -> GameSummary:
+        return GameSummary(self.game, self.source, self.turns, self.winner, self.money,
+                           (tuple(self.loadouts[0]), tuple(self.loadouts[1])),
+                           (tuple(self.achievements[0]), tuple(self.achievements[1])))
+
+
+class PhaseLog:
+    """
+    Columnar table of the per-half-turn phase timings in player logs: a game
+    number, the turn, and one column per networking.latency phase
+    """
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, array] = {'game': array('i'), 'turn': array('i')}
+        for phase in PHASES + ('total',):
+            self.columns[phase] = array('d')
+        self._games = 0
+
+    def __len__(self) -> int:
+        return len(self.columns['turn'])
+
+    def read(self, path: str) -> 'PhaseLog':
+        """
+        Adds every timing line of a log file. A log a bot appended several games
+        to is split where the turn number goes back down.
+        """
+        last = None
+        self._games += 1
+        with open_text(path) as f:
+            for line in f:
+                match = _PHASE_LINE.search(line)
+                if match is None:
+                    continue
+                turn = int(match.group(1))
+                if last is not None and turn < last:
+                    self._games += 1
+                last = turn
+                times = {}
+                for part in match.group(2).split(', '):
+                    phase, _, elapsed = part.rpartition(' ')
+                    times[phase] = float(elapsed)
+                self.columns['game'].append(self._games - 1)
+                self.columns['turn'].append(turn)
+                for phase in PHASES:
+                    self.columns[phase].append(times.get(phase, 0.0))
+                # Like LatencyTracker, time blocked reading is the engine's, not ours
+                self.columns['total'].append(sum(elapsed for phase, elapsed in times.items() if phase != 'read'))
+        return self
+
+    def report(self, k: float = 1.5, limit: int = 10) -> str:
+        lines = [f"{len(self)} half-turns in player logs, ms p50/p90/p99/max"]
+        for phase, values in self.columns.items():
+            if phase in ('game', 'turn'):
+                continue
+            ordered = sorted(values)
+            lines.append(f"  {phase}: " + "/".join(f"{percentile(ordered, q):.2f}" for q in (50, 90, 99, 100)))
+        fence = tukey_fence(list(self.columns['total']), k)
+        slow = sorted(((game, turn, total) for game, turn, total
+                       in zip(self.columns['game'], self.columns['turn'], self.columns['total']) if total > fence),
+                      key=lambda item: -item[2])
+        lines.append(f"{len(slow)} slow half-turns (total above q3 + {k} IQR)")
+        for game, turn, total in slow[:limit]:
+            lines.append(f"  game {game} turn {turn}: {total:.2f} ms")
+        return "\n".join(lines)
+
+
+def tukey_fence(values: List[float], k: float = 1.5) -> float:
+    """
+    Returns q3 + k * (q3 - q1) of values, or infinity if there are none
+    """
+    if not values:
+        return float('inf')
+    values = sorted(values)
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    return q3 + k * (q3 - q1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize engine logs and player timing logs")
+    parser.add_argument('logs', nargs='*', default=['engine.json'],
+                        help="engine log files (.json or .json.gz) or directories of them")
+    parser.add_argument('--player-logs', nargs='+', default=[], help="bot stderr logs with per-half-turn timings")
+    parser.add_argument('--k', type=float, default=1.5, help="outlier fence, in interquartile ranges above q3")
+    parser.add_argument('--limit', type=int, default=10, help="slowest turns to list")
+    parser.add_argument('--tsv', help="write the per-turn table to this file")
+    args = parser.parse_args()
+
+    engine_log = EngineLog()
+    for path in log_files(args.logs):
+        engine_log.read(path)
+    print(engine_log.report(args.k, args.limit))
+    if args.tsv:
+        with open(args.tsv, 'w') as f:
+            engine_log.write_tsv(f)
+
+    if args.player_logs:
+        phase_log = PhaseLog()
+        for path in args.player_logs:
+            phase_log.read(path)
+        print(phase_log.report(args.k, args.limit))
+
+
+if __name__ == "__main__":
+    main()
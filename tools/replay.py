@@ -0,0 +1,165 @@
+"""
+Offline replay harness. Feeds recorded game state lines (one JSON state per
+line, as written by Game(record_path=...)) through a bot's
+get_move_decision / get_action_decision in-process, without the engine or
+stdin/stdout, and reports the decisions and per-phase timings.
+
+    python -m tools.replay bot recorded_game.jsonl [more.jsonl ...] [--out decisions.txt]
+
+Recordings ending in .snap (Game(record_path='game.snap'), or converted with
+tools.snapshot) are read with networking.snapshot instead, and their states
+are handed to the bot without JSON decoding.
+
+Lines alternate between the move phase and the action phase, starting with a
+move, exactly as the engine sends them. Diffing the --out file of two runs is
+a quick regression test for strategy or parser changes.
+"""
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Union
+import argparse
+import contextlib
+import importlib
+import inspect
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game
+from model.game_state import GameState
+from networking import io, snapshot
+from networking.decoder import IncrementalDecoder
+from networking.latency import LatencyTracker
+
+
+class ReplayGame(Game):
+    """
+    Game that reads its states from recorded lines, or already decoded
+    GameStates, and collects decisions instead of talking to the engine
+    """
+
+    def __init__(self, lines: Iterable[Union[bytes, GameState]], incremental: bool = False) -> None:
+        super().__init__(incremental=incremental)
+        self.decoder = IncrementalDecoder() if incremental else None
+        self.lines: Iterator[Union[bytes, GameState]] = iter(lines)
+        self.messages: List[str] = []
+
+    def handshake(self, item, upgrade, loadout: str = None) -> None:
+        # No engine to send a heartbeat or loadout to
+        pass
+
+    def update_game(self) -> None:
+        self.latency.start()
+        try:
+            line = next(self.lines)
+        except StopIteration:
+            raise IOError("End of recording")
+        self.latency.lap('read')
+        if isinstance(line, GameState):
+            self.game_state = line
+            return
+        self.game_state = io.decode_gamestate(line, self.decoder, self.latency)
+
+    def write(self, message: bytearray) -> None:
+        self.messages.append(message[:-1].decode())
+
+
+class Decision(NamedTuple):
+    turn: int
+    phase: str
+    message: str
+
+
+class ReplayResult(NamedTuple):
+    decisions: List[Decision]
+    latency: LatencyTracker
+    seconds: float
+
+
+class Strategy:
+    """
+    Adapts a bot module to a common interface. Bots whose decision functions
+    take (game, state) get the dict returned by the module's initial_state().
+    """
+
+    def __init__(self, module) -> None:
+        self.module = module
+        self.stateful = len(inspect.signature(module.get_move_decision).parameters) > 1
+        self.state = getattr(module, 'initial_state', dict)() if self.stateful else None
+
+    def _call(self, decide: Callable, game: Game):
+        return decide(game, self.state) if self.stateful else decide(game)
+
+    def move(self, game: Game):
+        return self._call(self.module.get_move_decision, game)
+
+    def action(self, game: Game):
+        return self._call(self.module.get_action_decision, game)
+
+
+def read_lines(path: str) -> Iterator[Union[bytes, GameState]]:
+    """
+    Yields the game state lines of a recording, or its GameStates if it is a
+    snapshot recording
+    """
+    if path.endswith(snapshot.SUFFIX):
+        with snapshot.SnapshotReader(path) as reader:
+            yield from reader
+        return
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def replay(module, lines: Iterable[bytes], incremental: bool = False) -> ReplayResult:
+    """
+    Runs a bot module over recorded game state lines
+    :param module: bot module defining get_move_decision and get_action_decision
+    :param lines: recorded game state lines, alternating move and action phases
+    :param incremental: decode with networking.decoder.IncrementalDecoder
+    :return: ReplayResult with every decision and the phase timings
+    """
+    game = ReplayGame(lines, incremental)
+    strategy = Strategy(module)
+    decisions = []
+    start = time.perf_counter()
+    while True:
+        for phase, decide, send in (('move', strategy.move, game.send_move_decision),
+                                    ('action', strategy.action, game.send_action_decision)):
+            try:
+                game.update_game()
+            except IOError:
+                return ReplayResult(decisions, game.latency, time.perf_counter() - start)
+            send(decide(game))
+            decisions.append(Decision(game.game_state.turn, phase, game.messages[-1]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded game states through a bot")
+    parser.add_argument('bot', help="bot module name, e.g. bot or bot2")
+    parser.add_argument('recordings', nargs='+', help="files with one game state JSON per line, or .snap recordings")
+    parser.add_argument('--incremental', action='store_true', help="use the incremental decoder")
+    parser.add_argument('--out', help="write every decision to this file, one per line")
+    parser.add_argument('--verbose', action='store_true', help="show the bot's log output")
+    args = parser.parse_args()
+
+    out = open(args.out, 'w') if args.out else None
+    for path in args.recordings:
+        module = importlib.reload(importlib.import_module(args.bot))
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.redirect_stderr(sys.stderr if args.verbose else devnull):
+            result = replay(module, read_lines(path), args.incremental)
+        print(f"{path}: {len(result.decisions)} decisions in {result.seconds * 1000:.1f} ms")
+        print(f"  {result.latency.summary()}")
+        if out is not None:
+            for decision in result.decisions:
+                out.write(f"{path}\t{decision.turn}\t{decision.phase}\t{decision.message}\n")
+    if out is not None:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
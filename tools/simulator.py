@@ -0,0 +1,565 @@
+"""
+Local MechMania 27 game simulator for self-play.
+
+The board is kept as a model.tile_map.TileMap (flat per-cell columns) and the
+rules are driven by resources/mm27.properties through api.constants:
+fertility band movement, crop growth, buying and selling at the green grocer,
+items, upgrades and the protection radius. Bots are run in-process through
+the same Game / GameState interface the engine uses. Each half-turn they
+get a GameState built directly from the simulator's arrays (no JSON). They
+answer with decision objects whose encoded message is parsed exactly as the
+engine would parse it.
+
+state_dict() produces the engine's JSON layout for any player, so the
+simulator can also stand in for the engine when testing the networking code.
+
+The engine's source isn't part of this tree, so a few details are modelled
+as follows:
+  * Crops grow at the end of every turn, by growth_value *
+    (1 + (fertility - 1) * fertility_sensitivity). They can only be harvested
+    once their growth timer reaches 0 (see api.forecast for the same model).
+  * A crop can't be harvested within the opponent's protection radius or under
+    the opponent's scarecrow.
+  * Harvested crops are sold when a player moves onto a green grocer tile, or
+    straight away once a delivery drone has been used.
+  * Items are single use. Rain totems, fertility idols and scarecrows affect the
+    tiles around the player for the rest of the game, pesticide reduces the
+    value of nearby crops once, and the coffee thermos multiplies movement for
+    the rest of the game.
+
+    python -m tools.simulator bot bot2 --games 100
+"""
+from typing import Dict, List, NamedTuple, Optional
+import argparse
+import os
+import random
+import sys
+import time
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import game_util
+from api.constants import Constants
+from api.fertility import timeline
+from game import Game
+from model.crop_type import CropType
+from model.game_state import GameState
+from model.item_type import ItemType
+from model.player import Player
+from model.tile_map import TileMap
+from model.tile_type import TileType
+from model.upgrade_type import UpgradeType
+from networking import io
+from tools.replay import Strategy
+
+constants = Constants()
+
+LAST_TURN = constants.LAST_TURN
+
+_UNPLANTABLE = (TileType.GRASS, TileType.GREEN_GROCER)
+# Enum .name is a descriptor lookup; the player dictionaries are rebuilt every half-turn
+_CROP_NAMES = {crop: crop.name for crop in CropType}
+_initial_tile_map: Optional[TileMap] = None
+
+
+def initial_tilemap_dict() -> Dict:
+    """
+    Returns the engine tile map JSON for the start of a game
+    """
+    width = constants.BOARD_WIDTH
+    grocer_start = (width - constants.GREENGROCER_LENGTH) // 2
+    tiles = []
+    for y in range(constants.BOARD_HEIGHT):
+        row = []
+        for x in range(width):
+            if y == 0 and grocer_start <= x < grocer_start + constants.GREENGROCER_LENGTH:
+                tile_type = TileType.GREEN_GROCER
+            elif y < constants.GRASS_ROWS:
+                tile_type = TileType.GRASS
+            else:
+                tile_type = timeline.tile_type(1, y)
+            row.append({
+                'type': tile_type.name,
+                'crop': {'type': CropType.NONE.name, 'growthTimer': 0, 'value': 0.0},
+                'p1_item': ItemType.NONE.name,
+                'p2_item': ItemType.NONE.name,
+                'turnsLeftToGrow': 0,
+                'rainTotemEffect': False,
+                'fertilityIdolEffect': False,
+                'scarecrowEffect': -1,
+            })
+        tiles.append(row)
+    return {'mapHeight': constants.BOARD_HEIGHT, 'mapWidth': width, 'tiles': tiles}
+
+
+def initial_tile_map() -> TileMap:
+    """
+    Returns a fresh copy of the starting TileMap
+    """
+    global _initial_tile_map
+    if _initial_tile_map is None:
+        _initial_tile_map = TileMap(initial_tilemap_dict())
+    return _initial_tile_map.copy()
+
+
+class SimPlayer:
+    """
+    Mutable player record owned by the simulator
+    """
+
+    def __init__(self, number: int, name: str, item: ItemType, upgrade: UpgradeType, x: int, y: int) -> None:
+        self.number = number
+        self.name = name
+        self.item = item
+        self.upgrade = upgrade
+        self.x = x
+        self.y = y
+        self.money = float(constants.STARTING_MONEY)
+        self.seeds: Dict[CropType, int] = {crop: 0 for crop in CropType if crop is not CropType.NONE}
+        # (CropType, value, planter number) of every carried crop
+        self.harvested: List[tuple] = []
+        self.used_item = False
+        self.has_delivery_drone = False
+        self.has_coffee_thermos = False
+        self.discount = constants.GREEN_GROCER_LOYALTY_CARD_DISCOUNT if upgrade is UpgradeType.LOYALTY_CARD else 0.0
+        self.protection_radius = constants.SPYGLASS_PROTECTION_RADIUS \
+            if upgrade is UpgradeType.SPYGLASS else constants.PROTECTION_RADIUS
+        self.harvest_radius = constants.SCYTHE_HARVEST_RADIUS \
+            if upgrade is UpgradeType.SCYTHE else constants.HARVEST_RADIUS
+        self.plant_radius = constants.SEED_A_PULT_PLANT_RADIUS \
+            if upgrade is UpgradeType.SEED_A_PULT else constants.PLANT_RADIUS
+        self.carrying_capacity = constants.BACKPACK_CARRYING_CAPACITY \
+            if upgrade is UpgradeType.BACKPACK else constants.CARRYING_CAPACITY
+        self.max_movement = constants.LONGER_LEGS_MAX_MOVEMENT \
+            if upgrade is UpgradeType.LONGER_LEGS else constants.MAX_MOVEMENT
+        self.double_drop_chance = constants.RABBITS_FOOT_DOUBLE_DROP_CHANCE \
+            if upgrade is UpgradeType.RABBITS_FOOT else 0.0
+        self.feedback: List[str] = []
+        self.stats: Dict[str, float] = {
+            'planted': 0, 'harvested': 0, 'stolen': 0, 'sold': 0, 'sold_value': 0.0,
+            'seeds_bought': 0, 'seed_spend': 0.0, 'invalid': 0, 'potatoes_sold': 0,
+        }
+
+    def to_dict(self) -> Dict:
+        """
+        Returns the player in the engine's JSON layout
+        """
+        return {
+            'name': self.name,
+            'position': {'x': self.x, 'y': self.y},
+            'upgrade': self.upgrade.name,
+            'item': self.item.name,
+            'money': self.money,
+            'seedInventory': {_CROP_NAMES[crop]: count for crop, count in self.seeds.items()},
+            'harvestedInventory': [{'type': _CROP_NAMES[crop], 'growthTimer': 0, 'value': value}
+                                   for crop, value, _ in self.harvested],
+            'discount': self.discount,
+            'protectionRadius': self.protection_radius,
+            'harvestRadius': self.harvest_radius,
+            'plantRadius': self.plant_radius,
+            'carryingCapacity': self.carrying_capacity,
+            'maxMovement': self.max_movement,
+            'doubleDropChance': self.double_drop_chance,
+            'usedItem': self.used_item,
+            'hasDeliveryDrone': self.has_delivery_drone,
+            'hasCoffeeThermos': self.has_coffee_thermos,
+            'itemTimeExpired': False,
+        }
+
+    def distance(self, x: int, y: int) -> int:
+        return abs(self.x - x) + abs(self.y - y)
+
+    def reject(self, message: str) -> None:
+        self.feedback.append(message)
+        self.stats['invalid'] += 1
+
+
+class Simulator:
+    """
+    One game between two players. Call move() and act() with each player's
+    engine strings once per turn, or play() to run two bot modules to the end.
+    """
+
+    def __init__(self, item1: ItemType = ItemType.NONE, upgrade1: UpgradeType = UpgradeType.NONE,
+                 item2: ItemType = ItemType.NONE, upgrade2: UpgradeType = UpgradeType.NONE,
+                 seed: Optional[int] = None, names=('player-1', 'player-2')) -> None:
+        self.random = random.Random(seed)
+        self.turn = 1
+        self.tile_map = initial_tile_map()
+        self.width = self.tile_map.map_width
+        self.height = self.tile_map.map_height
+        self.players = [
+            SimPlayer(1, names[0], item1, upgrade1, 0, 0),
+            SimPlayer(2, names[1], item2, upgrade2, self.width - 1, 0),
+        ]
+        # Cell index -> number of the player who planted the crop there
+        self.planter: Dict[int, int] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self.turn >= LAST_TURN
+
+    def _opponent(self, player: SimPlayer) -> SimPlayer:
+        return self.players[2 - player.number]
+
+    def state_dict(self, player_num: int) -> Dict:
+        """
+        Returns the game state JSON the engine would send to player_num
+        """
+        return {
+            'turn': self.turn,
+            'p1': self.players[0].to_dict(),
+            'p2': self.players[1].to_dict(),
+            'tileMap': self.tile_map.to_dict(),
+            'playerNum': player_num,
+            'feedback': list(self.players[player_num - 1].feedback),
+        }
+
+    def game_states(self) -> List[GameState]:
+        """
+        Returns the GameState each player sees right now, built straight from the
+        simulator's arrays. Both share one copy of the tile map.
+        """
+        tile_map = self.tile_map.copy()
+        player1 = Player(self.players[0].to_dict())
+        player2 = Player(self.players[1].to_dict())
+        return [GameState.from_parts(self.turn, player1, player2, tile_map, number,
+                                     list(self.players[number - 1].feedback))
+                for number in (1, 2)]
+
+    # Move phase
+
+    def move(self, message1: str, message2: str) -> None:
+        for player, message in zip(self.players, (message1, message2)):
+            player.feedback = []
+            self._apply_move(player, message)
+        for player in self.players:
+            if self.tile_map.tile_types[player.y * self.width + player.x] is TileType.GREEN_GROCER:
+                self._sell(player)
+
+    def _apply_move(self, player: SimPlayer, message: str) -> None:
+        words = message.split()
+        try:
+            x, y = int(words[1]), int(words[2])
+        except (IndexError, ValueError):
+            player.reject(f"Invalid move decision: {message!r}")
+            return
+        if words[0] != 'move' or not (0 <= x < self.width and 0 <= y < self.height) \
+                or player.distance(x, y) > player.max_movement:
+            player.reject(f"Invalid move to ({x},{y})")
+            return
+        player.x, player.y = x, y
+
+    def _sell(self, player: SimPlayer) -> None:
+        for crop, value, _ in player.harvested:
+            player.money += value
+            player.stats['sold'] += 1
+            player.stats['sold_value'] += value
+            if crop is CropType.POTATO:
+                player.stats['potatoes_sold'] += 1
+        player.harvested = []
+
+    # Action phase
+
+    def act(self, message1: str, message2: str) -> None:
+        order = self.players if self.turn % 2 else self.players[::-1]
+        messages = {1: message1, 2: message2}
+        for player in self.players:
+            player.feedback = []
+        for player in order:
+            self._apply_action(player, messages[player.number])
+        self._grow()
+        self.turn += 1
+        self._move_band()
+
+    def _apply_action(self, player: SimPlayer, message: str) -> None:
+        words = message.split()
+        if not words:
+            player.reject("Empty action decision")
+            return
+        kind, args = words[0], words[1:]
+        try:
+            if kind == 'buy':
+                self._buy(player, [(CropType[args[i]], int(float(args[i + 1]))) for i in range(0, len(args), 2)])
+            elif kind == 'plant':
+                self._plant(player, [(CropType[args[i]], int(args[i + 1]), int(args[i + 2]))
+                                     for i in range(0, len(args), 3)])
+            elif kind == 'harvest':
+                self._harvest(player, [(int(args[i]), int(args[i + 1])) for i in range(0, len(args), 2)])
+            elif kind == 'use_item':
+                self._use_item(player)
+            elif kind != 'do_nothing':
+                player.reject(f"Unknown action {kind!r}")
+        except (IndexError, KeyError, ValueError):
+            player.reject(f"Invalid action decision: {message!r}")
+
+    def _buy(self, player: SimPlayer, orders: List[tuple]) -> None:
+        if self.tile_map.tile_types[player.y * self.width + player.x] is not TileType.GREEN_GROCER:
+            player.reject("Can only buy seeds on a green grocer tile")
+            return
+        cost = sum(crop.seed_price * quantity for crop, quantity in orders)
+        cost -= game_util.loyalty_discount(cost, player.upgrade)
+        if any(quantity < 0 or crop is CropType.NONE for crop, quantity in orders) or cost > player.money:
+            player.reject("Can't afford seeds")
+            return
+        player.money -= cost
+        player.stats['seed_spend'] += cost
+        for crop, quantity in orders:
+            player.seeds[crop] += quantity
+            player.stats['seeds_bought'] += quantity
+
+    def _plant(self, player: SimPlayer, plantings: List[tuple]) -> None:
+        tile_map = self.tile_map
+        for crop, x, y in plantings:
+            index = y * self.width + x
+            if crop is CropType.NONE or player.seeds.get(crop, 0) <= 0:
+                player.reject(f"No {crop} seeds to plant")
+            elif not (0 <= x < self.width and 0 <= y < self.height) or player.distance(x, y) > player.plant_radius:
+                player.reject(f"Can't plant at ({x},{y}): out of range")
+            elif tile_map.tile_types[index] in _UNPLANTABLE or tile_map.crop_types[index] is not CropType.NONE:
+                player.reject(f"Can't plant at ({x},{y})")
+            else:
+                player.seeds[crop] -= 1
+                tile_map.crop_types[index] = crop
+                tile_map.growth_timers[index] = crop.growth_time
+                tile_map.crop_values[index] = 0.0
+                tile_map.turns_left_to_grow[index] = self._turns_left(index, crop.growth_time)
+                self.planter[index] = player.number
+                player.stats['planted'] += 1
+
+    def _harvest(self, player: SimPlayer, cells: List[tuple]) -> None:
+        tile_map = self.tile_map
+        opponent = self._opponent(player)
+        for x, y in cells:
+            index = y * self.width + x
+            if not (0 <= x < self.width and 0 <= y < self.height) or player.distance(x, y) > player.harvest_radius:
+                player.reject(f"Can't harvest at ({x},{y}): out of range")
+                continue
+            crop = tile_map.crop_types[index]
+            if crop is CropType.NONE or tile_map.growth_timers[index] > 0:
+                player.reject(f"Nothing ready to harvest at ({x},{y})")
+                continue
+            if opponent.distance(x, y) <= opponent.protection_radius \
+                    or tile_map.scarecrow_effects[index] == opponent.number:
+                player.reject(f"Crop at ({x},{y}) is protected")
+                continue
+            drops = 2 if self.random.random() < player.double_drop_chance else 1
+            if len(player.harvested) + drops > player.carrying_capacity:
+                player.reject("Inventory full")
+                return
+            value = tile_map.crop_values[index]
+            planter = self.planter.pop(index, 0)
+            for _ in range(drops):
+                player.harvested.append((crop, value, planter))
+            player.stats['harvested'] += drops
+            if planter == opponent.number:
+                player.stats['stolen'] += drops
+            tile_map.crop_types[index] = CropType.NONE
+            tile_map.growth_timers[index] = 0
+            tile_map.crop_values[index] = 0.0
+            tile_map.turns_left_to_grow[index] = 0
+        if player.has_delivery_drone:
+            self._sell(player)
+
+    def _use_item(self, player: SimPlayer) -> None:
+        if player.used_item or player.item is ItemType.NONE:
+            player.reject("No item to use")
+            return
+        player.used_item = True
+        tile_map = self.tile_map
+        item = player.item
+        center = player.y * self.width + player.x
+        if player.number == 1:
+            tile_map.p1_items[center] = item
+        else:
+            tile_map.p2_items[center] = item
+
+        if item is ItemType.RAIN_TOTEM:
+            for index in self._cells_within(player, constants.RAIN_TOTEM_EFFECT_RADIUS):
+                tile_map.rain_totem_effects[index] = 1
+        elif item is ItemType.FERTILITY_IDOL:
+            for index in self._cells_within(player, constants.FERTILITY_IDOL_EFFECT_RADIUS):
+                tile_map.fertility_idol_effects[index] = 1
+        elif item is ItemType.PESTICIDE:
+            for index in self._cells_within(player, constants.PESTICIDE_EFFECT_RADIUS):
+                tile_map.crop_values[index] *= 1 - constants.PESTICIDE_CROP_VALUE_DECREASE
+        elif item is ItemType.SCARECROW:
+            for index in self._cells_within(player, constants.SCARECROW_EFFECT_RADIUS):
+                tile_map.scarecrow_effects[index] = player.number
+        elif item is ItemType.DELIVERY_DRONE:
+            player.has_delivery_drone = True
+        elif item is ItemType.COFFEE_THERMOS:
+            player.has_coffee_thermos = True
+            player.max_movement *= constants.COFFEE_THERMOS_MOVEMENT_MULTIPLIER
+
+    def _cells_within(self, player: SimPlayer, radius: int) -> List[int]:
+        return [y * self.width + x
+                for y in range(max(player.y - radius, 0), min(player.y + radius + 1, self.height))
+                for x in range(max(player.x - radius, 0), min(player.x + radius + 1, self.width))
+                if player.distance(x, y) <= radius]
+
+    # End of turn
+
+    def _turns_left(self, index: int, timer: int) -> int:
+        ticks = constants.RAIN_TOTEM_GROWTH_MULTIPLIER if self.tile_map.rain_totem_effects[index] else 1
+        return -(-timer // ticks)
+
+    def _grow(self) -> None:
+        tile_map = self.tile_map
+        idol = constants.FERTILITY_IDOL_FERTILITY_MULTIPLIER
+        totem = constants.RAIN_TOTEM_GROWTH_MULTIPLIER
+        for index in self.planter:
+            timer = tile_map.growth_timers[index]
+            if timer <= 0:
+                continue
+            crop = tile_map.crop_types[index]
+            ticks = min(timer, totem if tile_map.rain_totem_effects[index] else 1)
+            fertility = tile_map.tile_types[index].fertility
+            if tile_map.fertility_idol_effects[index]:
+                fertility *= idol
+            tile_map.crop_values[index] += \
+                ticks * crop.growth_value * (1 + (fertility - 1) * crop.fertility_sensitivity)
+            tile_map.growth_timers[index] = timer - ticks
+            tile_map.turns_left_to_grow[index] = self._turns_left(index, timer - ticks)
+
+    def _move_band(self) -> None:
+        tile_map = self.tile_map
+        width = self.width
+        row_types = timeline.row_types(self.turn)
+        for y in range(constants.GRASS_ROWS, self.height):
+            tile_type = row_types[y]
+            if tile_map.tile_types[y * width] is not tile_type:
+                tile_map.tile_types[y * width:(y + 1) * width] = [tile_type] * width
+
+    # Results
+
+    def winner(self) -> int:
+        """
+        Returns 1 or 2 for the player with more money, or 0 for a tie
+        """
+        money1, money2 = self.players[0].money, self.players[1].money
+        return 0 if money1 == money2 else (1 if money1 > money2 else 2)
+
+    def play(self, strategy1: Strategy, strategy2: Strategy) -> 'GameResult':
+        """
+        Runs the game to the end with two in-process strategies
+        """
+        games = [SimGame(), SimGame()]
+        strategies = (strategy1, strategy2)
+        was_enabled = io.Logger.enabled
+        io.Logger.enabled = False
+        try:
+            while not self.finished:
+                for game, game_state in zip(games, self.game_states()):
+                    game.game_state = game_state
+                self.move(*[game.decide(strategy.move) for game, strategy in zip(games, strategies)])
+                for game, game_state in zip(games, self.game_states()):
+                    game.game_state = game_state
+                self.act(*[game.decide(strategy.action) for game, strategy in zip(games, strategies)])
+        finally:
+            io.Logger.enabled = was_enabled
+        return GameResult(self.winner(), self.players[0].money, self.players[1].money,
+                          dict(self.players[0].stats), dict(self.players[1].stats))
+
+
+class SimGame(Game):
+    """
+    Game whose state is set by the simulator and whose output is returned
+    instead of written to stdout
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.game_state = None
+        self.message = None
+
+    def handshake(self, item, upgrade, loadout: str = None) -> None:
+        # The simulator is told the loadouts directly
+        pass
+
+    def write(self, message: bytearray) -> None:
+        self.message = message[:-1].decode()
+
+    def decide(self, strategy_call) -> str:
+        self.latency.start()
+        self._send_decision(strategy_call(self))
+        return self.message
+
+
+# Approximations of some of the engine's end-of-game achievements from the
+# simulator's stats; the engine's exact criteria aren't part of this tree
+ACHIEVEMENTS = {
+    'Botanical Burglary': lambda stats, money: stats['stolen'] > 0,
+    'Fruits of our Labor': lambda stats, money: stats['sold'] > 0,
+    "It Ain't Much, but It's Honest Work": lambda stats, money: stats['potatoes_sold'] > 0,
+    'Not Worth the Dirt He Sows': lambda stats, money: money < constants.STARTING_MONEY,
+}
+
+
+class GameResult(NamedTuple):
+    winner: int
+    money1: float
+    money2: float
+    stats1: Dict[str, float]
+    stats2: Dict[str, float]
+
+    def achievements(self, player_num: int) -> List[str]:
+        """
+        Returns the names of the ACHIEVEMENTS a player unlocked
+        """
+        stats, money = (self.stats1, self.money1) if player_num == 1 else (self.stats2, self.money2)
+        return [name for name, unlocked in ACHIEVEMENTS.items() if unlocked(stats, money)]
+
+
+def play_game(bot1, bot2, item1: ItemType = ItemType.NONE, upgrade1: UpgradeType = UpgradeType.NONE,
+              item2: ItemType = ItemType.NONE, upgrade2: UpgradeType = UpgradeType.NONE,
+              seed: Optional[int] = None) -> GameResult:
+    """
+    Plays one game between two bot modules
+    :param bot1: bot module for player 1 (e.g. the imported bot.py)
+    :param bot2: bot module for player 2. When it is bot1 itself, player 2
+                 plays a copy of the module, so the two don't share its
+                 module-level state.
+    :param seed: seed for the random parts of the rules and the bots
+    :return: GameResult with the winner, final money and per-player stats
+    """
+    if bot2 is bot1:
+        # tools.tournament imports this module
+        from tools.tournament import load_bot
+        bot2 = load_bot(bot1.__name__, 2)
+    if seed is not None:
+        random.seed(seed)
+    simulator = Simulator(item1, upgrade1, item2, upgrade2, seed)
+    return simulator.play(Strategy(bot1), Strategy(bot2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play bots against each other with the local simulator")
+    parser.add_argument('bot1', help="bot module for player 1, e.g. bot")
+    parser.add_argument('bot2', help="bot module for player 2, e.g. bot2")
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--item1', default='NONE', choices=ItemType.__members__)
+    parser.add_argument('--upgrade1', default='NONE', choices=UpgradeType.__members__)
+    parser.add_argument('--item2', default='NONE', choices=ItemType.__members__)
+    parser.add_argument('--upgrade2', default='NONE', choices=UpgradeType.__members__)
+    args = parser.parse_args()
+
+    # tools.tournament imports this module
+    from tools.tournament import load_bot
+    bot1 = load_bot(args.bot1, 1)
+    bot2 = load_bot(args.bot2, 2)
+    wins = [0, 0, 0]
+    start = time.perf_counter()
+    for seed in range(args.games):
+        result = play_game(bot1, bot2, ItemType[args.item1], UpgradeType[args.upgrade1],
+                           ItemType[args.item2], UpgradeType[args.upgrade2], seed)
+        wins[result.winner] += 1
+        print(f"game {seed}: winner {result.winner}, money {result.money1:.2f} vs {result.money2:.2f}")
+    seconds = time.perf_counter() - start
+    print(f"{args.bot1} {wins[1]} - {wins[2]} {args.bot2} ({wins[0]} ties), "
+          f"{args.games / seconds * 60:.0f} games/minute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Converts game state line recordings (Game(record_path='game.jsonl')) into
+compact snapshot recordings (see networking.snapshot), and checks that they
+decode back to the same GameStates.
+
+    python -m tools.snapshot recorded_game.jsonl [more.jsonl ...] [--level 6] [--keyframe-interval 20] [--verify]
+
+Each recording is written next to the original with a .snap suffix. Prints the
+sizes, the write and read time per state, and the time to open the recording
+and decode its last state on its own.
+"""
+from typing import Tuple
+import argparse
+import os
+import sys
+import time
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.game_state import GameState
+from model.tile_map import TileMap
+from networking import io, snapshot
+from networking.decoder import IncrementalDecoder
+from tools.replay import read_lines
+
+
+def state_key(game_state: GameState) -> Tuple:
+    """
+    Returns everything a GameState holds, as one comparable tuple
+    """
+    tile_map = game_state.tile_map
+    players = tuple(tuple(getattr(player, attribute) for attribute in player.__slots__)
+                    for player in (game_state.player1, game_state.player2))
+    columns = tuple(list(getattr(tile_map, column)) for column in TileMap.COLUMNS)
+    return (game_state.turn, game_state.player_num, list(game_state.feedback), players,
+            tile_map.map_width, tile_map.map_height, columns)
+
+
+def convert(path: str, out: str, keyframe_interval: int, level: int, verify: bool) -> None:
+    decoder = IncrementalDecoder()
+    originals = []
+    start = time.perf_counter()
+    with snapshot.SnapshotWriter(out, keyframe_interval, level) as writer:
+        for line in read_lines(path):
+            game_state = io.decode_gamestate(line, decoder)
+            writer.write(game_state)
+            if verify:
+                # The decoder patches one GameState in place, so keep its contents
+                originals.append(state_key(game_state))
+        count = len(writer.offsets)
+    written = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with snapshot.SnapshotReader(out) as reader:
+        for n, game_state in enumerate(reader):
+            if verify and state_key(game_state) != originals[n]:
+                raise ValueError(f"{out}: state {n} doesn't match {path}")
+    read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with snapshot.SnapshotReader(out) as reader:
+        if len(reader):
+            reader[len(reader) - 1]
+    last = time.perf_counter() - start
+
+    per_state = 1000 / max(count, 1)
+    print(f"{path}: {count} states, {os.path.getsize(path) / 1024:.0f} KiB -> "
+          f"{out}: {os.path.getsize(out) / 1024:.0f} KiB" + (", verified" if verify else ""))
+    print(f"  write {written * per_state:.2f} ms/state, read {read * per_state:.2f} ms/state, "
+          f"last state alone {last * 1000:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert game state line recordings to snapshot recordings")
+    parser.add_argument('recordings', nargs='+', help="files with one game state JSON per line")
+    parser.add_argument('--keyframe-interval', type=int, default=snapshot.KEYFRAME_INTERVAL)
+    parser.add_argument('--level', type=int, default=6, help="zlib level, 0 for uncompressed records")
+    parser.add_argument('--verify', action='store_true', help="check every state decodes back unchanged")
+    args = parser.parse_args()
+
+    for path in args.recordings:
+        out = os.path.splitext(path)[0] + snapshot.SUFFIX
+        convert(path, out, args.keyframe_interval, args.level, args.verify)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Bot process startup benchmark.
+
+The engine starts a new Python process for every match and waits for its
+heartbeat, then its item and upgrade. This launches a bot script the same
+way, repeatedly, and reports how long after the launch each of those lines
+arrives. It also lists the slowest imports, from python -X importtime.
+
+    python -m tools.startup bot.py --runs 20
+    python -m tools.startup bot.py --max-heartbeat-ms 60   # exit 1 if slower
+    python -m tools.startup --snapshot                     # rebuild api/_properties.py
+
+--snapshot regenerates the Python-literal copy of resources/mm27.properties
+that api.constants loads instead of parsing the file (see
+api.constants.load_snapshot). Run it after editing the properties. Until
+then the stale snapshot is ignored and the file is parsed as before.
+"""
+from typing import Dict, List, Tuple
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_handshake(script: str) -> Tuple[float, float]:
+    """
+    Launches a bot and returns the milliseconds until its heartbeat and until
+    its item and upgrade have both arrived
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script], cwd=ROOT, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        if process.stdout.readline().strip() != b"heartbeat":
+            raise IOError(f"{script} didn't send a heartbeat")
+        heartbeat = time.perf_counter()
+        process.stdout.readline()
+        process.stdout.readline()
+        handshake = time.perf_counter()
+    finally:
+        process.kill()
+        process.wait()
+    return (heartbeat - start) * 1000, (handshake - start) * 1000
+
+
+def slowest_imports(script: str, limit: int = 10) -> List[Tuple[str, float, float]]:
+    """
+    Returns (module, self ms, cumulative ms) of the slowest imports of a bot
+    script, by cumulative time
+    """
+    module = os.path.splitext(os.path.basename(script))[0]
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(own) / 1000, int(cumulative) / 1000))
+    rows.sort(key=lambda row: -row[2])
+    return rows[:limit]
+
+
+def write_snapshot() -> str:
+    """
+    Writes api/_properties.py from resources/mm27.properties
+    :return: path of the snapshot
+    """
+    from api.constants import PROPERTIES_PATH, load_properties, properties_checksum
+    path = os.path.join(ROOT, "api", "_properties.py")
+    properties = dict(load_properties())
+    with open(path, "w") as f:
+        f.write("# Generated by tools.startup --snapshot from resources/mm27.properties; don't edit\n")
+        f.write(f"CHECKSUM = {properties_checksum(PROPERTIES_PATH)}\n")
+        f.write("PROPERTIES = {\n")
+        for key, value in properties.items():
+            f.write(f"    {key!r}: {value!r},\n")
+        f.write("}\n")
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how fast a bot process sends its heartbeat")
+    parser.add_argument('script', nargs='?', default='bot.py', help="bot script, e.g. bot.py")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-heartbeat-ms', type=float, help="exit with status 1 if the median is slower")
+    parser.add_argument('--snapshot', action='store_true', help="rebuild api/_properties.py and exit")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        print(f"wrote {write_snapshot()}")
+        return
+
+    time_handshake(args.script)  # warm the .pyc and OS caches
+    timings: Dict[str, List[float]] = {'heartbeat': [], 'item and upgrade': []}
+    for _ in range(args.runs):
+        heartbeat, handshake = time_handshake(args.script)
+        timings['heartbeat'].append(heartbeat)
+        timings['item and upgrade'].append(handshake)
+    for name, values in timings.items():
+        print(f"{name}: median {statistics.median(values):.1f} ms, min {min(values):.1f} ms, "
+              f"max {max(values):.1f} ms over {args.runs} launches")
+    print("slowest imports (self ms, cumulative ms):")
+    for module, own, cumulative in slowest_imports(args.script):
+        print(f"    {module:<32} {own:7.1f} {cumulative:7.1f}")
+
+    if args.max_heartbeat_ms is not None and statistics.median(timings['heartbeat']) > args.max_heartbeat_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
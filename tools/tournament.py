@@ -0,0 +1,276 @@
+"""
+Tournament runner: plays a grid of simulated games across all CPU cores and
+aggregates win rate, money and achievements per configuration.
+
+A configuration is a pair of bots, the item and upgrade of each side and any
+strategy parameter overrides (module-level attributes of the bot, set before
+each game). Every configuration is played once per seed. Finished games are
+appended to a JSON-lines checkpoint as they complete, and games already in
+the checkpoint are skipped, so a long sweep can be interrupted and resumed.
+
+    python -m tools.tournament bot bot2 --seeds 200 \\
+        --items1 DELIVERY_DRONE,COFFEE_THERMOS --upgrades1 LONGER_LEGS,SCYTHE \\
+        --params1 '{"SOME_THRESHOLD": [100, 200]}' --checkpoint sweep.jsonl
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+import argparse
+import importlib
+import importlib.util
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.item_type import ItemType
+from model.upgrade_type import UpgradeType
+from tools.simulator import ACHIEVEMENTS, play_game
+
+
+class Job(NamedTuple):
+    bot1: str
+    bot2: str
+    item1: str
+    upgrade1: str
+    item2: str
+    upgrade2: str
+    params1: str
+    params2: str
+    seed: int
+
+    def key(self) -> str:
+        return json.dumps(list(self))
+
+
+def expand_params(grid: Dict[str, list]) -> List[str]:
+    """
+    Expands {"NAME": [values, ...]} into every combination, each as a JSON string
+    """
+    names = sorted(grid)
+    return [json.dumps(dict(zip(names, values)), sort_keys=True)
+            for values in itertools.product(*(grid[name] for name in names))]
+
+
+def make_jobs(bot1: str, bot2: str, seeds: Iterable[int],
+              items1=('NONE',), upgrades1=('NONE',), items2=('NONE',), upgrades2=('NONE',),
+              params1: Dict[str, list] = None, params2: Dict[str, list] = None) -> List[Job]:
+    """
+    Returns one Job for every combination of the given choices and seeds
+    """
+    seeds = list(seeds)
+    return [Job(bot1, bot2, *choice, seed)
+            for choice in itertools.product(items1, upgrades1, items2, upgrades2,
+                                            expand_params(params1 or {}), expand_params(params2 or {}))
+            for seed in seeds]
+
+
+# Per-worker warm state: bot modules imported once when the worker starts, keyed by (name, side)
+_modules = {}
+
+
+def load_bot(name: str, side: int):
+    """
+    Imports a bot module for one side of the game. Player 2 gets its own copy of
+    the module, so a bot playing itself doesn't share its module-level state
+    (crop index, parameter overrides) with its opponent.
+    """
+    if side == 1:
+        return importlib.import_module(name)
+    spec = importlib.util.find_spec(name)
+    copy = importlib.util.spec_from_file_location(f"{name}__player{side}", spec.origin)
+    module = importlib.util.module_from_spec(copy)
+    copy.loader.exec_module(module)
+    return module
+
+
+def _bot(name: str, side: int):
+    if (name, side) not in _modules:
+        _modules[(name, side)] = load_bot(name, side)
+    return _modules[(name, side)]
+
+
+def _init_worker(bots: List[tuple]) -> None:
+    for name, side in bots:
+        _bot(name, side)
+
+
+def _apply_params(module, params: Dict) -> Dict:
+    previous = {name: getattr(module, name) for name in params}
+    for name, value in params.items():
+        setattr(module, name, value)
+    return previous
+
+
+def run_job(job: Job) -> Dict:
+    """
+    Plays one game and returns its result as a checkpoint row
+    """
+    bot1 = _bot(job.bot1, 1)
+    bot2 = _bot(job.bot2, 2)
+    restore1 = _apply_params(bot1, json.loads(job.params1))
+    restore2 = _apply_params(bot2, json.loads(job.params2))
+    try:
+        result = play_game(bot1, bot2, ItemType[job.item1], UpgradeType[job.upgrade1],
+                           ItemType[job.item2], UpgradeType[job.upgrade2], job.seed)
+    finally:
+        _apply_params(bot2, restore2)
+        _apply_params(bot1, restore1)
+    return {
+        'job': list(job),
+        'winner': result.winner,
+        'money1': result.money1,
+        'money2': result.money2,
+        'stats1': result.stats1,
+        'stats2': result.stats2,
+        'achievements1': result.achievements(1),
+        'achievements2': result.achievements(2),
+    }
+
+
+def load_checkpoint(path: Optional[str]) -> List[Dict]:
+    """
+    Returns the rows already in a checkpoint file, skipping torn lines left by
+    an interrupted run
+    """
+    if path is None or not os.path.exists(path):
+        return []
+    rows = []
+    with open(path) as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return rows
+
+
+def run(jobs: List[Job], checkpoint: Optional[str] = None, workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Plays every job not already in the checkpoint, yielding rows as games finish
+    :param jobs: games to play
+    :param checkpoint: JSON-lines file finished games are appended to
+    :param workers: number of worker processes (default: one per CPU)
+    """
+    done = {json.dumps(row['job']) for row in load_checkpoint(checkpoint)}
+    pending = [job for job in jobs if job.key() not in done]
+    if not pending:
+        return
+    bots = sorted({(job.bot1, 1) for job in pending} | {(job.bot2, 2) for job in pending})
+    out = None
+    if checkpoint is not None:
+        out = open(checkpoint, 'a+')
+        # Don't glue the first new row onto a torn last line
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != '\n':
+                out.write('\n')
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(bots,)) as pool:
+            for row in pool.imap_unordered(run_job, pending, chunksize=4):
+                if out is not None:
+                    out.write(json.dumps(row) + '\n')
+                    out.flush()
+                yield row
+    finally:
+        if out is not None:
+            out.close()
+
+
+def wilson_interval(successes: float, trials: int, z: float = 1.96) -> tuple:
+    """
+    Returns the Wilson score interval of a binomial proportion
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def aggregate(rows: Iterable[Dict]) -> List[Dict]:
+    """
+    Groups rows by configuration and summarises them. Win rate is player 1's,
+    counting ties as half a win, with a 95% Wilson confidence interval.
+    Achievement columns hold the share of games in which each player unlocked it.
+    """
+    groups = defaultdict(list)
+    for row in rows:
+        groups[tuple(row['job'][:-1])].append(row)
+
+    table = []
+    for config, group in sorted(groups.items()):
+        games = len(group)
+        wins = sum(1 for row in group if row['winner'] == 1)
+        ties = sum(1 for row in group if row['winner'] == 0)
+        score = wins + ties / 2
+        low, high = wilson_interval(score, games)
+        entry = {
+            'config': config,
+            'games': games,
+            'win_rate': score / games,
+            'ci_low': low,
+            'ci_high': high,
+            'money1': sum(row['money1'] for row in group) / games,
+            'money2': sum(row['money2'] for row in group) / games,
+            'achievements1': {},
+            'achievements2': {},
+        }
+        for player in (1, 2):
+            for name in ACHIEVEMENTS:
+                unlocked = sum(name in row[f'achievements{player}'] for row in group)
+                entry[f'achievements{player}'][name] = unlocked / games
+        table.append(entry)
+    return table
+
+
+def format_table(table: List[Dict]) -> str:
+    lines = []
+    for entry in table:
+        bot1, bot2, item1, upgrade1, item2, upgrade2, params1, params2 = entry['config']
+        lines.append(f"{bot1}[{item1}+{upgrade1}{'' if params1 == '{}' else ' ' + params1}] vs "
+                     f"{bot2}[{item2}+{upgrade2}{'' if params2 == '{}' else ' ' + params2}]: "
+                     f"{entry['games']} games, win rate {entry['win_rate']:.3f} "
+                     f"[{entry['ci_low']:.3f}, {entry['ci_high']:.3f}], "
+                     f"money {entry['money1']:.1f} vs {entry['money2']:.1f}")
+        for player in (1, 2):
+            unlocked = [f"{name} {rate:.2f}" for name, rate in entry[f'achievements{player}'].items() if rate > 0]
+            if unlocked:
+                lines.append(f"    player {player} achievements: " + ", ".join(unlocked))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Play a grid of simulated games across all cores")
+    parser.add_argument('bot1')
+    parser.add_argument('bot2')
+    parser.add_argument('--seeds', type=int, default=100, help="games per configuration")
+    for side in ('1', '2'):
+        parser.add_argument(f'--items{side}', default='NONE', help="comma-separated ItemType names")
+        parser.add_argument(f'--upgrades{side}', default='NONE', help="comma-separated UpgradeType names")
+        parser.add_argument(f'--params{side}', default='{}', help='JSON grid, e.g. {"NAME": [1, 2]}')
+    parser.add_argument('--checkpoint', help="JSON-lines file to append results to and resume from")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.bot1, args.bot2, range(args.seeds),
+                     args.items1.split(','), args.upgrades1.split(','),
+                     args.items2.split(','), args.upgrades2.split(','),
+                     json.loads(args.params1), json.loads(args.params2))
+    keys = {job.key() for job in jobs}
+    rows = [row for row in load_checkpoint(args.checkpoint) if json.dumps(row['job']) in keys]
+    for row in run(jobs, args.checkpoint, args.workers):
+        rows.append(row)
+        if len(rows) % 100 == 0:
+            print(f"{len(rows)}/{len(jobs)} games played", file=sys.stderr)
+    print(format_table(aggregate(rows)))
+
+
+if __name__ == "__main__":
+    main()